@@ -18,28 +18,32 @@ from kivy.uix.label import Label
 from kivy.uix.button import Button
 from kivy.uix.floatlayout import FloatLayout
 from kivy.uix.image import Image
+from kivy.uix.carousel import Carousel
+from kivy.uix.widget import Widget
 from kivy.graphics import Color, Line, Rectangle, RoundedRectangle
 from kivy.core.window import Window
 from kivy.clock import Clock
-from kivy.utils import get_color_from_hex
 from kivy.animation import Animation
 
 import calendar
 import datetime
-import time
-
-from app.utils import is_dark_mode
-from app.api_utils import is_event_on_date
-from app.theme_manager import ThemeManager
-from UI.event_popup import AddEventPopup
-from UI.settings_popup import create_settings_popup
-from UI.weekly_view import WeeklyView
+
+from app.recurrence import is_event_on_date
+from app.theme_manager import ThemeManager, hex_to_rgba
+from app.hit_index import HitIndex
+from app.weather_service import get_weather_service
+from app.instrumentation import timed_function
+from app.tracing import traced
 from UI.components.top_bar import TopBar
 from UI.components.nav_buttons import NavButtons
 from UI.components.weekday_header import WeekdayHeader
 from UI.components.bottom_bar import BottomBar
-from UI.components.show_day_popup import show_day_popup
+from UI.components.texture_label import TextureLabel
+from UI.components.forecast_badge import ForecastBadge
 from storage.db_manager import get_events_for_month
+from app.log import get_logger
+
+logger = get_logger(__name__)
 
 
 class Calendar(GridLayout):
@@ -58,11 +62,21 @@ class Calendar(GridLayout):
     Usage:
         Used as the root layout widget in the main app window.
     """
+    # Minimum horizontal travel (px) for a swipe to change the week
+    SWIPE_DISTANCE = 80
+    # Seconds after startup before deferred work runs
+    POPUP_PREWARM_DELAY = 2
+    WEEKLY_PREPARE_DELAY = 4
+    WATCH_SETTINGS_DELAY = 5
+    # Longest wait before the light/dark timer re-checks the wall clock (seconds); the Clock
+    # counts monotonic time, so a wall clock stepped by NTP after boot would otherwise leave
+    # a timer armed hours early or late
+    THEME_RECHECK_INTERVAL = 30 * 60
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.cols = 1
         self.rows = 5
-        self.dark_mode = is_dark_mode()
 
         today = datetime.date.today()
         self.current_week_date = today
@@ -75,23 +89,32 @@ class Calendar(GridLayout):
         self.theme_manager.update_theme()
         self.theme = self.theme_manager.get_theme()
 
-        self.weekly_view = WeeklyView(theme=self.theme)
-        self.weekly_view.update_week(datetime.date(self.current_year, self.current_month, 1))
+        # Manual weather location from settings (None falls back to cached IP geolocation)
+        weather_service = get_weather_service()
+        previous_override = weather_service.location.override
+        weather_service.location.set_override(*(self.theme_manager.get_location_override() or ()))
+        if weather_service.location.override != previous_override and weather_service.is_running():
+            weather_service.refresh_now()
+        self.weather_service = weather_service
+        self.forecast_version = weather_service.forecast_version
+
+        # The weekly view is built lazily on the first toggle
+        self.weekly_view = None
 
         # Set theme-dependent colors
-        self.bg_color = (0.1, 0.1, 0.1, 1) if self.dark_mode else (1, 1, 1, 1)
         self.dark_mode = self.theme['text_color'] == 'FFFFFF'
-        self.text_color = self.theme['text_color']
+        self.text_color = self.theme.hex.text_color
 
-        Window.clearcolor = self.theme['bg_color']
+        Window.clearcolor = self.theme.rgba.bg_color
 
         # Top Bar
-        self.top_bar = TopBar(self.theme)
+        # Holding the top bar toggles the performance HUD
+        self.top_bar = TopBar(self.theme, on_long_press=self.toggle_perf_hud)
         self.add_widget(self.top_bar)
 
         # Divider below top bar
         with self.canvas:
-            Color(*get_color_from_hex(self.theme['border_color']))
+            Color(*self.theme.rgba.border_color)
             self.divider_line = Rectangle(
                 pos=(self.x, self.y + self.height * 0.945),
                 size=(self.width, 1),
@@ -101,6 +124,7 @@ class Calendar(GridLayout):
         def update_divider(*_):
             self.divider_line.pos = (self.x, self.y + self.height * 0.945)
             self.divider_line.size = (self.width, 1)
+        self.update_divider = update_divider
         self.bind(pos=update_divider, size=update_divider)
 
         # # Navigation Buttons
@@ -117,11 +141,28 @@ class Calendar(GridLayout):
                                             dark_mode=self.dark_mode)
         self.add_widget(self.weekday_header)
 
-        # Calendar Grid Display
+        # Calendar Grid Display: a looping three-page carousel (previous, current, next month).
+        # Only the current page is built up front; neighbors are rendered after the first
+        # frame and recycled as the user swipes, so a swipe itself does no work.
         self.selected_day = datetime.date.today()  # default to today
-        self.calendar_display = GridLayout(cols=7, size_hint_y=0.85)
+        self.pages_version = 0
+        self.month_pages = [self.create_calendar_display() for _ in range(3)]
+        self.month_carousel = Carousel(
+            direction='right',
+            loop=True,
+            size_hint_y=0.85,
+            scroll_timeout=120,
+            anim_move_duration=0.25,
+        )
+        for page in self.month_pages:
+            self.month_carousel.add_widget(page)
+        self.month_carousel.bind(index=self.on_month_page_changed)
+        self.calendar_display = self.month_pages[0]
         self.build_calendar(today.year, today.month)
-        self.add_widget(self.calendar_display)
+        self.add_widget(self.month_carousel)
+
+        self.neighbor_trigger = Clock.create_trigger(self.prepare_neighbor_pages, 0.3)
+        self.neighbor_trigger()
 
         # Bottom bar
         self.bottom_bar = BottomBar(
@@ -133,14 +174,29 @@ class Calendar(GridLayout):
         )
         self.add_widget(self.bottom_bar)
 
-        # Check time for dark and light mode
-        Clock.schedule_interval(self.check_theme_switch, 600)
+        # Redraw day cells when a new forecast arrives (the top bar starts the service)
+        self.weather_service.subscribe(self.on_weather_reading)
+
+        # Switch light/dark exactly at the next configured boundary (re-armed on every rebuild)
+        self.theme_event = None
+        self.schedule_theme_switch()
+
+        # Apply edits made to the settings file outside the app without a restart
+        self.theme_manager.store.subscribe(self.on_settings_file_changed)
+
+        # Only the current month is needed for the first frame. Everything else (popups,
+        # weekly view, settings watcher) is imported and built once the UI has been idle a moment.
+        self.deferred_events = [
+            Clock.schedule_once(self.prewarm_popups, self.POPUP_PREWARM_DELAY),
+            Clock.schedule_once(self.prepare_weekly_view, self.WEEKLY_PREPARE_DELAY),
+            Clock.schedule_once(lambda dt: self.theme_manager.store.start_watching(), self.WATCH_SETTINGS_DELAY),
+        ]
 
         self.float_root = None
 
     def on_prev(self, instance):
         """Handles 'Previous Month' button click."""
-        print(f"[DEBUG] Previous pressed at {time.time()}")
+        logger.debug('Previous pressed')
         if self.is_weekly_view:
             # Move to previous week
             self.current_week_date -= datetime.timedelta(days=7)
@@ -150,21 +206,15 @@ class Calendar(GridLayout):
             # Update display and rebuild weekly view
             self.update_current_date_display()
             self.weekly_view.update_week(self.current_week_date)
-            week_dates = WeeklyView.get_current_week_dates(self.current_week_date)  # or next_week
+            week_dates = self.weekly_view.get_current_week_dates(self.current_week_date)  # or next_week
             self.weekday_header.update_weekly_dates(week_dates)
         else:
-            # Move to previous month
-            if self.current_month == 1:
-                self.current_month = 12
-                self.current_year -= 1
-            else:
-                self.current_month -= 1
-            self.update_current_date_display()
-            self.build_calendar(self.current_year, self.current_month)
+            # Slide to the pre-rendered previous month
+            self.month_carousel.load_previous()
 
     def on_next(self, instance):
         """Handles 'Next Month' button click."""
-        print(f"[DEBUG] Next pressed at {time.time()}")
+        logger.debug('Next pressed')
         if self.is_weekly_view:
             # Move to next week
             self.current_week_date += datetime.timedelta(days=7)
@@ -174,30 +224,151 @@ class Calendar(GridLayout):
             # Update display and rebuild weekly view
             self.update_current_date_display()
             self.weekly_view.update_week(self.current_week_date)
-            week_dates = WeeklyView.get_current_week_dates(self.current_week_date)  # or next_week
+            week_dates = self.weekly_view.get_current_week_dates(self.current_week_date)  # or next_week
             self.weekday_header.update_weekly_dates(week_dates)
 
         else:
-            # Move to next month
-            if self.current_month == 12:
-                self.current_month = 1
-                self.current_year += 1
-            else:
-                self.current_month += 1
-            self.update_current_date_display()
-            self.build_calendar(self.current_year, self.current_month)
+            # Slide to the pre-rendered next month
+            self.month_carousel.load_next()
 
     def update_current_date_display(self):
         new_date = datetime.date(self.current_year, self.current_month, 1)
         self.current_date = new_date.strftime("%B %Y")
         self.top_bar.date_label.text = f"[b][color={self.text_color}]{self.current_date}[/color][/b]"
 
-    def build_calendar(self, year, month):
+    def on_touch_down(self, touch):
+        # Remember where touches over the weekly view start, for swipe navigation
+        if self.is_weekly_view and self.weekly_view and self.weekly_view.collide_point(*touch.pos):
+            touch.ud['week_swipe_origin'] = touch.pos
+        return super().on_touch_down(touch)
+
+    def on_touch_up(self, touch):
+        # A mostly horizontal swipe over the weekly view moves one week
+        origin = touch.ud.get('week_swipe_origin')
+        if origin and self.is_weekly_view:
+            dx = touch.x - origin[0]
+            dy = touch.y - origin[1]
+            if abs(dx) > self.SWIPE_DISTANCE and abs(dx) > 2 * abs(dy):
+                del touch.ud['week_swipe_origin']
+                if dx > 0:
+                    self.on_prev(None)
+                else:
+                    self.on_next(None)
+                return True
+        return super().on_touch_up(touch)
+
+    @staticmethod
+    def shift_month(year, month, delta):
+        """Returns (year, month) moved by `delta` months."""
+        index = year * 12 + (month - 1) + delta
+        return index // 12, index % 12 + 1
+
+    def on_month_page_changed(self, carousel, index):
+        """
+        Called when the carousel settles on a new page (swipe or nav button).
+        Updates the current month and schedules the now-stale neighbor page to be re-rendered.
+        """
+        page = carousel.current_slide
+        # A carousel replaced by rebuild_ui can still finish its slide afterwards
+        if carousel is not self.month_carousel or page is self.calendar_display:
+            return
+
+        old_index = self.month_pages.index(self.calendar_display)
+        delta = 1 if (index - old_index) % 3 == 1 else -1
+        self.current_year, self.current_month = self.shift_month(self.current_year, self.current_month, delta)
+        self.calendar_display = page
+
+        # Swiped faster than the neighbors could be prepared
+        if page.month_key != (self.current_year, self.current_month, self.pages_version):
+            self.build_calendar(self.current_year, self.current_month)
+
+        self.update_current_date_display()
+        self.neighbor_trigger()
+
+    def prepare_neighbor_pages(self, *_):
+        """Renders the previous and next month pages off-screen, skipping any that are up to date."""
+        carousel = self.month_carousel
+        for page, delta in ((carousel.previous_slide, -1), (carousel.next_slide, 1)):
+            year, month = self.shift_month(self.current_year, self.current_month, delta)
+            if page is not None and page.month_key != (year, month, self.pages_version):
+                self.build_calendar(year, month, grid=page)
+
+    def refresh_month_pages(self):
+        """Rebuilds the visible month now and re-renders its neighbors shortly after."""
+        self.pages_version += 1
+        self.build_calendar(self.current_year, self.current_month)
+        self.neighbor_trigger()
+
+    def on_weather_reading(self, reading):
+        """Receives readings from the weather service (any thread) and applies forecasts on the UI thread."""
+        Clock.schedule_once(self.apply_forecast, 0)
+
+    def apply_forecast(self, *_):
+        """Re-renders the month pages and weekly view if the forecast changed since they were drawn."""
+        if self.weather_service.forecast_version == self.forecast_version:
+            return
+        self.forecast_version = self.weather_service.forecast_version
+        self.refresh_month_pages()
+        if self.weekly_view is not None:
+            self.weekly_view.update_forecast()
+
+    def create_calendar_display(self):
+        """
+        Creates a 7-column month page with a single touch handler
+        that resolves event taps through the page's hit index.
+        """
+        grid = GridLayout(cols=7)
+        grid.hit_index = HitIndex(inflate=10)
+        grid.month_key = None
+        grid.bind(pos=grid.hit_index.invalidate, size=grid.hit_index.invalidate)
+        grid.bind(on_touch_down=lambda instance, touch: instance.hit_index.dispatch(touch))
+        return grid
+
+    def prewarm_popups(self, *_):
+        """Builds the event popup ahead of time, so the first tap opens it instantly."""
+        from UI.event_popup import event_popup_pool
+
+        event_popup_pool.prewarm(self.theme)
+
+    def prepare_weekly_view(self, *_):
+        """Builds the weekly view's widgets ahead of the first toggle (its events load on toggle)."""
+        if self.weekly_view is None:
+            from UI.weekly_view import WeeklyView
+
+            self.weekly_view = WeeklyView(theme=self.theme)
+
+    def open_event_popup(self, event):
+        """Opens the edit popup for an existing event with a fade-in."""
+        from UI.event_popup import event_popup_pool
+
+        popup = event_popup_pool.acquire(
+            self.theme,
+            app_ref=self,
+            event=event,
+            on_save_callback=lambda date: self.refresh_month_pages()
+        )
+        popup.opacity = 0
+        popup.open()
+        anim = Animation(opacity=1, d=0.3, t='out_quad')
+        anim.start(popup)
+        return True
+
+    @traced('Calendar.build_calendar', cat='ui')
+    @timed_function('build_calendar')
+    def build_calendar(self, year, month, grid=None):
         """
         Builds the calendar grid for a given month and year.
         Highlights today's date and aligns day numbers correctly.
+
+        Args:
+            year (int): Year to show.
+            month (int): Month to show.
+            grid (GridLayout, optional): Month page to build into, defaults to the visible one.
         """
-        self.calendar_display.clear_widgets()
+        if grid is None:
+            grid = self.calendar_display
+        grid.clear_widgets()
+        grid.hit_index.clear()
         first_weekday, total_days = calendar.monthrange(year, month)
 
         # Adjust: Python's calendar starts with Monday (0), UI starts with Sunday (0)
@@ -208,7 +379,7 @@ class Calendar(GridLayout):
 
         # Add empty cells for alignment
         for _ in range(first_weekday):
-            self.calendar_display.add_widget(Label(text=''))
+            grid.add_widget(Widget())
 
         # Add actual calendar day cells
         for day in range(1, total_days + 1):
@@ -216,11 +387,15 @@ class Calendar(GridLayout):
             date_str = str(day_date)
             day_event = events_this_month.get(date_str, [])
 
-            self.calendar_display.add_widget(self.create_day_cell(day_date, day_event))
+            grid.add_widget(self.create_day_cell(day_date, day_event, grid.hit_index))
 
-    def create_day_cell(self, day_date, events):
+        grid.month_key = (year, month, self.pages_version)
+
+    @traced('Calendar.create_day_cell', cat='ui')
+    def create_day_cell(self, day_date, events, hit_index):
         """
         Wraps a calendar day label in a BoxLayout with a black border.
+        Event previews are registered with the page's hit index.
         """
 
         box = FloatLayout()
@@ -234,18 +409,25 @@ class Calendar(GridLayout):
             day_text = f"[b][color={self.text_color}]{day_date.day}[/color][/b]"
 
         # Day number Label
-        day_label = Label(
+        day_label = TextureLabel(
             text=day_text,
-            markup=True,
             size_hint=(None, None),
             size=(30, 20),
             pos_hint={'x': 0, 'top': 1},
             halign='left',
             valign='top',
         )
-        day_label.bind(size=lambda instance, value: setattr(instance, 'text_size', value))
         box.add_widget(day_label)
 
+        # Forecast badge from the in-memory forecast (days outside its range have none)
+        forecast = self.weather_service.get_forecast(str(day_date))
+        if forecast:
+            box.add_widget(ForecastBadge(
+                self.text_color,
+                day=forecast,
+                pos_hint={'right': 1, 'top': 1},
+            ))
+
         # Cell input area
         btn = Button(
             background_normal='',
@@ -258,7 +440,7 @@ class Calendar(GridLayout):
 
         # Draw cell border
         with box.canvas.before:
-            Color(*get_color_from_hex(self.theme['border_color']))
+            Color(*self.theme.rgba.border_color)
             border = Line(rectangle=(0, 0, 0, 0), width=1.2)
 
         def update_border(*_):
@@ -285,34 +467,8 @@ class Calendar(GridLayout):
                 pos_hint={'x': 0, 'top': 0.85 - i * 0.20},
             )
 
-            # Create tap area for each event
-            def create_event_tap(event_box_ref, event_ref):
-                def on_event_tap(instance, touch):
-                    # Inflate the clickable area by +10px in all directions
-                    inflate = 10
-                    x1 = event_box_ref.x - inflate
-                    y1 = event_box_ref.y - inflate
-                    x2 = event_box_ref.right + inflate
-                    y2 = event_box_ref.top + inflate
-
-                    if x1 <= touch.x <= x2 and y1 <= touch.y <= y2:
-                        popup = AddEventPopup(
-                            app_ref=self,
-                            theme=self.theme,
-                            event=event_ref,
-                            on_save_callback=lambda date: self.build_calendar(self.current_year, self.current_month)
-                        )
-                        popup.opacity = 0
-                        popup.bind(on_dismiss=popup.on_dismiss)
-                        popup.open()
-                        anim = Animation(opacity=1, d=0.3, t='out_quad')
-                        anim.start(popup)
-                        return True
-                    return False
-
-                return on_event_tap
-
-            event_box.bind(on_touch_down=create_event_tap(event_box, event))
+            # Register the preview with the grid-level hit index (inflated by 10px)
+            hit_index.add(event_box, lambda touch, event_ref=event: self.open_event_popup(event_ref))
 
             # Draw background for each event
             with event_box.canvas.before:
@@ -339,15 +495,14 @@ class Calendar(GridLayout):
             )
 
             # Add the event label
-            preview_label = Label(
+            preview_label = TextureLabel(
                 text=f"[size=14][color={self.text_color}][b]{event.time}[/b] {short_title}[/color][/size]",
-                markup=True,
                 size_hint=(1, 1),
                 halign='left',
                 valign='middle',
-                padding=(5, 2),
+                wrap=True,
+                padding=[5, 2],
             )
-            preview_label.bind(width=lambda inst, val: setattr(inst, 'text_size', (val, None)))
 
             event_box.add_widget(icon)
             event_box.add_widget(preview_label)
@@ -367,66 +522,95 @@ class Calendar(GridLayout):
                 valign='middle',
                 background_normal='',
                 background_color=(0, 0, 0, 0),
-                color=get_color_from_hex(self.text_color),
+                color=self.theme.rgba.text_color,
             )
 
-            more_events_button.bind(on_release=lambda inst: show_day_popup(day_date, all_monthly_events, self.theme))
+            more_events_button.bind(on_release=lambda inst: self.show_day(day_date, all_monthly_events))
             box.add_widget(more_events_button)
 
-        box.bind(pos=update_border, size=update_border)
-
         return box
 
+    def show_day(self, day_date, events):
+        """Shows every event of a day in a popup."""
+        from UI.components.show_day_popup import show_day_popup
+
+        show_day_popup(day_date, events, self.theme)
+
+    def stop(self):
+        """Cancels timers and unsubscribes from background services, e.g. before a rebuild."""
+        self.top_bar.stop()
+        for event in self.deferred_events:
+            event.cancel()
+        self.weather_service.unsubscribe(self.on_weather_reading)
+        self.theme_manager.store.unsubscribe(self.on_settings_file_changed)
+        if self.theme_event is not None:
+            self.theme_event.cancel()
+            self.theme_event = None
+
     def rebuild_ui(self, root_ref):
         # Re-run initialization with new theme
         root_ref = self.float_root
+        self.stop()
         self.clear_widgets()
+        # __init__ draws the divider and binds its updater again; drop the old ones
+        self.unbind(pos=self.update_divider, size=self.update_divider)
+        self.canvas.clear()
         self.__init__()
         self.set_float_root(root_ref)
 
-    def check_theme_switch(self, dt):
+    def schedule_theme_switch(self):
         """
-        Periodically checks if the theme should be updated based on time of day.
-        If a theme switch is needed, the UI is rebuilt.
+        Arms a single timer for the next light/dark transition (none if auto mode is off).
+        Long waits are split into THEME_RECHECK_INTERVAL steps, each recomputed from wall time.
         """
+        if self.theme_event is not None:
+            self.theme_event.cancel()
+            self.theme_event = None
+
+        delay = self.theme_manager.seconds_until_next_transition()
+        if delay is not None:
+            self.theme_event = Clock.schedule_once(self.on_theme_transition, min(delay, self.THEME_RECHECK_INTERVAL))
+
+    def on_settings_file_changed(self, settings):
+        """Called on the watcher thread after an external edit; rebuilds the UI on the main thread."""
+        Clock.schedule_once(lambda dt: self.rebuild_ui(self.float_root), 0)
+
+    def on_theme_transition(self, dt):
+        """Applies the theme due now (by wall time) and rebuilds the UI if it changed."""
+        self.theme_event = None
+        previous_theme = self.theme_manager.settings['active_theme']
+        self.theme_manager.update_theme()
 
-        current_mode = is_dark_mode()
-        if current_mode != self.dark_mode:
-            print('Switching theme based on time of day...')
-            self.dark_mode = current_mode
-
-            # Update app-wide colors
-            self.text_color = 'FFFFFF' if self.dark_mode else '000000'
-            self.bg_color = (0.1, 0.1, 0.1, 1) if self.dark_mode else (1, 1, 1, 1)
-            Window.clearcolor = self.bg_color
-
-            # Rebuild UI with new theme
-            self.clear_widgets()
-
+        if self.theme_manager.settings['active_theme'] != previous_theme:
+            logger.info('Switching theme based on time of day')
             self.rebuild_ui(self.float_root)
+        else:
+            # A periodic re-check, woke up early after a clock step, or the theme is the same on both sides
+            self.schedule_theme_switch()
 
     def set_selected_day(self, day):
         self.selected_day = datetime.date(self.current_year, self.current_month, day)
-        self.build_calendar(self.current_year, self.current_month)
+        self.refresh_month_pages()
         self.show_toast(f"Selected {self.selected_day.strftime('%b %d')}")
 
     def on_add_event(self, instance):
-        popup = AddEventPopup(
-            theme=self.theme,
-            on_save_callback=self.save_event,
+        from UI.event_popup import event_popup_pool
+
+        popup = event_popup_pool.acquire(
+            self.theme,
             app_ref=self,
+            on_save_callback=self.save_event,
             initial_date=self.selected_day,
         )
-        popup.bind(on_dismiss=popup.on_dismiss)
         popup.open()
 
     def save_event(self, event_data):
-        print('Saved Event:', event_data)
+        logger.info('Saved event: %s', event_data)
         self.show_toast(f"Event '{event_data['title']}' added!")
 
         event_date = datetime.datetime.strptime(event_data['date'], '%Y-%m-%d').date()
         self.selected_day = event_date
-        self.build_calendar(self.current_year, self.current_month)
+        self.refresh_month_pages()
 
     def show_toast(self, message, duration=2.5):
         """
@@ -440,7 +624,7 @@ class Calendar(GridLayout):
             pos_hint={'center_x': 0.5, 'center_y': 0.5},
             halign='center',
             valign='middle',
-            color=get_color_from_hex('#FFFFFF'),
+            color=hex_to_rgba('#FFFFFF'),
             padding=(20, 10),
             bold=True,
         )
@@ -448,7 +632,7 @@ class Calendar(GridLayout):
         toast.canvas.before.clear()
         with toast.canvas.before:
             # Color(*self.theme['button_color'])  # background color
-            Color(*get_color_from_hex('#FF4C4C'))
+            Color(*hex_to_rgba('#FF4C4C'))
             toast_bg = RoundedRectangle(pos=toast.pos, size=toast.size, radius=[10])
 
         # Keep background rectangle in sync
@@ -477,54 +661,55 @@ class Calendar(GridLayout):
 
             Clock.schedule_once(dismiss_toast, duration)
         else:
-            print("⚠️ Warning: float_root not set — cannot display toast.")
+            logger.warning('float_root not set, cannot display toast')
 
     def set_float_root(self, float_root):
         """Allows the Calendar to add overlays like toast to its parent FloatLayout."""
         self.float_root = float_root
 
+    def toggle_perf_hud(self):
+        """Shows or hides the performance HUD (kept on the float root, so it survives rebuilds)."""
+        if not self.float_root:
+            return
+        from UI.components.perf_hud import PerfHud, find_hud
+
+        hud = find_hud(self.float_root) or PerfHud()
+        hud.toggle(self.float_root)
+
     def show_settings(self, instance=None):
+        from UI.settings_popup import create_settings_popup
+
         popup = create_settings_popup(self.theme_manager, lambda: self.rebuild_ui(self.float_root), self.theme)
         popup.open()
 
     def toggle_weekly_view(self, instance):
-        self.clear_widgets()
+        """
+        Switches between the monthly grid and the weekly view.
+
+        All widgets are reused: the weekly view is constructed once on first use,
+        and the weekday header is relabeled rather than recreated.
+        """
         self.is_weekly_view = not self.is_weekly_view
 
         # Update button texts
         self.bottom_bar.update_view_button_text(self.is_weekly_view)
         self.nav_grid.update_button_text(self.is_weekly_view)
 
-        # Re-add the top bar
-        self.add_widget(self.top_bar)
-
-        # Re-add the nav buttons
-        self.add_widget(self.nav_grid)
-
-        week_dates = None
         if self.is_weekly_view:
-            today = datetime.date.today()
-            week_dates = WeeklyView.get_current_week_dates()  # Use the static method from WeeklyView
-
-        # Re-create the weekday header with appropriate settings
-        self.weekday_header = WeekdayHeader(
-            theme=self.theme,
-            theme_manager=self.theme_manager,
-            dark_mode=self.dark_mode,
-            is_weekly_view=self.is_weekly_view,
-            week_dates=week_dates
-        )
-        self.add_widget(self.weekday_header)
+            self.prepare_weekly_view()
+            self.weekly_view.update_week(self.current_week_date)
 
-        # Display appropriate view
-        if self.is_weekly_view:
-            self.weekly_view = WeeklyView(theme=self.theme)
-            self.add_widget(self.weekly_view)
+            week_dates = self.weekly_view.get_current_week_dates(self.current_week_date)
+            self.weekday_header.set_view_mode(True, week_dates)
+            self.swap_main_view(self.month_carousel, self.weekly_view)
         else:
             # Rebuild the monthly calendar
-            self.calendar_display = GridLayout(cols=7, size_hint_y=0.85)
-            self.build_calendar(self.current_year, self.current_month)
-            self.add_widget(self.calendar_display)
-
-        # Re-add the bottom bar
-        self.add_widget(self.bottom_bar)
+            self.weekday_header.set_view_mode(False)
+            self.refresh_month_pages()
+            self.swap_main_view(self.weekly_view, self.month_carousel)
+
+    def swap_main_view(self, old_view, new_view):
+        """Replaces the main view (month grid or weekly view) in place, keeping the bars around it."""
+        index = self.children.index(old_view)
+        self.remove_widget(old_view)
+        self.add_widget(new_view, index=index)
@@ -0,0 +1,121 @@
+"""
+event_list.py
+
+A virtualized, scrollable list of event rows for the Family Calendar app.
+
+Built on Kivy's RecycleView: only the rows currently on screen exist as
+widgets, and they are reused as the list scrolls. Row heights are measured
+once per (text, width) through the shared text cache, so a day with hundreds
+of events costs a handful of widgets and no per-row Clock callbacks.
+
+Used by:
+- The weekly view day columns
+- The "+N more" day popup
+
+Author: Attila Bordan
+"""
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.properties import ObjectProperty
+from kivy.metrics import sp
+
+from app.text_cache import texture_cache
+from UI.components.texture_label import TextureLabel
+
+
+class EventRow(RecycleDataViewBehavior, TextureLabel):
+    """A recycled row that shows one event's markup text."""
+    event = ObjectProperty(None, allownone=True)
+
+
+class EventListView(RecycleView):
+    """
+    A scrollable list of events backed by a data model instead of widgets.
+
+    Args:
+        on_select (callable, optional): Called with the Event when a row is tapped.
+        row_padding (list): [horizontal, vertical] padding inside each row.
+        row_spacing (float): Extra height added below each row.
+        spacing (float): Space between rows.
+        padding (tuple): Padding around the list.
+        inflate (float): Margin around each row that still counts as a tap.
+        **kwargs: Passed through to RecycleView / ScrollView (bar colors, etc.).
+    """
+    def __init__(self, on_select=None, row_padding=(10, 10), row_spacing=10, spacing=0, padding=(0, 20),
+                 inflate=10, **kwargs):
+        super().__init__(**kwargs)
+        self.on_select = on_select
+        self.row_padding = list(row_padding)
+        self.row_spacing = row_spacing
+        self.inflate = inflate
+        self.font_size = sp(15)
+        self.rows = []
+
+        self.layout = RecycleBoxLayout(
+            orientation='vertical',
+            size_hint_y=None,
+            default_size=(None, 60),
+            default_size_hint=(1, None),
+            spacing=spacing,
+            padding=padding,
+        )
+        self.layout.bind(minimum_height=self.layout.setter('height'))
+        self.layout.bind(on_touch_down=self._on_layout_touch)
+        self.add_widget(self.layout)
+        # Only after the layout is added: without a layout manager RecycleView drops the viewclass
+        self.viewclass = EventRow
+
+        self.bind(width=self._refresh_data)
+
+    def set_rows(self, rows):
+        """
+        Replaces the list content.
+
+        Args:
+            rows (list): (markup_text, event, color) tuples in display order.
+        """
+        self.rows = rows
+        self._refresh_data()
+
+    def _refresh_data(self, *_):
+        # Rows wrap to the list width minus the layout's and the row's own padding,
+        # so heights depend on it
+        left, _, right, _ = self.layout.padding
+        text_width = max(self.width - left - right - 2 * self.row_padding[0], 1)
+        extra = 2 * self.row_padding[1] + self.row_spacing
+
+        self.data = [
+            {
+                'text': text,
+                'event': event,
+                'color': color,
+                'wrap': True,
+                'valign': 'top',
+                'padding': self.row_padding,
+                'font_size': self.font_size,
+                'height': texture_cache.measure(text, font_size=self.font_size, width=text_width)[1] + extra,
+            }
+            for text, event, color in self.rows
+        ]
+
+    def _on_layout_touch(self, layout, touch):
+        """Resolves a tap to a row through the layout's positions instead of per-row handlers."""
+        if not self.on_select or not self.data:
+            return False
+
+        index = layout.get_view_index_at(touch.pos)
+        if index is None or index >= len(layout.view_opts):
+            return False
+
+        opt = layout.view_opts[index]
+        if opt['pos'] is None:
+            return False
+
+        x, y = opt['pos']
+        width, height = opt['size']
+        margin = self.inflate
+        if x - margin <= touch.x <= x + width + margin and y - margin <= touch.y <= y + height + margin:
+            self.on_select(self.data[index]['event'])
+            return True
+        return False
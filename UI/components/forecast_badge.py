@@ -0,0 +1,59 @@
+"""
+forecast_badge.py
+
+A small weather forecast badge (icon + high/low) for calendar days.
+
+The badge only reads the weather service's in-memory forecast and the local
+icon textures, so drawing it never waits on the network.
+
+Used by:
+- The monthly day cells (top-right corner)
+- The weekly view column headers
+
+Author: Attila Bordan
+"""
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.image import Image
+
+from app.weather_icons import get_icon_texture
+from UI.components.texture_label import TextureLabel
+
+
+class ForecastBadge(BoxLayout):
+    """
+    Shows a day's forecast icon and "high°/low°" temperatures.
+
+    Args:
+        text_color (str): Hex color for the temperature text.
+        day (dict, optional): Forecast summary with 'high', 'low' and 'icon'.
+        **kwargs: Passed through to BoxLayout (size, pos_hint, etc.).
+    """
+    def __init__(self, text_color, day=None, **kwargs):
+        kwargs.setdefault('size_hint', (None, None))
+        kwargs.setdefault('width', 80)
+        kwargs.setdefault('height', 22)
+        super().__init__(orientation='horizontal', spacing=2, **kwargs)
+        self.text_color = text_color
+
+        self.icon = Image(size_hint=(None, 1), width=self.height, allow_stretch=True)
+        self.label = TextureLabel(font_size='12sp', halign='left', valign='middle')
+        self.add_widget(self.icon)
+        self.add_widget(self.label)
+
+        self.set_forecast(day)
+
+    def set_forecast(self, day):
+        """
+        Updates the badge, hiding it when there is no forecast for the day.
+
+        Args:
+            day (dict or None): Forecast summary with 'high', 'low' and 'icon'.
+        """
+        if not day:
+            self.opacity = 0
+            self.label.text = ''
+            return
+
+        self.opacity = 1
+        self.icon.texture = get_icon_texture(day['icon'])
+        self.label.text = f"[b][color={self.text_color}]{day['high']}°/{day['low']}°[/color][/b]"
@@ -1,3 +1,19 @@
+"""
+keyboard.py
+
+On-screen virtual keyboard for the touchscreen forms.
+
+Layers (all built once, swapped in place):
+- Letters, with Caps relabeling the keys instead of rebuilding them
+- Symbols
+- Numeric, used automatically for time and coordinate fields
+
+Touches are resolved by the keyboard itself: a tap lands on the nearest key,
+so taps in the gaps or just past the edge of a key still count. Backspace
+repeats while held. Typing does not create or destroy any widgets.
+
+Author: Attila Bordan
+"""
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.button import Button
 from kivy.uix.boxlayout import BoxLayout
@@ -6,63 +22,208 @@ from kivy.clock import Clock
 
 
 class VirtualKeyboard(BoxLayout):
+    """
+    A layered on-screen keyboard that types into the focused registered input.
+
+    Args (via kwargs):
+        Passed through to BoxLayout (size_hint_y, height, etc.).
+    """
     active_input = ObjectProperty(None)
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.orientation = 'vertical'
-        self.key_rows = [
+    LAYERS = {
+        'alpha': [
             ['1', '2', '3', '4', '5', '6', '7', '8', '9', '0'],
             ['q', 'w', 'e', 'r', 't', 'y', 'u', 'i', 'o', 'p'],
             ['a', 's', 'd', 'f', 'g', 'h', 'j', 'k', 'l'],
             ['z', 'x', 'c', 'v', 'b', 'n', 'm'],
             [':', '!', '.', '?', '@', '/', '"'],
-            ['Space', 'Backspace', 'Clear', 'Caps', 'Done']
-        ]
+            ['#+=', 'Space', 'Backspace', 'Clear', 'Caps', 'Done'],
+        ],
+        'symbols': [
+            ['1', '2', '3', '4', '5', '6', '7', '8', '9', '0'],
+            ['-', '_', '(', ')', '&', '+', '=', '*', '%', '#'],
+            [',', ';', "'", '$', '<', '>', '[', ']', '~'],
+            [':', '!', '.', '?', '@', '/', '"'],
+            ['ABC', 'Space', 'Backspace', 'Clear', 'Done'],
+        ],
+        'numeric': [
+            ['1', '2', '3'],
+            ['4', '5', '6'],
+            ['7', '8', '9'],
+            [':', '0', '.', '-'],
+            ['ABC', 'Backspace', 'Clear', 'Done'],
+        ],
+    }
+
+    # Taps further than this (px) from every key are ignored
+    MAX_KEY_DISTANCE = 20
+    REPEAT_DELAY = 0.5
+    REPEAT_INTERVAL = 0.08
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.orientation = 'vertical'
         self.caps = False
-        self.build_keys(self.caps)
-
-    def build_keys(self, caps):
-        if not caps:
-            for row in self.key_rows:
-                row_layout = GridLayout(cols=len(row), size_hint_y=None, height=40)
-                for key in row:
-                    btn = Button(text=key, on_press=self.handle_key, font_size=18)
-                    row_layout.add_widget(btn)
-                self.add_widget(row_layout)
-        else:
-            for row in self.key_rows:
-                row_layout = GridLayout(cols=len(row), size_hint_y=None, height=40)
-                for key in row:
-                    btn = Button(text=key.capitalize(), on_press=self.handle_key, font_size=18)
-                    row_layout.add_widget(btn)
-                self.add_widget(row_layout)
+        self.layer = None
+        self.pressed_key = None
+        self._input_layers = {}
+
+        # Every layer's buttons are created here and only relabeled or swapped afterwards
+        self.layer_widgets = {}
+        self.layer_keys = {}
+        for name, rows in self.LAYERS.items():
+            self.layer_widgets[name], self.layer_keys[name] = self.build_layer(rows)
+        self.letter_keys = [btn for btn in self.layer_keys['alpha'] if btn.key.isalpha() and len(btn.key) == 1]
+
+        self._repeat_delay = Clock.create_trigger(self._start_repeat, self.REPEAT_DELAY)
+        self._repeat_event = Clock.create_trigger(self._repeat_backspace, self.REPEAT_INTERVAL, interval=True)
+
+        self.show_layer('alpha')
+
+    @staticmethod
+    def build_layer(rows):
+        """
+        Builds one layer of key rows.
+
+        Returns:
+            tuple: (layer BoxLayout, list of its key Buttons)
+        """
+        layer = BoxLayout(orientation='vertical')
+        keys = []
+        for row in rows:
+            row_layout = GridLayout(cols=len(row))
+            for key in row:
+                btn = Button(text=key, font_size=18)
+                btn.key = key
+                row_layout.add_widget(btn)
+                keys.append(btn)
+            layer.add_widget(row_layout)
+        return layer, keys
 
+    def show_layer(self, name):
+        """Swaps the visible layer (no widgets are created)."""
+        if name == self.layer:
+            return
+        if self.layer is not None:
+            self.remove_widget(self.layer_widgets[self.layer])
+        self.add_widget(self.layer_widgets[name])
+        self.layer = name
+
+    def set_caps(self, caps):
+        """Switches the letter keys between lower and upper case by relabeling them."""
+        self.caps = caps
+        for btn in self.letter_keys:
+            btn.text = btn.key.upper() if caps else btn.key
+
+    def reset(self):
+        """Returns to lower-case letters with no target input (e.g. when a form is reused)."""
+        self._stop_repeat()
+        self.active_input = None
+        self.set_caps(False)
+        self.show_layer('alpha')
+
+    # ---------- Touch handling ----------
+    def key_at(self, x, y):
+        """
+        Returns the key nearest to a touch on the visible layer.
+
+        Distance is measured to each key's rectangle (zero inside it), so
+        taps in gaps or just outside a key resolve to the closest one.
+        """
+        best, best_distance = None, self.MAX_KEY_DISTANCE
+        for btn in self.layer_keys[self.layer]:
+            dx = max(btn.x - x, 0, x - btn.right)
+            dy = max(btn.y - y, 0, y - btn.top)
+            distance = (dx * dx + dy * dy) ** 0.5
+            if distance <= best_distance:
+                if distance == 0:
+                    return btn
+                best, best_distance = btn, distance
+        return best
+
+    def on_touch_down(self, touch):
+        if not self.collide_point(*touch.pos):
+            return False
+
+        btn = self.key_at(*touch.pos)
+        if btn is None:
+            return True
+
+        touch.grab(self)
+        self.pressed_key = btn
+        btn.state = 'down'
+        self.handle_key(btn)
+        if btn.key == 'Backspace':
+            self._repeat_delay()
+        return True
+
+    def on_touch_up(self, touch):
+        if touch.grab_current is not self:
+            return super().on_touch_up(touch)
+
+        touch.ungrab(self)
+        self._stop_repeat()
+        if self.pressed_key is not None:
+            self.pressed_key.state = 'normal'
+            self.pressed_key = None
+        return True
+
+    def _start_repeat(self, dt):
+        self._repeat_event()
+
+    def _repeat_backspace(self, dt):
+        if self.active_input:
+            self.active_input.do_backspace()
+
+    def _stop_repeat(self):
+        self._repeat_delay.cancel()
+        self._repeat_event.cancel()
+
+    # ---------- Typing ----------
     def handle_key(self, instance):
+        key = instance.key
+
+        # Layer and case keys work even before an input is focused
+        if key == 'Caps':
+            self.set_caps(not self.caps)
+            return
+        if key == '#+=':
+            self.show_layer('symbols')
+            return
+        if key == 'ABC':
+            self.show_layer('alpha')
+            return
+
         if not self.active_input:
             return
 
-        key = instance.text
         if key == 'Space':
             self.active_input.insert_text(' ')
         elif key == 'Backspace':
-            text = self.active_input.text
-            self.active_input.text = text[:-1]
+            self.active_input.do_backspace()
         elif key == 'Clear':
             self.active_input.text = ''
         elif key == 'Done':
             self.active_input.focus = False
-        elif key == 'Caps':
-            self.caps = not self.caps
-            self.clear_widgets()
-            self.build_keys(self.caps)
         else:
-            self.active_input.insert_text(key)
+            self.active_input.insert_text(instance.text)
 
-    def register_inputs(self, *inputs):
+    def register_inputs(self, *inputs, layer='alpha'):
+        """
+        Routes typing to the given inputs while they are focused.
+
+        Args:
+            *inputs: TextInput widgets.
+            layer (str): Layer shown when one of them gains focus ('alpha', 'symbols' or 'numeric').
+        """
         for input_field in inputs:
+            self._input_layers[input_field] = layer
             input_field.bind(focus=self.on_focus)
 
     def on_focus(self, instance, value):
         if value:
-            Clock.schedule_once(lambda dt: setattr(self, 'active_input', instance), 0)
+            Clock.schedule_once(lambda dt: self._activate(instance), 0)
+
+    def _activate(self, instance):
+        self.active_input = instance
+        self.show_layer(self._input_layers.get(instance, 'alpha'))
@@ -0,0 +1,123 @@
+"""
+perf_hud.py
+
+On-screen performance overlay for diagnosing sluggish boards in the field.
+
+Shows:
+- FPS and frame-time percentiles
+- Duration of the last calendar build, weekly update, DB query and weather fetch
+- Live widget count and scheduled Clock event count
+
+Frame times are only sampled while the overlay is visible, so a hidden HUD
+costs nothing. Toggled by a long-press on the top bar.
+
+Author: Attila Bordan
+"""
+from kivy.uix.label import Label
+from kivy.clock import Clock
+from kivy.core.window import Window
+from kivy.graphics import Color, RoundedRectangle
+
+from app import instrumentation
+
+# Operations shown in the HUD, in display order
+HUD_OPERATIONS = (
+    ('build_calendar', 'Month build'),
+    ('weekly_update', 'Week update'),
+    ('db_query', 'DB query'),
+    ('weather_fetch', 'Weather fetch'),
+)
+
+
+class PerfHud(Label):
+    """
+    A translucent text overlay with live performance numbers.
+
+    Add it to the root FloatLayout and call `start()` / `stop()` (or `toggle()`).
+    """
+    def __init__(self, **kwargs):
+        kwargs.setdefault('size_hint', (None, None))
+        kwargs.setdefault('size', (340, 230))
+        kwargs.setdefault('pos_hint', {'right': 0.99, 'top': 0.93})
+        super().__init__(
+            markup=True,
+            font_size='13sp',
+            font_name='RobotoMono-Regular',
+            halign='left',
+            valign='top',
+            padding=(10, 8),
+            color=(1, 1, 1, 1),
+            **kwargs
+        )
+        self.bind(size=self.setter('text_size'))
+
+        with self.canvas.before:
+            Color(0, 0, 0, 0.7)
+            self._bg = RoundedRectangle(pos=self.pos, size=self.size, radius=[8])
+        self.bind(pos=self._update_bg, size=self._update_bg)
+
+        self._frame_event = None
+        self._refresh_event = None
+
+    def _update_bg(self, *_):
+        self._bg.pos = self.pos
+        self._bg.size = self.size
+
+    @property
+    def running(self):
+        return self._refresh_event is not None
+
+    def start(self):
+        """Starts frame sampling and refreshes the text twice a second."""
+        if self.running:
+            return
+        instrumentation.reset_frames()
+        self._frame_event = Clock.schedule_interval(instrumentation.record_frame, 0)
+        self._refresh_event = Clock.schedule_interval(self.refresh, 0.5)
+        self.refresh()
+
+    def stop(self):
+        """Stops all sampling; the HUD costs nothing while stopped."""
+        for event in (self._frame_event, self._refresh_event):
+            if event is not None:
+                event.cancel()
+        self._frame_event = self._refresh_event = None
+
+    def toggle(self, float_root):
+        """Shows the HUD on `float_root`, or hides it if it is already showing."""
+        if self.parent is not None:
+            self.stop()
+            self.parent.remove_widget(self)
+        else:
+            float_root.add_widget(self)
+            self.start()
+
+    def refresh(self, *_):
+        snapshot = instrumentation.snapshot()
+        frames = snapshot['frames']
+        lines = ['[b]Performance[/b]']
+
+        if frames:
+            lines.append(f"FPS {frames['fps']:5.1f}   max {frames['max_ms']:6.1f} ms")
+            lines.append(f"p50 {frames['p50_ms']:5.1f}  p95 {frames['p95_ms']:5.1f}  p99 {frames['p99_ms']:5.1f} ms")
+        else:
+            lines.append('FPS  --')
+
+        for key, label in HUD_OPERATIONS:
+            stats = snapshot['operations'].get(key)
+            if stats:
+                lines.append(f"{label:<14}{stats['last_ms']:7.1f} ms  (max {stats['max_ms']:.0f})")
+            else:
+                lines.append(f"{label:<14}     --")
+
+        widgets = sum(1 for child in Window.children for _ in child.walk())
+        lines.append(f"Widgets {widgets}   Clock events {len(Clock.get_events())}")
+        self.text = '\n'.join(lines)
+
+
+def find_hud(float_root):
+    """Returns the PerfHud already on `float_root`, if any (it survives UI rebuilds)."""
+    for child in float_root.children:
+        if isinstance(child, PerfHud):
+            return child
+    return None
@@ -8,13 +8,12 @@ Used in the monthly calendar view when a user taps "+N more..." or a day cell.
 Author: Attila Bordan
 """
 from kivy.uix.popup import Popup
-from kivy.uix.scrollview import ScrollView
-from kivy.uix.label import Label
 from kivy.uix.boxlayout import BoxLayout
 from kivy.graphics import Color, RoundedRectangle
-from kivy.utils import get_color_from_hex
 from kivy.clock import Clock
 
+from UI.components.event_list import EventListView
+
 
 def show_day_popup(day_date, events, theme):
     """
@@ -28,14 +27,12 @@ def show_day_popup(day_date, events, theme):
     # Root layout for the popup content
     day_popup_layout = BoxLayout(orientation='vertical', padding=10, spacing=10)
 
-    # Scrollable container to hold event labels
-    scroll = ScrollView(size_hint=(1, 1))
-    event_list = BoxLayout(orientation='vertical', size_hint_y=None, spacing=8, padding=5)
-    event_list.bind(minimum_height=event_list.setter('height'))
+    # Virtualized list: only the rows on screen are real widgets
+    event_list = EventListView(size_hint=(1, 1), row_padding=(5, 5), row_spacing=8, padding=(5, 5))
 
     # Theme colors
-    bg_color = get_color_from_hex(theme['bg_color'])
-    text_color = get_color_from_hex(theme['text_color'])
+    bg_color = theme.rgba.bg_color
+    text_color = theme.rgba.text_color
 
     # Draw background for the popup layout
     with day_popup_layout.canvas.before:
@@ -48,7 +45,8 @@ def show_day_popup(day_date, events, theme):
 
     day_popup_layout.bind(pos=update_bg, size=update_bg)
 
-    # Sort events by time and create labels
+    # Sort events by time and create rows
+    rows = []
     for event in sorted(events, key=lambda e: e.time):
         # TODO: Improve appearance
         # TODO: Add Close button
@@ -59,33 +57,23 @@ def show_day_popup(day_date, events, theme):
             event_text += f"\n[size=12]Location: {event.location}[/size]"
 
         if event.notes and event.notes.strip():
-            event_text += f"\n[size=12]Notes: {event.notes}[/size]\n"
-
-        label = Label(
-            text=event_text,
-            markup=True,
-            size_hint_y=None,
-            height=75,
-            color=text_color,
-            text_size=(None, None),
-        )
-        # Bind the width to make text wrap properly
-        label.bind(width=lambda inst, val: setattr(inst, 'text_size', (val, None)))
-        event_list.add_widget(label)
-
-    scroll.add_widget(event_list)
-    day_popup_layout.add_widget(scroll)
+            event_text += f"\n[size=12]Notes: {event.notes}[/size]"
+
+        rows.append((event_text, event, text_color))
+
+    event_list.set_rows(rows)
+    day_popup_layout.add_widget(event_list)
 
     # Construct the popup
     popup = Popup(
         title=f"Events for {day_date.strftime('%b %d')}",
-        title_color=get_color_from_hex(theme['text_color']),
+        title_color=text_color,
         title_align='center',
         content=day_popup_layout,
         size_hint=(0.3, 0.9),
         auto_dismiss=True,
         background='',
-        background_color=get_color_from_hex(theme['bg_color']),
+        background_color=bg_color,
     )
     popup.open()
 
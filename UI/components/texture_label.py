@@ -0,0 +1,119 @@
+"""
+texture_label.py
+
+A lightweight label widget that draws text from the shared texture cache.
+
+Unlike a regular Kivy Label, it never rasterizes text itself: identical text
+(same markup, font, size, color and width) reuses the texture rendered the
+first time, so rebuilding the calendar grid does not redraw any glyphs.
+
+Author: Attila Bordan
+"""
+from kivy.clock import Clock
+from kivy.uix.widget import Widget
+from kivy.graphics import Color, Rectangle
+from kivy.properties import (StringProperty, NumericProperty, ListProperty, BooleanProperty,
+                             OptionProperty)
+
+from app.text_cache import texture_cache
+
+
+class TextureLabel(Widget):
+    """
+    Displays (markup) text using a cached texture.
+
+    Properties:
+        text (str): Text to display, markup is always enabled.
+        font_name (str): Font name or path.
+        font_size (float): Font size, accepts '14sp' style values.
+        color (list): Base RGBA color.
+        bold (bool): Render the text in bold.
+        halign (str): 'left', 'center' or 'right'.
+        valign (str): 'top', 'middle' or 'bottom'.
+        wrap (bool): Wrap the text to the widget width (minus padding).
+        padding (list): [horizontal, vertical] padding in pixels.
+        texture_size (list): Size of the rendered text, read-only.
+    """
+    text = StringProperty('')
+    font_name = StringProperty('Roboto')
+    font_size = NumericProperty('15sp')
+    color = ListProperty([1, 1, 1, 1])
+    bold = BooleanProperty(False)
+    halign = OptionProperty('left', options=['left', 'center', 'right'])
+    valign = OptionProperty('middle', options=['top', 'middle', 'bottom'])
+    wrap = BooleanProperty(False)
+    padding = ListProperty([0, 0])
+    texture_size = ListProperty([0, 0])
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._texture = None
+        # Wrapped text depends on the width, which is Widget's default 100 px until the parent
+        # lays this label out: it is rendered after a size change, just before the next frame
+        self._trigger_refresh = Clock.create_trigger(self._refresh_texture, -1)
+
+        with self.canvas:
+            Color(1, 1, 1, 1)
+            self._rect = Rectangle(size=(0, 0))
+
+        self.bind(text=self._refresh_texture, font_name=self._refresh_texture,
+                  font_size=self._refresh_texture, color=self._refresh_texture,
+                  bold=self._refresh_texture, halign=self._refresh_texture,
+                  wrap=self._refresh_texture, padding=self._refresh_texture)
+        self.bind(pos=self._update_rect, valign=self._update_rect, size=self._on_size)
+        if not self.wrap or 'size' in kwargs or 'width' in kwargs:
+            self._refresh_texture()
+
+    def _on_size(self, *_):
+        # Only wrapped text depends on the width
+        if self.wrap:
+            self._trigger_refresh()
+        else:
+            self._update_rect()
+
+    def _refresh_texture(self, *_):
+        self._trigger_refresh.cancel()
+        width = self.width - 2 * self.padding[0] if self.wrap else None
+        if width is not None and width < 1:
+            # No room inside the padding yet (e.g. mid-layout); wait for the next size
+            self._texture = None
+            self._rect.texture = None
+            self.texture_size = [0, 0]
+            self._update_rect()
+            return
+        self._texture = texture_cache.get(
+            self.text,
+            font_name=self.font_name,
+            font_size=self.font_size,
+            color=self.color,
+            width=width,
+            halign=self.halign,
+            bold=self.bold,
+        )
+        self._rect.texture = self._texture
+        self.texture_size = list(self._texture.size) if self._texture else [0, 0]
+        self._update_rect()
+
+    def _update_rect(self, *_):
+        tw, th = self.texture_size
+        pad_x, pad_y = self.padding
+        # Not self.top/right/center: inside a pos callback those aliases may still hold the old values
+        x0, y0 = self.pos
+        width, height = self.size
+
+        if self.halign == 'left' or self.wrap:
+            x = x0 + pad_x
+        elif self.halign == 'right':
+            x = x0 + width - pad_x - tw
+        else:
+            x = x0 + (width - tw) / 2
+
+        if self.valign == 'top':
+            y = y0 + height - pad_y - th
+        elif self.valign == 'bottom':
+            y = y0 + pad_y
+        else:
+            y = y0 + (height - th) / 2
+
+        self._rect.pos = (int(x), int(y))
+        self._rect.size = (tw, th)
@@ -13,10 +13,13 @@ Author: Attila Bordan
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy.clock import Clock
-from kivy.uix.image import AsyncImage
+from kivy.uix.image import Image
 
+from UI.components.texture_label import TextureLabel
 from app.utils import get_time, get_date, get_day
-from app.api_utils import get_location, get_weather
+from app.weather_service import get_weather_service
+from app.weather_icons import get_icon_texture
+from app.tracing import traced
 
 
 class TopBar(BoxLayout):
@@ -26,16 +29,26 @@ class TopBar(BoxLayout):
 
     Automatically refreshes:
     - Time every second
-    - Weather once every hour
+    - Weather whenever the background weather service has a new reading
+
+    Args:
+        theme (CompiledTheme): Active theme.
+        on_long_press (callable, optional): Called when the bar is held for LONG_PRESS_DELAY seconds.
     """
-    def __init__(self, theme, **kwargs):
+    LONG_PRESS_DELAY = 1.0
+    # The first fetch (and the network imports it needs) waits until the first frames are drawn
+    WEATHER_START_DELAY = 1.0
+
+    def __init__(self, theme, on_long_press=None, **kwargs):
         super().__init__(**kwargs)
         self.orientation = 'horizontal'
         self.size_hint_y = 0.08
         self.padding = [20, 10]
         self.spacing = 20
         self.theme = theme
-        self.text_color = self.theme['text_color']
+        self.text_color = self.theme.hex.text_color
+        self.on_long_press = on_long_press
+        self._long_press = Clock.create_trigger(self._fire_long_press, self.LONG_PRESS_DELAY)
 
         # Get initial time and date
         self.current_time = str(get_time())
@@ -45,7 +58,7 @@ class TopBar(BoxLayout):
         # Weather icon and temperature
         self.weather_label = Label(text="", size_hint=(None, 1), width=60, halign='left', markup=True,
                                    font_size='20sp',)
-        self.weather_icon = AsyncImage(size_hint=(None, 1), width=50)
+        self.weather_icon = Image(size_hint=(None, 1), width=50)
 
         self.add_widget(self.weather_icon)
         self.add_widget(self.weather_label)
@@ -62,13 +75,16 @@ class TopBar(BoxLayout):
             text=f"[b][color={self.text_color}]{self.current_time}[/color][/b]",
             **label_style
         )
-        self.day_label = Label(
+        # Day and date change rarely, so they are drawn from the shared texture cache
+        self.day_label = TextureLabel(
             text=f"[b][color={self.text_color}]{self.current_day}[/color][/b]",
-            **label_style
+            font_size='20sp',
+            halign='center',
         )
-        self.date_label = Label(
+        self.date_label = TextureLabel(
             text=f"[b][color={self.text_color}]{self.current_date}[/color][/b]",
-            **label_style
+            font_size='20sp',
+            halign='center',
         )
 
         self.add_widget(self.time_label)
@@ -76,27 +92,57 @@ class TopBar(BoxLayout):
         self.add_widget(self.date_label)
 
         # Update time every second
-        Clock.schedule_interval(self.update_time, 1)
-        # Update weather once after 1s, then every 30 minutes
-        Clock.schedule_once(lambda dt: self.update_weather(), 1)
-        Clock.schedule_interval(lambda dt: self.update_weather(), 1800)
+        self._time_event = Clock.schedule_interval(self.update_time, 1)
+
+        # Weather is fetched on a background thread; the last good reading
+        # (from disk if nothing newer) is shown right away
+        self.weather_service = get_weather_service()
+        self.weather_service.subscribe(self.on_weather_reading)
+        self._weather_start = Clock.schedule_once(lambda dt: self.weather_service.start(), self.WEATHER_START_DELAY)
+
+    def stop(self):
+        """Cancels timers and weather updates, e.g. before the bar is rebuilt."""
+        self._time_event.cancel()
+        self._long_press.cancel()
+        self._weather_start.cancel()
+        self.weather_service.unsubscribe(self.on_weather_reading)
+
+    def on_touch_down(self, touch):
+        if self.on_long_press and self.collide_point(*touch.pos):
+            self._long_press()
+        return super().on_touch_down(touch)
+
+    def on_touch_move(self, touch):
+        # Any real drag cancels the long-press
+        if abs(touch.dx) > 5 or abs(touch.dy) > 5:
+            self._long_press.cancel()
+        return super().on_touch_move(touch)
+
+    def on_touch_up(self, touch):
+        self._long_press.cancel()
+        return super().on_touch_up(touch)
+
+    def _fire_long_press(self, dt):
+        if self.on_long_press:
+            self.on_long_press()
 
     def update_time(self, dt):
         """Refreshes the time label once per second."""
         self.current_time = str(get_time())
         self.time_label.text = f"[b][color={self.text_color}]{self.current_time}[/color][/b]"
 
-    def update_weather(self):
-        """Fetches weather info using location and updates label/icon."""
-        lat, lon, city = get_location()
-        if lat and lon:
-            celsius, fahrenheit, icon = get_weather(lat, lon)
-            if celsius is not None and icon:
-                self.weather_label.text = f"[b][color={self.text_color}]{celsius}°C / {fahrenheit}°F[/color][/b]"
-                self.weather_icon.source = f"http://openweathermap.org/img/wn/{icon}.png"
-            else:
-                self.weather_label.text = ""
-                self.weather_icon.source = "assets/default_weather.png"  # Optional fallback
+    def on_weather_reading(self, reading):
+        """Receives readings from the weather service (any thread) and applies them on the UI thread."""
+        Clock.schedule_once(lambda dt: self.update_weather(reading), 0)
+
+    @traced('TopBar.update_weather', cat='ui')
+    def update_weather(self, reading):
+        """Updates the weather label/icon from a weather service reading."""
+        # Icons come from the bundled atlas or local cache; no network or re-decoding here
+        if reading and reading.get('celsius') is not None and reading.get('icon'):
+            self.weather_label.text = (f"[b][color={self.text_color}]{reading['celsius']}°C / "
+                                       f"{reading['fahrenheit']}°F[/color][/b]")
+            self.weather_icon.texture = get_icon_texture(reading['icon'])
         else:
             self.weather_label.text = ""
-            self.weather_icon.source = "assets/default_weather.png"
+            self.weather_icon.texture = get_icon_texture(None)
@@ -12,9 +12,10 @@ Author: Attila Bordan
 """
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.label import Label
 from kivy.graphics import Color, RoundedRectangle
-from kivy.utils import get_color_from_hex
+
+from app.theme_manager import hex_to_rgba
+from UI.components.texture_label import TextureLabel
 
 
 class WeekdayHeader(GridLayout):
@@ -22,12 +23,23 @@ class WeekdayHeader(GridLayout):
     A themed weekday header row with optional dynamic dates.
 
     Args (passed via kwargs):
-        theme (dict): The active theme dictionary.
+        theme (CompiledTheme): The active theme.
         theme_manager (ThemeManager): Used to check auto-mode settings.
         dark_mode (bool): Whether dark mode is active.
         is_weekly_view (bool): Toggles between monthly and weekly label style.
         week_dates (list): List of 7 datetime.date objects if in weekly view.
     """
+    # Day names with their light-mode accent colors
+    DAYS_WITH_COLORS = [
+        ('Sun', '#FFB347'),  # Soft Amber – warm, energetic, and bright
+        ('Mon', '#6ECEDA'),  # Aqua Mist – calm, clean, and refreshing
+        ('Tue', '#FF6B6B'),  # Coral – bold, emotional, and attention-grabbing
+        ('Wed', '#A2D95E'),  # Spring Green – natural, balanced, and fresh
+        ('Thu', '#F9E55D'),  # Lemon – optimistic, light, and cheerful
+        ('Fri', '#F8A5C2'),  # Blush Pink – fun, soft, and celebratory
+        ('Sat', '#B39DDB')  # Lavender – relaxed, dreamy, and mellow
+    ]
+
     def __init__(self, **kwargs):
         theme = kwargs.pop('theme')
         theme_manager = kwargs.pop('theme_manager')
@@ -47,6 +59,8 @@ class WeekdayHeader(GridLayout):
         self.is_weekly_view = is_weekly_view
         self.week_dates = week_dates
 
+        # Header boxes are built once; view and week changes only relabel them
+        self.day_labels = []
         self.build_header()
 
     def build_header(self):
@@ -56,27 +70,21 @@ class WeekdayHeader(GridLayout):
         In weekly view, appends the day of the month to each label.
         In monthly view, only day names are shown.
         """
-        days_with_colors = [
-            ('Sun', '#FFB347'),  # Soft Amber – warm, energetic, and bright
-            ('Mon', '#6ECEDA'),  # Aqua Mist – calm, clean, and refreshing
-            ('Tue', '#FF6B6B'),  # Coral – bold, emotional, and attention-grabbing
-            ('Wed', '#A2D95E'),  # Spring Green – natural, balanced, and fresh
-            ('Thu', '#F9E55D'),  # Lemon – optimistic, light, and cheerful
-            ('Fri', '#F8A5C2'),  # Blush Pink – fun, soft, and celebratory
-            ('Sat', '#B39DDB')  # Lavender – relaxed, dreamy, and mellow
-        ]
-
-        # If we're in weekly view and have the week dates
-        if self.is_weekly_view and self.week_dates and len(self.week_dates) == 7:
-            # Use the week dates to create headers with date numbers
-            for i, (day_name, bg_color_light) in enumerate(days_with_colors):
-                date = self.week_dates[i]
-                day_text = f"{day_name} {date.day}"  # e.g., "Sun 20"
-                self._create_header_box(day_text, bg_color_light)
-        else:
-            # Regular monthly view - just day names
-            for day_name, bg_color_light in days_with_colors:
-                self._create_header_box(day_name, bg_color_light)
+        for day_name, bg_color_light in self.DAYS_WITH_COLORS:
+            self.day_labels.append(self._create_header_box(day_name, bg_color_light))
+        self._update_labels()
+
+    def _update_labels(self):
+        """Sets each header label's text for the current view mode and week."""
+        show_dates = self.is_weekly_view and self.week_dates and len(self.week_dates) == 7
+
+        for i, (day_name, bg_color_light) in enumerate(self.DAYS_WITH_COLORS):
+            # Use the week dates to show date numbers, e.g. "Sun 20"
+            day_text = f"{day_name} {self.week_dates[i].day}" if show_dates else day_name
+            self.day_labels[i].text = self._format_label(day_text, bg_color_light)
+
+    def _format_label(self, day_text, bg_color_light):
+        return f"[b][color={bg_color_light if self.dark_mode else self.theme.hex.text_color}]{day_text}[/color][/b]"
 
     def _create_header_box(self, day_text, bg_color_light):
         """
@@ -86,13 +94,16 @@ class WeekdayHeader(GridLayout):
         Args:
             day_text (str): Label text (e.g., 'Sun 14').
             bg_color_light (str): Default background hex color for that day.
+
+        Returns:
+            TextureLabel: The label, so it can be relabeled later.
         """
         box = BoxLayout()
-        bg_color = get_color_from_hex(bg_color_light)
+        bg_color = hex_to_rgba(bg_color_light)
 
         # Use theme background in auto-dark mode to maintain consistency
         if self.theme_manager.settings.get('auto_mode') and self.dark_mode:
-            bg_color = self.theme['bg_color']
+            bg_color = self.theme.rgba.bg_color
 
         # Draw background rectangle
         with box.canvas.before:
@@ -110,12 +121,13 @@ class WeekdayHeader(GridLayout):
         box.bind(pos=make_updater(box, rect), size=make_updater(box, rect))
 
         # Create styled label
-        label = Label(
-            text=f"[b][color={bg_color_light if self.dark_mode else self.theme['text_color']}]{day_text}[/color][/b]",
-            markup=True
+        label = TextureLabel(
+            text=self._format_label(day_text, bg_color_light),
+            halign='center',
         )
         box.add_widget(label)
         self.add_widget(box)
+        return label
 
     def update_weekly_dates(self, new_week_dates):
         """
@@ -125,6 +137,17 @@ class WeekdayHeader(GridLayout):
             new_week_dates (list): List of 7 datetime.date objects.
         """
         self.week_dates = new_week_dates
-        self.clear_widgets()
-        self.build_header()
+        self._update_labels()
+
+    def set_view_mode(self, is_weekly_view, week_dates=None):
+        """
+        Switches between monthly (day names) and weekly (day names with dates) labels.
+
+        Args:
+            is_weekly_view (bool): Whether the calendar is in weekly view.
+            week_dates (list, optional): List of 7 datetime.date objects for weekly view.
+        """
+        self.is_weekly_view = is_weekly_view
+        self.week_dates = week_dates
+        self._update_labels()
 
@@ -4,6 +4,10 @@ event_popup.py
 Popup class for adding a new calendar event.
 Includes required fields: title, date, time.
 Optional fields: location, notes.
+
+Building the form (and its virtual keyboard) is the slowest part of opening
+it, so instances are pooled: one is built at idle after startup and re-bound
+to an event or an empty form each time it opens.
 """
 
 from kivy.uix.popup import Popup
@@ -12,7 +16,6 @@ from kivy.uix.label import Label
 from kivy.uix.spinner import Spinner
 from kivy.uix.textinput import TextInput
 from kivy.uix.boxlayout import BoxLayout
-from kivy.utils import get_color_from_hex
 from kivy.graphics import Color as Colour, RoundedRectangle as RR, Rectangle
 from kivy.animation import Animation
 from kivy.clock import Clock
@@ -21,7 +24,12 @@ import datetime
 
 from storage.db_manager import save_event_to_db, stop_recurring_event, update_event_in_db, delete_event
 from app.ui_utils import create_themed_button
+from app.theme_manager import COMPILED_THEMES, hex_to_rgba
 from UI.components.keyboard import VirtualKeyboard
+from app.log import get_logger
+from app.tracing import traced
+
+logger = get_logger(__name__)
 
 
 class AddEventPopup(Popup):
@@ -35,40 +43,41 @@ class AddEventPopup(Popup):
     - Editing an existing event with pre-filled values
     - Toast-style inline validation feedback
     - Theme-aware background, input, and button styling
+
+    Widgets are created once; `bind_event()` resets the form for reuse.
+    Prefer `event_popup_pool.acquire()` over constructing popups directly.
     """
-    def __init__(self, app_ref, on_save_callback=None, theme=None, event=None, **kwargs):
-        self.app_ref = kwargs.pop('app_ref', None)
-        self.selected_date = kwargs.pop('initial_date', datetime.date.today())
+    def __init__(self, app_ref=None, on_save_callback=None, theme=None, event=None, initial_date=None, **kwargs):
         super().__init__(auto_dismiss=False, **kwargs)
-        self.app_ref = app_ref
-        self.theme = theme or {}
-        self.event = event
-        self.title = 'Edit Event' if self.event else 'Add Event'
-        self.title_color = get_color_from_hex(theme['text_color'])
+        self.theme = theme or COMPILED_THEMES['Light']
+        self.app_ref = None
+        self.event = None
+        self.on_save_callback = None
+        self.selected_date = None
+        self.title_color = self.theme.rgba.text_color
         self.title_align = 'center'
         self.size_hint = (0.5, 0.7)
-        self.on_save_callback = on_save_callback
         self.background = ''
-        self.background_color = get_color_from_hex(self.theme.get('bg_color', '#FFFFFF'))
+        self.background_color = self.theme.rgba.bg_color
         self.bg_color = self.theme.get('bg_color', '#FFFFFF')
 
         self.date_label = Label(
-            text=str(self.selected_date),
-            color=get_color_from_hex(self.theme.get('text_color', '#000000')),
+            text='',
+            color=self.theme.rgba.text_color,
             size_hint_y=None,
             height=40
         )
 
         # Styled Border + Rounded Background
         with self.canvas.before:
-            Colour(*self.theme.get('bg_color', '#FFFFFF'))
+            Colour(*self.theme.rgba.bg_color)
             self._popup_bg = RR(
                 pos=self.pos,
                 size=self.size,
                 radius=[15],
             )
 
-            Colour(*self.theme.get('popup_border_color', (0, 0, 0, 1)))  # Border overlay
+            Colour(*self.theme.rgba.popup_border_color)  # Border overlay
             self._popup_border = RR(
                 pos=self.pos,
                 size=self.size,
@@ -85,20 +94,20 @@ class AddEventPopup(Popup):
         # Required fields
         layout.add_widget(Label(
             text='Title:*',
-            color=get_color_from_hex(self.theme.get('text_color', '#000000')),
+            color=self.theme.rgba.text_color,
             size_hint_y=None,
             height=30
             ))
         self.title_input = TextInput(
             multiline=False,
-            background_color=self.theme.get('input_bg_color', '#FFFFFF'),
-            foreground_color=get_color_from_hex(self.theme.get('text_color', '#000000')),
+            background_color=self.theme.rgba.input_bg_color,
+            foreground_color=self.theme.rgba.text_color,
         )
         layout.add_widget(self.title_input)
 
         layout.add_widget(Label(
             text='Date:*',
-            color=get_color_from_hex(self.theme.get('text_color', '#000000')),
+            color=self.theme.rgba.text_color,
             size_hint_y=None,
             height=30
         ))
@@ -108,41 +117,41 @@ class AddEventPopup(Popup):
 
         layout.add_widget(Label(
             text='Time (HH:MM):*',
-            color=get_color_from_hex(self.theme.get('text_color', '#000000')),
+            color=self.theme.rgba.text_color,
             size_hint_y=None,
             height=30
         ))
         self.time_input = TextInput(
             multiline=False,
-            background_color=self.theme.get('input_bg_color', '#FFFFFF'),
-            foreground_color=get_color_from_hex(self.theme.get('text_color', '#000000')),
+            background_color=self.theme.rgba.input_bg_color,
+            foreground_color=self.theme.rgba.text_color,
         )
         layout.add_widget(self.time_input)
 
         # Optional fields
         layout.add_widget(Label(
             text='Location:',
-            color=get_color_from_hex(self.theme.get('text_color', '#000000')),
+            color=self.theme.rgba.text_color,
             size_hint_y=None,
             height=30
         ))
         self.location_input = TextInput(
             multiline=False,
-            background_color=self.theme.get('input_bg_color', '#FFFFFF'),
-            foreground_color=get_color_from_hex(self.theme.get('text_color', '#000000')),
+            background_color=self.theme.rgba.input_bg_color,
+            foreground_color=self.theme.rgba.text_color,
         )
         layout.add_widget(self.location_input)
 
         layout.add_widget(Label(
             text='Notes:',
-            color=get_color_from_hex(self.theme.get('text_color', '#000000')),
+            color=self.theme.rgba.text_color,
             size_hint_y=None,
             height=30
         ))
         self.notes_input = TextInput(
             multiline=False,
-            background_color=self.theme.get('input_bg_color', '#FFFFFF'),
-            foreground_color=get_color_from_hex(self.theme.get('text_color', '#000000')),
+            background_color=self.theme.rgba.input_bg_color,
+            foreground_color=self.theme.rgba.text_color,
         )
         # self.notes_input.bind(focus=lambda instance, value: show_virtual_keyboard() if value else None)
         layout.add_widget(self.notes_input)
@@ -156,7 +165,7 @@ class AddEventPopup(Popup):
             text='Repeat:',
             size_hint=(1, None),
             height=30,
-            color=get_color_from_hex(self.theme['text_color']),
+            color=self.theme.rgba.text_color,
             halign='left'
         )
         self.recurrence_spinner = Spinner(
@@ -164,46 +173,38 @@ class AddEventPopup(Popup):
             values=('None', 'Daily', 'Weekly', 'Monthly', 'Yearly'),
             size_hint=(1, None),
             height=44,
-            background_color=get_color_from_hex(self.theme['button_color']),
-            color=get_color_from_hex(self.theme['text_color']),
+            background_color=self.theme.rgba.button_color,
+            color=self.theme.rgba.text_color,
         )
 
         layout.add_widget(self.recurrence_label)
         layout.add_widget(self.recurrence_spinner)
 
-        # Buttons
-        button_box = BoxLayout(orientation='horizontal', spacing=10, size_hint_y=None, height=50)
-        # Only show 'Stop Recurrence' if editing a recurring event
-        if self.event and self.event.recurrence.lower() != "none":
-            self.stop_button = create_themed_button(
-                "Stop Recurrence",
-                self.theme,
-                on_release=self.handle_stop_recurrence
-            )
-            button_box.add_widget(self.stop_button)
-
-        # Only show 'Delete' if editing an existing event
-        if self.event and self.event.title != "none":
-            self.delete_button = create_themed_button(
-                "Delete",
-                self.theme,
-                on_release=self.handle_delete_event
-            )
-            button_box.add_widget(self.delete_button)
-
+        # Buttons (edit-only buttons are shown/hidden by bind_event)
+        self.button_box = BoxLayout(orientation='horizontal', spacing=10, size_hint_y=None, height=50)
+        self.stop_button = create_themed_button(
+            "Stop Recurrence",
+            self.theme,
+            on_release=self.handle_stop_recurrence
+        )
+        self.delete_button = create_themed_button(
+            "Delete",
+            self.theme,
+            on_release=self.handle_delete_event
+        )
         self.save_btn = create_themed_button('Save', self.theme, on_release=self.save_event)
         self.cancel_btn = create_themed_button('Cancel', self.theme, on_release=self.dismiss)
 
-        button_box.add_widget(self.cancel_btn)
-        button_box.add_widget(self.save_btn)
+        self.button_box.add_widget(self.cancel_btn)
+        self.button_box.add_widget(self.save_btn)
 
         self.keyboard = VirtualKeyboard(size_hint_y=None, height=200)
         self.keyboard.register_inputs(
             self.title_input,
-            self.time_input,
             self.location_input,
             self.notes_input
         )
+        self.keyboard.register_inputs(self.time_input, layer='numeric')
 
         # # Set natural focus order
         # self.title_input.next = self.time_input
@@ -213,25 +214,72 @@ class AddEventPopup(Popup):
         container = BoxLayout(orientation='vertical')
         container.add_widget(layout)
         container.add_widget(self.keyboard)
-        container.add_widget(button_box)
+        container.add_widget(self.button_box)
 
         self.content = container
+        self.toasts = []
 
-        if self.event:
-            self.title_input.text = self.event.title
-            self.date_label.text = self.event.date
-            self.time_input.text = self.event.time
-            self.location_input.text = self.event.location
-            self.notes_input.text = self.event.notes
-            self.recurrence_spinner.text = self.event.recurrence
+        self.bind_event(app_ref, on_save_callback, event, initial_date)
+
+    def bind_event(self, app_ref, on_save_callback=None, event=None, initial_date=None):
+        """
+        Prepares the (possibly reused) popup for a new or existing event.
 
-    def __del__(self):
-        print("🧹 AddEventPopup destroyed")
+        Args:
+            app_ref: The view that opened the popup (used for toasts and refreshes).
+            on_save_callback (callable, optional): Called with the event data after saving.
+            event (Event, optional): Event to edit, or None for an empty form.
+            initial_date (datetime.date, optional): Date for a new event, defaults to today.
+        """
+        self.reset()
+        self.app_ref = app_ref
+        self.on_save_callback = on_save_callback
+        self.event = event
+        self.selected_date = initial_date or datetime.date.today()
+        self.title = 'Edit Event' if event else 'Add Event'
+        self.date_label.text = str(self.selected_date)
+
+        if event:
+            self.title_input.text = event.title
+            self.date_label.text = event.date
+            self.time_input.text = event.time
+            self.location_input.text = event.location
+            self.notes_input.text = event.notes
+            self.recurrence_spinner.text = event.recurrence
+
+        # Only show 'Stop Recurrence' if editing a recurring event,
+        # and 'Delete' if editing an existing event
+        edit_buttons = []
+        if event and event.recurrence.lower() != "none":
+            edit_buttons.append(self.stop_button)
+        if event and event.title != "none":
+            edit_buttons.append(self.delete_button)
+        for button in (self.stop_button, self.delete_button):
+            if button.parent:
+                self.button_box.remove_widget(button)
+        for button in reversed(edit_buttons):
+            self.button_box.add_widget(button, index=len(self.button_box.children))
+
+    def reset(self):
+        """Clears the form in place, without creating or destroying any widgets."""
+        for text_input in (self.title_input, self.time_input, self.location_input, self.notes_input):
+            text_input.focus = False
+            text_input.text = ''
+        self.recurrence_spinner.text = 'None'
+        self.keyboard.reset()
+
+        for toast in self.toasts:
+            if toast.parent:
+                toast.parent.remove_widget(toast)
+        self.toasts = []
+
+        self.opacity = 1
 
     def set_selected_date(self, date_obj):
         """Sets the popup's displayed date label to the given date."""
         self.date_label.text = str(date_obj)
 
+    @traced('AddEventPopup.save_event', cat='ui')
     def save_event(self, *_):
         """
         Validates and saves the event to the database.
@@ -269,16 +317,13 @@ class AddEventPopup(Popup):
         if self.on_save_callback:
             self.on_save_callback(event_data)
 
+        # Dismissing releases the popup back to the pool, which clears app_ref
+        app_ref = self.app_ref
         self.dismiss()
 
         # Show the app toast only after popup is dismissed
-        if hasattr(self.app_ref, "show_toast"):
-            self.app_ref.show_toast(f"Event '{event_data['title']}' added!")
-
-        # Refresh calendar to show new event
-        if hasattr(self.app_ref, "build_view"):
-            self.app_ref.selected_day = None
-            self.app_ref.build_view(self.app_ref.current_year, self.app_ref.current_month)
+        if hasattr(app_ref, "show_toast"):
+            app_ref.show_toast(f"Event '{event_data['title']}' added!")
 
     def _update_popup_border(self, *_):
         """Keeps the styled popup border in sync with the popup's size and position."""
@@ -300,7 +345,7 @@ class AddEventPopup(Popup):
             pos_hint={'center_x': 0.5, 'center_y': 0.5},
             halign='center',
             valign='middle',
-            color=get_color_from_hex('#FFFFFF'),
+            color=hex_to_rgba('#FFFFFF'),
             padding=(20, 10),
             font_size='16sp',
         )
@@ -308,7 +353,7 @@ class AddEventPopup(Popup):
         # Set the background color (red for errors)
         toast.canvas.before.clear()
         with toast.canvas.before:
-            Colour(*get_color_from_hex('#FF4C4C'))
+            Colour(*hex_to_rgba('#FF4C4C'))
             toast_bg = RR(pos=toast.pos, size=toast.size, radius=[10])
 
         # Update the background when the label size changes
@@ -320,6 +365,7 @@ class AddEventPopup(Popup):
 
         # Add to popup content
         self.content.add_widget(toast)
+        self.toasts.append(toast)
 
         # Animate in
         toast.opacity = 0
@@ -328,7 +374,7 @@ class AddEventPopup(Popup):
         # Animate out after a delay
         def remove_toast(*_):
             anim_out = Animation(opacity=0, duration=0.2)
-            anim_out.bind(on_complete=lambda *x: self.content.remove_widget(toast))
+            anim_out.bind(on_complete=lambda *x: toast.parent and toast.parent.remove_widget(toast))
             anim_out.start(toast)
 
         anim_in.start(toast)
@@ -341,16 +387,17 @@ class AddEventPopup(Popup):
         """
         if self.event and stop_recurring_event(self.event.id):
             self.show_popup_toast("Recurrence stopped.")
+            app_ref = self.app_ref
             self.dismiss()
 
             # Delay the calendar refresh to occur AFTER the popup closes
             def refresh_ui(dt):
-                if hasattr(self.app_ref, "rebuild_ui"):
-                    float_root = getattr(self.app_ref, "float_root", None)
+                if hasattr(app_ref, "rebuild_ui"):
+                    float_root = getattr(app_ref, "float_root", None)
                     if float_root:
-                        self.app_ref.rebuild_ui(float_root)
+                        app_ref.rebuild_ui(float_root)
                     else:
-                        print("⚠️ Warning: float_root not found for rebuild.")
+                        logger.warning('float_root not found for rebuild')
 
             Clock.schedule_once(refresh_ui, 0.3)
         else:
@@ -364,24 +411,74 @@ class AddEventPopup(Popup):
         """
         if self.event and delete_event(self.event.id):
             self.show_popup_toast("Evnet deleted.")
+            app_ref = self.app_ref
             self.dismiss()
 
             # Delay the calendar refresh to occur AFTER the popup closes
             def refresh_ui(dt):
-                if hasattr(self.app_ref, "rebuild_ui"):
-                    float_root = getattr(self.app_ref, "float_root", None)
+                if hasattr(app_ref, "rebuild_ui"):
+                    float_root = getattr(app_ref, "float_root", None)
                     if float_root:
-                        self.app_ref.rebuild_ui(float_root)
+                        app_ref.rebuild_ui(float_root)
                     else:
-                        print("⚠️ Warning: float_root not found for rebuild.")
+                        logger.warning('float_root not found for rebuild')
 
             Clock.schedule_once(refresh_ui, 0.3)
         else:
             self.show_popup_toast("Unable to delete event.")
 
     def on_dismiss(self):
-        if hasattr(self, "keyboard") and self.keyboard:
-            if self.keyboard.parent:
-                self.keyboard.parent.remove_widget(self.keyboard)
-            self.keyboard = None
-        self.content = None
+        # Drop references to the caller so a pooled popup doesn't keep old views alive
+        self.app_ref = None
+        self.on_save_callback = None
+        self.event = None
+        self.keyboard.active_input = None
+
+
+class EventPopupPool:
+    """
+    Keeps a prebuilt AddEventPopup per theme so opening one only re-binds its data.
+
+    Only the current theme's popup is kept; switching themes drops the old one.
+    """
+    def __init__(self):
+        self._idle = {}
+
+    def prewarm(self, theme, *_):
+        """Builds an idle popup for the theme ahead of time (e.g. from a Clock callback)."""
+        if theme.name not in self._idle:
+            self._idle = {theme.name: self._create(theme)}
+
+    def acquire(self, theme, app_ref, on_save_callback=None, event=None, initial_date=None):
+        """
+        Returns a popup bound to the given event (or an empty form), ready to open.
+
+        Args:
+            theme (CompiledTheme): Theme the popup must use.
+            app_ref: The view opening the popup.
+            on_save_callback (callable, optional): Called with the event data after saving.
+            event (Event, optional): Event to edit, or None to add a new one.
+            initial_date (datetime.date, optional): Date for a new event.
+
+        Returns:
+            AddEventPopup: The popup (not yet opened).
+        """
+        popup = self._idle.pop(theme.name, None)
+        # Still fading out from its last use: build a fresh one instead of waiting
+        if popup is None or popup.parent is not None:
+            popup = self._create(theme)
+        popup.bind_event(app_ref, on_save_callback, event, initial_date)
+        return popup
+
+    def release(self, popup, *_):
+        """Returns a dismissed popup to the pool."""
+        self._idle = {popup.theme.name: popup}
+
+    def _create(self, theme):
+        popup = AddEventPopup(theme=theme)
+        popup.bind(on_dismiss=self.release)
+        return popup
+
+
+# Shared pool used by the calendar views
+event_popup_pool = EventPopupPool()
@@ -12,12 +12,27 @@ from kivy.uix.spinner import Spinner
 from kivy.uix.switch import Switch
 from kivy.uix.scrollview import ScrollView
 from kivy.graphics import Color, RoundedRectangle
-from kivy.utils import get_color_from_hex
 
 from app.ui_utils import create_themed_button
 from UI.components.keyboard import VirtualKeyboard
 
 
+def parse_coordinate(text):
+    """
+    Converts a coordinate input to a float.
+    :param text: Text typed into a latitude/longitude field
+    :return: float, None if the field is empty, or the text itself if it is not a number
+             (set_location_override rejects it and keeps the saved location).
+    """
+    text = text.strip()
+    if not text:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
 def create_settings_popup(theme_manager, apply_callback, theme):
     """
     Constructs and returns a Settings Popup UI
@@ -32,8 +47,8 @@ def create_settings_popup(theme_manager, apply_callback, theme):
     scroll.add_widget(settings_area)
 
     # Background color
-    bg_color = get_color_from_hex(theme['bg_color'])
-    text_color = get_color_from_hex(theme['text_color'])
+    bg_color = theme.rgba.bg_color
+    text_color = theme.rgba.text_color
 
     # Apply background rectangle
     with settings_area.canvas.before:
@@ -54,7 +69,7 @@ def create_settings_popup(theme_manager, apply_callback, theme):
         size_hint_y=None,
         height=44,
         background_normal='',
-        background_color=get_color_from_hex(theme['button_color']),
+        background_color=theme.rgba.button_color,
         color=text_color,
     )
     settings_area.add_widget(theme_spinner)
@@ -89,32 +104,43 @@ def create_settings_popup(theme_manager, apply_callback, theme):
     )
     settings_area.add_widget(dark_input)
 
+    # Manual weather location (leave blank to detect it from the IP address)
+    override = theme_manager.get_location_override() or ('', '', '')
+    location_inputs = []
+    for label_text, value, hint in (('Weather Latitude:', override[0], 'e.g. 47.50'),
+                                    ('Weather Longitude:', override[1], 'e.g. 19.04'),
+                                    ('Weather City:', override[2], 'optional')):
+        settings_area.add_widget(Label(text=label_text, size_hint_y=None, height=30, color=text_color))
+        location_input = TextInput(
+            text=str(value),
+            hint_text=hint,
+            multiline=False,
+            size_hint_y=None,
+            height=44
+        )
+        settings_area.add_widget(location_input)
+        location_inputs.append(location_input)
+    lat_input, lon_input, city_input = location_inputs
+
     settings_popup_layout = BoxLayout(orientation='vertical')
     settings_popup_layout.add_widget(scroll)
 
     vk = VirtualKeyboard(size_hint_y=None, height=200)
-    vk.register_inputs(light_input, dark_input)
+    vk.register_inputs(city_input)
+    vk.register_inputs(light_input, dark_input, lat_input, lon_input, layer='numeric')
     settings_popup_layout.add_widget(vk)
 
     popup = Popup(
         title='Settings',
-        title_color=get_color_from_hex(theme['text_color']),
+        title_color=text_color,
         title_align='center',
         content=settings_popup_layout,
         size_hint=(0.5, 0.7),
         background='',
-        background_color=get_color_from_hex(theme['bg_color']),
+        background_color=bg_color,
         auto_dismiss=False,
         )
 
-    def block_extra_touches(instance, touch):
-        if instance.collide_point(*touch.pos):
-            print(f"[DEBUG] Touch inside popup at {touch.pos}")
-            return False  # Let Kivy continue handling the event
-        return False
-
-    popup.bind(on_touch_down=block_extra_touches)
-
     def toggle_spinner_state(*_):
         theme_spinner.disabled = auto_mode_switch.active
 
@@ -123,6 +149,8 @@ def create_settings_popup(theme_manager, apply_callback, theme):
         theme_manager.toggle_auto_mode(auto_mode_switch.active)
         theme_manager.set_custom_theme(theme_spinner.text)
         theme_manager.set_dark_light_times(light_input.text, dark_input.text)
+        theme_manager.set_location_override(parse_coordinate(lat_input.text), parse_coordinate(lon_input.text),
+                                            city_input.text.strip())
         theme_manager.update_theme()
         popup.dismiss()
         apply_callback()  # Refresh UI
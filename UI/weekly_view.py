@@ -12,18 +12,18 @@ This gives 7 tall columns, one per day, each with 24 vertical rows.
 """
 
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.scrollview import ScrollView
-from kivy.uix.label import Label
 from kivy.graphics import Color, Line, Rectangle
-from kivy.utils import get_color_from_hex
-from kivy.clock import Clock
 from kivy.animation import Animation
 
 import datetime
 
 from storage.db_manager import get_events_for_week
-from app.api_utils import is_event_on_date
-from UI.event_popup import AddEventPopup
+from app.recurrence import is_event_on_date
+from app.weather_service import get_weather_service
+from app.instrumentation import timed_function
+from UI.event_popup import event_popup_pool
+from UI.components.event_list import EventListView
+from UI.components.forecast_badge import ForecastBadge
 
 
 class WeeklyView(BoxLayout):
@@ -37,16 +37,41 @@ class WeeklyView(BoxLayout):
         super().__init__(**kwargs)
         self.orientation = 'horizontal'
         self.theme = theme
-        self.border_color = get_color_from_hex(theme['border_color'])
-        self.text_color = self.theme['text_color']
+        self.border_color = theme.rgba.border_color
+        self.text_color = self.theme.hex.text_color
         self.size_hint = (1, 1)
         self.spacing = 0  # No spacing between columns
 
-        self.build_view()
+        # Columns are built once and reused; navigation only swaps their data
+        self.week_dates = []
+        self.event_lists = []
+        self.forecast_badges = []
+        self._column_signatures = [None] * 7
+        for _ in range(7):
+            day_column, event_list, forecast_badge = self.create_day_column()
+            self.event_lists.append(event_list)
+            self.forecast_badges.append(forecast_badge)
+            self.add_widget(day_column)
+
+        # Add vertical lines between columns at the container level for better visibility
+        def update_all_borders(instance, value):
+            instance.canvas.after.clear()
+            with instance.canvas.after:
+                for i in range(6):  # 6 dividers between 7 columns
+                    col_width = instance.width / 7
+                    x_pos = (i + 1) * col_width
+
+                    Color(*self.border_color)
+                    Line(
+                        points=[x_pos, instance.y, x_pos, instance.y + instance.height],
+                        width=1.2
+                    )
+
+        self.bind(pos=update_all_borders, size=update_all_borders)
 
         # Divider below view pane
         with self.canvas:
-            Color(*get_color_from_hex(self.theme['border_color']))
+            Color(*self.border_color)
             self.divider_line = Rectangle(
                 pos=(self.x, self.y + self.height * 0.945),
                 size=(self.width, 1),
@@ -66,196 +91,115 @@ class WeeklyView(BoxLayout):
         sunday = reference_date - datetime.timedelta(days=days_since_sunday)
         return [sunday + datetime.timedelta(days=i) for i in range(7)]
 
-    def create_event_box(self, event, date):
-        # Event container
-        event_box = BoxLayout(
-            orientation='vertical',
-            size_hint_y=None,
-            height=150,
-            padding=(5, 5),
-        )
-
-        # Conditionally include location and notes only if they're not empty
-        event_text = f"[b][color={self.theme['time_color']}]{event.time}[/color][/b]\n" + \
-                     f"[color={self.text_color}]{event.title}[/color]"
+    def format_event_text(self, event):
+        """Builds the markup shown for one event row (time, title and optional location)."""
+        # Conditionally include location only if it's not empty
+        tag = self.theme.tag
+        event_text = f"[b]{tag.time_color}{event.time}[/color][/b]\n{tag.text_color}{event.title}[/color]"
 
         if event.location and event.location.strip():
-            event_text += f"\n[size=14][color={self.theme['location_color']}][u]Location:[/u] " \
-                          f"{event.location}[/color][/size]"
-
-        # Event content
-        event_label = Label(
-            text=event_text,
-            markup=True,
-            size_hint_y=None,
-            text_size=(None, None),
-            halign='left',
-            valign='top',
-            padding=(10, 10),
+            event_text += f"\n[size=14]{tag.location_color}[u]Location:[/u] {event.location}[/color][/size]"
+        return event_text
+
+    def create_day_column(self):
+        """
+        Creates one empty day column: a vertical border, a forecast strip
+        and a virtualized event list.
+
+        Returns:
+            tuple: (day_column, event_list, forecast_badge)
+        """
+        # Column container
+        day_column = BoxLayout(orientation='vertical', size_hint_x=1 / 7)
+
+        # Draw vertical borderline
+        with day_column.canvas.after:
+            Color(*self.border_color)
+            v_line = Line(points=[0, 0, 0, 0], width=1.2)
+
+            def update_v_line(inst, val):
+                v_line.points = [inst.right, inst.y, inst.right, inst.top]
+
+            day_column.bind(pos=update_v_line, size=update_v_line)
+
+        # Scrollable events list, only visible rows exist as widgets
+        event_list = EventListView(
+            on_select=self.open_event_popup,
+            size_hint=(1, 1),
+            bar_width=8,
+            scroll_type=['bars', 'content'],
+            bar_color=self.theme.rgba.scrollbar_color,
+            bar_inactive_color=self.theme.rgba.scrollbar_inactive_color,
+            effect_cls='ScrollEffect',
         )
 
-        def update_label_size(label, width):
-            # Set text_size to constrain width and allow flowing text
-            label.text_size = (width - 20, None)
-
-            # After next render, texture_size will have the real required size
-            Clock.schedule_once(lambda dt: adjust_height(label), 0)
-
-        def adjust_height(label):
-            # Set height based on texture_size with padding
-            new_height = label.texture_size[1] + 20
-            label.height = new_height
-            label.parent.height = new_height + 10  # parent is event_box
-
-        # Bind width changes to update_label_size
-        event_label.bind(width=update_label_size)
-        event_box.add_widget(event_label)
-
-        def draw_bottom_border(widget, *_):
-            widget.canvas.after.clear()
-            with widget.canvas.after:
-                Color(*self.border_color)
-                Line(points=[widget.x, widget.y, widget.right, widget.y], width=1.2)
-
-        def create_event_tap(event_ref, event_box_ref):
-            def on_event_tap(instance, touch):
-                if event_box_ref.collide_point(*touch.pos):
-                    popup = AddEventPopup(
-                        app_ref=self,
-                        theme=self.theme,
-                        event=event_ref,
-                        on_save_callback=self.update_week_with_today
-                    )
-                    popup.opacity = 0
-                    popup.open()
-                    anim = Animation(opacity=1, d=0.3, t='out_quad')
-                    anim.start(popup)
-                    return True
-                return False
-
-            return on_event_tap
-
-        event_box.bind(on_touch_down=create_event_tap(event, event_box))
-        return event_box
-
-    def build_view(self):
-        self.clear_widgets()
-
-        # Get week dates and events
-        week_dates = self.get_current_week_dates()
-        first_day = week_dates[0]
-        event_dict = get_events_for_week(first_day.year, first_day.isocalendar().week)
-
-        # Create 7 columns, one for each day
-        for i, date in enumerate(week_dates):
-            # Column container
-            day_column = BoxLayout(orientation='vertical', size_hint_x=1 / 7)
-
-            # Draw vertical borderline
-            with day_column.canvas.after:
-                Color(*self.border_color)
-                v_line = Line(points=[0, 0, 0, 0], width=1.2)
-
-                def update_v_line(inst, val):
-                    v_line.points = [inst.right, inst.y, inst.right, inst.top]
-                day_column.bind(pos=update_v_line, size=update_v_line)
-
-            # Scrollable events container
-            scroll = ScrollView(size_hint=(1, 1))
-            events_layout = BoxLayout(
-                orientation='vertical',
-                size_hint_y=None,
-                spacing=5,
-                padding=(0, 20),
-            )
-            events_layout.bind(minimum_height=events_layout.setter('height'))
-
-            # Sort events chronologically
-            events = (event_dict.get(str(date), []))
-
-            if not events:
-                events = []
+        # Forecast strip, filled in by update_forecast()
+        forecast_badge = ForecastBadge(self.text_color, size_hint=(1, None), height=24, padding=[8, 2])
 
-            # Filter events for this specific day (including recurring)
-            all_weekly_events = [e for e in events if is_event_on_date(e, date)]
-
-            # Add each event to the column
-            for event in all_weekly_events:
-                event_box = self.create_event_box(event, date)
-                events_layout.add_widget(event_box)
-
-            scroll.add_widget(events_layout)
-            day_column.add_widget(scroll)
-            self.add_widget(day_column)
+        day_column.add_widget(forecast_badge)
+        day_column.add_widget(event_list)
+        return day_column, event_list, forecast_badge
 
-        # Add vertical lines between columns at the container level for better visibility
-        def update_all_borders(instance, value):
-            instance.canvas.after.clear()
-            with instance.canvas.after:
-                for i in range(6):  # 6 dividers between 7 columns
-                    col_width = instance.width / 7
-                    x_pos = (i + 1) * col_width
-
-                    Color(*self.border_color)
-                    Line(
-                        points=[x_pos, instance.y, x_pos, instance.y + instance.height],
-                        width=1.2
-                    )
-
-        self.bind(pos=update_all_borders, size=update_all_borders)
+    def open_event_popup(self, event):
+        """Opens the edit popup for an existing event with a fade-in."""
+        popup = event_popup_pool.acquire(
+            self.theme,
+            app_ref=self,
+            event=event,
+            on_save_callback=self.refresh
+        )
+        popup.opacity = 0
+        popup.open()
+        anim = Animation(opacity=1, d=0.3, t='out_quad')
+        anim.start(popup)
+        return True
 
     def update_week_with_today(self, *_):
         """Force weekly view to rebuild around today's date"""
         today = datetime.date.today()
         self.update_week(today)
 
+    def refresh(self, *_):
+        """Re-queries the week currently on screen, updating only changed columns."""
+        self.update_week(self.week_dates[0] if self.week_dates else datetime.date.today())
+
+    @timed_function('weekly_update')
     def update_week(self, reference_date):
-        """Rebuilds the weekly view starting from the given reference date."""
-        self.clear_widgets()
+        """
+        Shows the week containing the given reference date.
+
+        Columns are reused: only days whose events actually changed
+        get new row data.
+        """
         week_dates = self.get_current_week_dates(reference_date)
         first_day = week_dates[0]
-        event_dict = get_events_for_week(first_day.year, first_day.isocalendar().week)
-
-        for i, date in enumerate(week_dates):
-            # Column container
-            day_column = BoxLayout(orientation='vertical', size_hint_x=1 / 7)
-
-            # Draw vertical borderline
-            with day_column.canvas.after:
-                Color(*self.border_color)
-                v_line = Line(points=[0, 0, 0, 0], width=1.2)
-
-                def update_v_line(inst, val):
-                    v_line.points = [inst.right, inst.y, inst.right, inst.top]
-
-                day_column.bind(pos=update_v_line, size=update_v_line)
-
-            # Scrollable events container
-            scroll = ScrollView(
-                size_hint=(1, 1),
-                bar_width=8,
-                scroll_type=['bars', 'content'],
-                bar_color=get_color_from_hex(self.theme.get('scrollbar_color', '#888888')),
-                bar_inactive_color=get_color_from_hex(self.theme.get('scrollbar_inactive_color', '#555555')),
-                effect_cls='ScrollEffect',
-            )
-            events_layout = BoxLayout(
-                orientation='vertical',
-                size_hint_y=None,
-                spacing=0,
-                padding=(0, 20),
-            )
-            events_layout.bind(minimum_height=events_layout.setter('height'))
+        iso_year, iso_week, _ = first_day.isocalendar()
+        event_dict = get_events_for_week(iso_year, iso_week)
+        self.week_dates = week_dates
 
+        for column, date in enumerate(week_dates):
             # Sort events chronologically
             events = sorted(event_dict.get(str(date), []), key=lambda e: e.time)
             all_weekly_events = [e for e in events if is_event_on_date(e, date)]
 
-            # Add each event to the column
-            for event in all_weekly_events:
-                event_box = self.create_event_box(event, date)
-                events_layout.add_widget(event_box)
+            # Skip columns whose content is identical to what is already shown
+            # (every field the edit popup reads, so its Event objects never go stale)
+            signature = tuple(
+                (e.id, e.date, e.time, e.title, e.location, e.notes, e.recurrence, e.recurrence_end)
+                for e in all_weekly_events
+            )
+            if signature == self._column_signatures[column]:
+                continue
+            self._column_signatures[column] = signature
 
-            scroll.add_widget(events_layout)
-            day_column.add_widget(scroll)
-            self.add_widget(day_column)
+            self.event_lists[column].set_rows(
+                [(self.format_event_text(event), event, (1, 1, 1, 1)) for event in all_weekly_events]
+            )
+
+        self.update_forecast()
+
+    def update_forecast(self, *_):
+        """Shows the cached forecast for each visible day (no network access)."""
+        weather_service = get_weather_service()
+        for badge, date in zip(self.forecast_badges, self.week_dates):
+            badge.set_forecast(weather_service.get_forecast(str(date)))
@@ -1,112 +1,191 @@
 """
 api_utils.py
 
-Handles external API interactions and logic for determining
-event recurrence in the Family Calendar app.
+Handles external API interactions for the Family Calendar app.
 
 Includes:
 - IP-based geolocation
 - Weather fetching via OpenWeatherMap
-- Recurrence-based event matching
+
+All requests go through the shared pooled client in app/http_client.py.
+The .env file and the API settings are read on the first request, not at
+import, so nothing here slows down the first frame.
 
 Author: Attila Bordan
 """
 
-import datetime as dt
-import requests
 import os
-from dotenv import load_dotenv
+from functools import lru_cache
 
-load_dotenv()
-API_KEY = os.getenv('api_key')
-token = os.getenv('TOKEN')
+from app import http_client
+from app.log import get_logger
 
+logger = get_logger(__name__)
 
-def get_location():
+# Seconds to wait for a connection / response before giving up
+DEFAULT_TIMEOUT = http_client.DEFAULT_TIMEOUT
+
+
+@lru_cache(maxsize=None)
+def api_config():
     """
-    Attempts to retrieve the user's geographical location using their IP address.
+    Loads .env (once) and returns the API settings.
+
+    Base URLs can be overridden, e.g. to point at a local stub server.
 
     Returns:
-        tuple: (latitude: float, longitude: float, city: str) or (None, None, None) on failure.
+        dict: api_key, token, location_url and weather_url.
     """
-    try:
-        response = requests.get(f"https://ipinfo.io/json?token={token}")
-        data = response.json()
-        loc = data.get('loc')
-        city = data.get('city')
-        lat, lon = map(float, loc.split(','))
-        return lat, lon, city
-    except Exception as e:
-        print("Failed to get location", e)
-        return None, None, None
+    from dotenv import load_dotenv
 
+    load_dotenv()
+    return {
+        'api_key': os.getenv('api_key'),
+        'token': os.getenv('TOKEN'),
+        'location_url': os.getenv('LOCATION_API_URL', 'https://ipinfo.io/json'),
+        'weather_url': os.getenv('WEATHER_API_URL', 'https://api.openweathermap.org/data/2.5'),
+    }
 
-def get_weather(lat, lon):
+
+def fetch_location(timeout=DEFAULT_TIMEOUT):
+    """
+    Looks up the user's geographical location by IP address.
+
+    Args:
+        timeout (float): Request timeout in seconds.
+
+    Returns:
+        tuple: (latitude: float, longitude: float, city: str)
+
+    Raises:
+        Exception: On network errors, timeouts or an unexpected response.
+    """
+    config = api_config()
+    response = http_client.get_client().get(config['location_url'], params={'token': config['token']},
+                                            timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
+    city = data.get('city')
+    lat, lon = map(float, data['loc'].split(','))
+    return lat, lon, city
+
+
+def fetch_weather(lat, lon, timeout=DEFAULT_TIMEOUT):
     """
     Retrieves current temperature and weather icon from OpenWeatherMap API.
 
     Args:
         lat (float): Latitude
         lon (float): Longitude
+        timeout (float): Request timeout in seconds.
+
+    Returns:
+        tuple: (celsius: int, fahrenheit: int, icon_code: str)
+
+    Raises:
+        Exception: On network errors, timeouts or an unexpected response.
+    """
+    config = api_config()
+    response = http_client.get_client().get(
+        f"{config['weather_url']}/weather",
+        params={'lat': lat, 'lon': lon, 'units': 'metric', 'appid': config['api_key']},
+        timeout=timeout,
+        conditional=True,
+    )
+    response.raise_for_status()
+    data = response.json()
+    celsius = round(data["main"]["temp"])
+    fahrenheit = round((celsius * (9/5)) + 32)
+    icon = data["weather"][0]["icon"]
+    return celsius, fahrenheit, icon
+
+
+def fetch_forecast(lat, lon, timeout=DEFAULT_TIMEOUT):
+    """
+    Retrieves the multi-day forecast in a single OpenWeatherMap call
+    and summarizes it per day.
+
+    Args:
+        lat (float): Latitude
+        lon (float): Longitude
+        timeout (float): Request timeout in seconds.
+
+    Returns:
+        dict: ISO date string -> {'high': int, 'low': int, 'icon': str}
+
+    Raises:
+        Exception: On network errors, timeouts or an unexpected response.
+    """
+    config = api_config()
+    response = http_client.get_client().get(
+        f"{config['weather_url']}/forecast",
+        params={'lat': lat, 'lon': lon, 'units': 'metric', 'appid': config['api_key']},
+        timeout=timeout,
+        conditional=True,
+    )
+    response.raise_for_status()
+    return summarize_forecast(response.json()["list"])
+
+
+def summarize_forecast(entries):
+    """
+    Collapses 3-hourly forecast entries into one summary per day.
+
+    The day's icon is taken from the entry closest to midday.
+
+    Args:
+        entries (list): OpenWeatherMap forecast entries (with dt_txt, main and weather).
+
+    Returns:
+        dict: ISO date string -> {'high': int, 'low': int, 'icon': str}
+    """
+    days = {}
+    for entry in entries:
+        date_str, time_str = entry["dt_txt"].split(" ")
+        hour = int(time_str[:2])
+        day = days.setdefault(date_str, {'high': None, 'low': None, 'icon': None, '_midday_distance': 24})
+
+        high, low = entry["main"]["temp_max"], entry["main"]["temp_min"]
+        day['high'] = high if day['high'] is None else max(day['high'], high)
+        day['low'] = low if day['low'] is None else min(day['low'], low)
+
+        if abs(hour - 12) < day['_midday_distance']:
+            day['_midday_distance'] = abs(hour - 12)
+            day['icon'] = entry["weather"][0]["icon"]
+
+    return {
+        date_str: {'high': round(day['high']), 'low': round(day['low']), 'icon': day['icon']}
+        for date_str, day in days.items()
+    }
+
+
+def get_location():
+    """
+    Attempts to retrieve the user's geographical location using their IP address.
 
     Returns:
-        tuple: (temperature: int, icon_code: str) or (None, None) on failure
+        tuple: (latitude: float, longitude: float, city: str) or (None, None, None) on failure.
     """
     try:
-        url = (
-            f"https://api.openweathermap.org/data/2.5/weather?"
-            f"lat={lat}&lon={lon}&units=metric&appid={API_KEY}"
-        )
-        response = requests.get(url)
-        data = response.json()
-        celsius = round(data["main"]["temp"])
-        fahrenheit = round((celsius * (9/5)) + 32)
-        icon = data["weather"][0]["icon"]
-        return celsius, fahrenheit, icon
+        return fetch_location()
     except Exception as e:
-        print("Failed to get weather:", e)
-        return None, None
+        logger.warning('Failed to get location: %s', e)
+        return None, None, None
 
 
-def is_event_on_date(event, target_date):
+def get_weather(lat, lon):
     """
-    Determines if an event should appear on a given date,
-    including logic for handling recurrence rules.
+    Retrieves current temperature and weather icon from OpenWeatherMap API.
 
     Args:
-        event: An object with `.date`, `.recurrence`, and optionally `.recurrence_end`
-        target_date (datetime.date): The day to evaluate
+        lat (float): Latitude
+        lon (float): Longitude
 
     Returns:
-        bool: True if the event occurs on the target date.
+        tuple: (celsius: int, fahrenheit: int, icon_code: str) or (None, None, None) on failure
     """
     try:
-        event_date = dt.datetime.strptime(event.date, '%Y-%m-%d').date()
-        recurrence = event.recurrence.lower()
-        recurrence_end = (
-            dt.datetime.strptime(event.recurrence_end, '%Y-%m-%d').date()
-            if event.recurrence_end else None
-        )
-
-        if recurrence_end and target_date > recurrence_end:
-            return False
-
-        if recurrence == 'none':
-            return event_date == target_date
-        elif recurrence == 'daily':
-            return target_date >= event_date
-        elif recurrence == 'weekly':
-            return target_date >= event_date and target_date.weekday() == event_date.weekday()
-        elif recurrence == 'monthly':
-            return target_date.day == event_date.day and target_date >= event_date
-        elif recurrence == 'yearly':
-            return (
-                target_date.month == event_date.month and
-                target_date.day == event_date.day and
-                target_date >= event_date
-            )
-
-        return False  # fallback
+        return fetch_weather(lat, lon)
     except Exception as e:
-        print(f"⚠️ Error checking recurrence: {e}")
-        return False
+        logger.warning('Failed to get weather: %s', e)
+        return None, None, None
@@ -0,0 +1,242 @@
+"""
+diagnostics.py
+
+Memory and widget-leak diagnostics for boards that run for weeks.
+
+On demand:
+- tracemalloc snapshot diffs (what allocated memory since the last snapshot)
+- Live instance counts of every Widget subclass
+- Scheduled Clock event count
+- Resident memory, with a history of samples
+
+Periodically, `SelfCheck` samples these and logs growth trends (RSS slope,
+widget and Clock event counts that keep climbing), so a slow leak shows up
+in the log long before the board runs out of memory.
+
+Kivy is imported lazily, so the RSS and tracemalloc helpers work without it.
+Counting widgets walks the garbage collector's objects: call it from the
+main thread, and not every frame.
+
+Author: Attila Bordan
+"""
+import gc
+import os
+import resource
+import time
+import tracemalloc
+from collections import Counter, deque
+
+from app.log import get_logger
+
+logger = get_logger(__name__)
+
+# Seconds between self-checks; 0 disables them
+SELF_CHECK_INTERVAL = float(os.getenv('CALENDAR_SELF_CHECK_S', '600'))
+
+
+# ---------- Measurements ----------
+def resident_memory_bytes():
+    """Current RSS from /proc on Linux, falling back to the peak RSS elsewhere."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def widget_counts():
+    """
+    Counts live Widget instances by class, including ones no longer in the window.
+
+    Returns:
+        Counter: Class name -> live instances.
+    """
+    from kivy.uix.widget import Widget
+
+    gc.collect()
+    # type() rather than isinstance(), which is also true for weak proxies to widgets
+    return Counter(type(obj).__name__ for obj in gc.get_objects() if issubclass(type(obj), Widget))
+
+
+def clock_event_count():
+    """Returns the number of scheduled Kivy Clock events."""
+    from kivy.clock import Clock
+
+    return len(Clock.get_events())
+
+
+class MemoryTracker:
+    """
+    tracemalloc snapshot diffs.
+
+    Args:
+        frames (int): Stack frames stored per allocation (more is slower but more precise).
+    """
+    def __init__(self, frames=10):
+        self.frames = frames
+        self.baseline = None
+
+    def start(self):
+        """Starts tracing (if not already) and takes the baseline snapshot."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self.baseline = self._snapshot()
+
+    def stop(self):
+        tracemalloc.stop()
+        self.baseline = None
+
+    @staticmethod
+    def _snapshot():
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+
+    def diff(self, top=15, rebase=False):
+        """
+        Compares the current allocations with the baseline.
+
+        Args:
+            top (int): Number of source lines reported.
+            rebase (bool): Make the current snapshot the new baseline.
+
+        Returns:
+            list: Lines like 'UI/calendar_view.py:390: size=12.5 KiB (+12.5 KiB), count=40 (+40)'.
+        """
+        if self.baseline is None:
+            self.start()
+            return []
+        snapshot = self._snapshot()
+        stats = snapshot.compare_to(self.baseline, 'lineno')[:top]
+        if rebase:
+            self.baseline = snapshot
+        return [str(stat) for stat in stats]
+
+
+# ---------- Trends ----------
+def slope_per_hour(samples):
+    """
+    Least-squares slope of (timestamp, value) samples.
+
+    Returns:
+        float: Change per hour (0 with fewer than two samples).
+    """
+    if len(samples) < 2:
+        return 0.0
+    mean_t = sum(t for t, _ in samples) / len(samples)
+    mean_v = sum(v for _, v in samples) / len(samples)
+    variance = sum((t - mean_t) ** 2 for t, _ in samples)
+    if not variance:
+        return 0.0
+    return sum((t - mean_t) * (v - mean_v) for t, v in samples) / variance * 3600
+
+
+def _keeps_rising(values):
+    """True if every value is larger than the one before (a one-off step is not a leak)."""
+    return len(values) >= 2 and all(b > a for a, b in zip(values, values[1:]))
+
+
+class SelfCheck:
+    """
+    Periodic leak check: samples RSS, widget and Clock event counts and logs growth.
+
+    Counts are only reported when they rose at every one of the last `trend_samples`
+    samples, so one-off builds (the weekly view, pooled popups) do not warn forever.
+
+    Args:
+        history (int): Samples kept (at the default interval, 144 is one day).
+        rss_slope_limit (float): RSS growth (bytes/hour) that is reported as a likely leak.
+        trend_samples (int): Consecutive samples a count must keep rising across to be reported.
+        clock (callable): Time source (overridable for testing).
+    """
+    def __init__(self, history=144, rss_slope_limit=2 * 1024 * 1024, trend_samples=6, clock=time.time):
+        self.samples = deque(maxlen=history)
+        self.rss_slope_limit = rss_slope_limit
+        self.trend_samples = trend_samples
+        self.clock = clock
+        self.memory = MemoryTracker()
+
+    def sample(self):
+        """
+        Records one sample (main thread only).
+
+        Returns:
+            dict: time, rss, widgets (total), clock_events and widget_classes.
+        """
+        classes = widget_counts()
+        sample = {
+            'time': self.clock(),
+            'rss': resident_memory_bytes(),
+            'widgets': sum(classes.values()),
+            'clock_events': clock_event_count(),
+            'widget_classes': classes,
+        }
+        self.samples.append(sample)
+        return sample
+
+    def check(self, *_):
+        """Takes a sample and logs any growth trend (e.g. from Clock.schedule_interval)."""
+        current = self.sample()
+        rss_slope = slope_per_hour([(s['time'], s['rss']) for s in self.samples])
+
+        logger.info('Self-check: rss %.1f MiB (%+.2f MiB/h), %d widgets, %d clock events',
+                    current['rss'] / 2 ** 20, rss_slope / 2 ** 20, current['widgets'], current['clock_events'])
+
+        if len(self.samples) < 3:
+            return
+        if rss_slope > self.rss_slope_limit:
+            logger.warning('RSS is growing %.2f MiB/h over the last %d samples', rss_slope / 2 ** 20, len(self.samples))
+
+        recent = list(self.samples)[-self.trend_samples:]
+        if len(recent) < self.trend_samples:
+            return
+        for key in ('widgets', 'clock_events'):
+            values = [s[key] for s in recent]
+            if _keeps_rising(values):
+                logger.warning('%s rose at every one of the last %d samples, from %d to %d',
+                               key, len(values), values[0], values[-1])
+        growth = Counter({
+            name: count - recent[0]['widget_classes'][name]
+            for name, count in current['widget_classes'].items()
+            if _keeps_rising([s['widget_classes'][name] for s in recent])
+        })
+        if growth:
+            logger.warning('Widget classes that rose at every one of the last %d samples: %s', len(recent),
+                           ', '.join(f'{name} +{count}' for name, count in growth.most_common(10)))
+
+    def report(self, top=15):
+        """
+        Builds an on-demand diagnostics report (main thread only).
+
+        Returns:
+            dict: Current sample, RSS history, RSS slope and, once tracing, a tracemalloc diff.
+        """
+        current = self.sample()
+        return {
+            'rss': current['rss'],
+            'rss_history': [(round(s['time']), s['rss']) for s in self.samples],
+            'rss_slope_per_hour': slope_per_hour([(s['time'], s['rss']) for s in self.samples]),
+            'widgets': current['widgets'],
+            'clock_events': current['clock_events'],
+            'widget_classes': dict(current['widget_classes'].most_common(top)),
+            'allocations': self.memory.diff(top=top, rebase=True),
+        }
+
+
+def log_report(self_check, top=15):
+    """Logs a full diagnostics report (e.g. on a signal), starting tracemalloc on the first call."""
+    report = self_check.report(top=top)
+    lines = [
+        f"rss {report['rss'] / 2 ** 20:.1f} MiB ({report['rss_slope_per_hour'] / 2 ** 20:+.2f} MiB/h), "
+        f"{report['widgets']} widgets, {report['clock_events']} clock events",
+        'widgets: ' + ', '.join(f'{name}={count}' for name, count in report['widget_classes'].items()),
+    ]
+    if report['allocations']:
+        lines.append('allocations since the last report:')
+        lines.extend('  ' + line for line in report['allocations'])
+    else:
+        lines.append('tracemalloc started; the next report shows allocations since now')
+    logger.info('Diagnostics report:\n%s', '\n'.join(lines))
+    return report
@@ -0,0 +1,109 @@
+"""
+hit_index.py
+
+Spatial hit-testing for tappable targets inside a layout.
+
+Instead of binding an `on_touch_down` handler to every event preview (which
+makes Kivy call every handler for every touch), a layout owns one HitIndex and
+one handler. Targets are bucketed into a uniform grid of cells, so a touch is
+resolved by looking up its cell and then testing only the few slots inside it.
+
+Author: Attila Bordan
+"""
+
+
+class HitIndex:
+    """
+    A uniform-grid index of rectangular touch targets.
+
+    Target rectangles are read from their widgets lazily: the index is rebuilt on
+    the first query after `invalidate()`, which layouts call when they move or
+    resize. Overlapping targets are allowed: a target whose real bounds contain the
+    point wins over one that only matches through its inflate margin, and among
+    equals the most recently added (topmost) wins.
+
+    Args:
+        cell_size (float): Width and height of a grid cell in pixels.
+        inflate (float): Default margin added around each target in pixels.
+    """
+    def __init__(self, cell_size=100, inflate=10):
+        self.cell_size = cell_size
+        self.inflate = inflate
+        self._targets = []
+        self._cells = {}
+        self._dirty = True
+
+    def add(self, widget, callback, inflate=None):
+        """
+        Registers a tappable widget.
+
+        Args:
+            widget (Widget): The widget whose bounds define the target.
+            callback (callable): Called with the touch; return True to consume it.
+            inflate (float, optional): Margin override for this target.
+        """
+        margin = self.inflate if inflate is None else inflate
+        self._targets.append((widget, callback, margin))
+        self._dirty = True
+
+    def clear(self):
+        """Removes all targets."""
+        self._targets = []
+        self._cells = {}
+        self._dirty = True
+
+    def invalidate(self, *_):
+        """Marks target positions as stale. Safe to bind to pos/size events."""
+        self._dirty = True
+
+    def _rebuild(self):
+        size = self.cell_size
+        cells = {}
+        for order, (widget, callback, margin) in enumerate(self._targets):
+            bounds = (widget.x, widget.y, widget.right, widget.top)
+            x1, y1 = bounds[0] - margin, bounds[1] - margin
+            x2, y2 = bounds[2] + margin, bounds[3] + margin
+            slot = (order, x1, y1, x2, y2, callback, bounds)
+            for cx in range(int(x1 // size), int(x2 // size) + 1):
+                for cy in range(int(y1 // size), int(y2 // size) + 1):
+                    cells.setdefault((cx, cy), []).append(slot)
+        self._cells = cells
+        self._dirty = False
+
+    def query(self, x, y):
+        """
+        Returns the callbacks of all targets containing the point, topmost first.
+
+        Args:
+            x (float): X coordinate in the layout's coordinate space.
+            y (float): Y coordinate in the layout's coordinate space.
+
+        Returns:
+            list: Callbacks of matching targets.
+        """
+        if self._dirty:
+            self._rebuild()
+
+        slots = self._cells.get((int(x // self.cell_size), int(y // self.cell_size)), ())
+        hits = [slot for slot in slots if slot[1] <= x <= slot[3] and slot[2] <= y <= slot[4]]
+        if len(hits) > 1:
+            def priority(slot):
+                bx1, by1, bx2, by2 = slot[6]
+                return bx1 <= x <= bx2 and by1 <= y <= by2, slot[0]
+            hits.sort(key=priority, reverse=True)
+        return [slot[5] for slot in hits]
+
+    def dispatch(self, touch):
+        """
+        Sends a touch to the targets under it until one consumes it.
+
+        Args:
+            touch (MotionEvent): The touch to dispatch.
+
+        Returns:
+            bool: True if a target handled the touch.
+        """
+        for callback in self.query(touch.x, touch.y):
+            if callback(touch):
+                return True
+        return False
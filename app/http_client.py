@@ -0,0 +1,174 @@
+"""
+http_client.py
+
+Shared HTTP client for every outbound call made by the Family Calendar app.
+
+A bare `requests.get` opens a new TCP (and TLS) connection per call, which
+is slow on a Raspberry Pi. All integrations go through one pooled session
+instead, which adds:
+- Keep-alive connection pooling per host
+- Default connect/read timeouts
+- gzip-compressed responses
+- Conditional requests (ETag / Last-Modified) with the cached body reused on 304
+- Per-host rate limiting (minimum interval between requests)
+- Per-host request timing metrics
+
+`requests` is imported when the first client is created (on the weather
+worker), so importing this module costs nothing at startup.
+
+Author: Attila Bordan
+"""
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+from app.tracing import span
+
+# Seconds to wait for a connection / response before giving up
+DEFAULT_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', 5))
+
+# Free API tiers allow roughly one call per second; the kiosk needs far fewer
+DEFAULT_MIN_INTERVALS = {
+    'ipinfo.io': 1.0,
+    'api.openweathermap.org': 1.0,
+}
+
+
+class HttpClient:
+    """
+    A thread-safe wrapper around a pooled `requests.Session`.
+
+    Args:
+        timeout (float): Default timeout in seconds for requests without one.
+        pool_size (int): Connections kept alive per host.
+        min_intervals (dict, optional): Host name -> minimum seconds between requests.
+    """
+    def __init__(self, timeout=DEFAULT_TIMEOUT, pool_size=4, min_intervals=None):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.timeout = timeout
+        self.min_intervals = dict(DEFAULT_MIN_INTERVALS if min_intervals is None else min_intervals)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'User-Agent': 'FamilyCalendar/1.0',
+        })
+
+        self._lock = threading.Lock()
+        self._next_allowed = {}
+        self._validators = {}
+        self._metrics = {}
+
+    def get(self, url, params=None, timeout=None, conditional=False):
+        """
+        Sends a GET request through the pooled session.
+
+        Blocking (and possibly rate-limited): call from a background thread only.
+
+        Args:
+            url (str): Absolute URL.
+            params (dict, optional): Query parameters.
+            timeout (float, optional): Timeout in seconds, defaults to the client's.
+            conditional (bool): Revalidate with ETag / Last-Modified and reuse the
+                previous body when the server answers 304 Not Modified.
+
+        Returns:
+            requests.Response: The response (the cached one after a 304).
+
+        Raises:
+            requests.RequestException: On network errors or timeouts.
+        """
+        import requests
+
+        host = urlsplit(url).hostname or ''
+        self._wait_for_slot(host)
+
+        cache_key = (url, tuple(sorted((params or {}).items())))
+        headers = {}
+        cached = self._validators.get(cache_key) if conditional else None
+        if cached is not None:
+            if cached.headers.get('ETag'):
+                headers['If-None-Match'] = cached.headers['ETag']
+            if cached.headers.get('Last-Modified'):
+                headers['If-Modified-Since'] = cached.headers['Last-Modified']
+
+        start = time.perf_counter()
+        try:
+            with span('http_get', cat='net', host=host):
+                response = self.session.get(url, params=params, headers=headers,
+                                            timeout=timeout or self.timeout)
+        except requests.RequestException:
+            self._record(host, time.perf_counter() - start, error=True)
+            raise
+
+        not_modified = response.status_code == 304 and cached is not None
+        self._record(host, time.perf_counter() - start, error=response.status_code >= 400,
+                     not_modified=not_modified, nbytes=len(response.content))
+
+        if not_modified:
+            return cached
+        if conditional and response.ok and ('ETag' in response.headers or 'Last-Modified' in response.headers):
+            with self._lock:
+                self._validators[cache_key] = response
+        return response
+
+    def _wait_for_slot(self, host):
+        """Sleeps until the host's minimum interval since the previous request has passed."""
+        interval = self.min_intervals.get(host, 0)
+        if not interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_allowed.get(host, 0))
+            self._next_allowed[host] = slot + interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def _record(self, host, elapsed, error=False, not_modified=False, nbytes=0):
+        with self._lock:
+            metrics = self._metrics.setdefault(host, {
+                'requests': 0, 'errors': 0, 'not_modified': 0, 'bytes': 0,
+                'total_time': 0.0, 'max_time': 0.0, 'last_time': 0.0,
+            })
+            metrics['requests'] += 1
+            metrics['errors'] += int(error)
+            metrics['not_modified'] += int(not_modified)
+            metrics['bytes'] += nbytes
+            metrics['total_time'] += elapsed
+            metrics['max_time'] = max(metrics['max_time'], elapsed)
+            metrics['last_time'] = elapsed
+
+    def stats(self):
+        """
+        Returns request timing metrics per host.
+
+        Returns:
+            dict: host -> requests, errors, not_modified, bytes, total_time,
+                  max_time, last_time and avg_time (seconds).
+        """
+        with self._lock:
+            return {
+                host: dict(metrics, avg_time=metrics['total_time'] / metrics['requests'])
+                for host, metrics in self._metrics.items()
+            }
+
+    def close(self):
+        """Closes all pooled connections."""
+        self.session.close()
+
+
+_client = None
+
+
+def get_client():
+    """Returns the shared HttpClient, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = HttpClient()
+    return _client
@@ -0,0 +1,184 @@
+"""
+instrumentation.py
+
+Lightweight timing collection for the Family Calendar app.
+
+Views and services report how long their expensive operations took
+(calendar builds, weekly updates, database queries, weather fetches), and
+the UI reports frame times while someone is looking. The on-screen
+performance HUD reads everything back through `snapshot()`, and the
+metrics endpoint reads the cumulative histograms and gauges.
+
+Recording is a couple of dict/deque operations, cheap enough to leave on
+permanently. This module does not import Kivy and is safe to call from
+any thread.
+
+Author: Attila Bordan
+"""
+import functools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+_lock = threading.Lock()
+_operations = {}
+_histograms = {}
+_gauges = {}
+_frames = deque(maxlen=300)
+
+# Durations kept per operation for the min/max/average shown in the HUD
+HISTORY = 50
+# Upper bounds (seconds) of the cumulative duration histograms; the last bucket is +Inf
+HISTOGRAM_BOUNDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def record(name, seconds):
+    """
+    Records one run of an operation.
+
+    Args:
+        name (str): Operation name, e.g. 'build_calendar'.
+        seconds (float): How long it took.
+    """
+    with _lock:
+        history = _operations.get(name)
+        if history is None:
+            history = _operations[name] = deque(maxlen=HISTORY)
+        history.append((seconds, time.time()))
+
+        # [bucket counts..., +Inf count, sum]; bucket counts are not cumulative here
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = [0] * (len(HISTOGRAM_BOUNDS) + 1) + [0.0]
+        histogram[_bucket(seconds)] += 1
+        histogram[-1] += seconds
+
+
+def _bucket(seconds):
+    for index, bound in enumerate(HISTOGRAM_BOUNDS):
+        if seconds <= bound:
+            return index
+    return len(HISTOGRAM_BOUNDS)
+
+
+@contextmanager
+def timed(name):
+    """
+    Times the enclosed block and records it under `name`.
+
+    Usage:
+        with timed('db_query'):
+            ...
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def timed_function(name):
+    """Decorator form of `timed`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def set_gauge(name, value):
+    """Publishes the current value of something (e.g. the live widget count)."""
+    _gauges[name] = value
+
+
+def record_frame(dt):
+    """Records the duration of one frame (e.g. from a per-frame Clock callback)."""
+    _frames.append(dt)
+
+
+def reset_frames():
+    """Forgets collected frame times (e.g. when frame sampling restarts)."""
+    _frames.clear()
+
+
+def frame_stats():
+    """
+    Summarizes the recent frame times.
+
+    Returns:
+        dict: fps and p50/p95/p99/max frame times in milliseconds (empty if no frames).
+    """
+    frames = sorted(_frames)
+    if not frames:
+        return {}
+
+    def percentile(p):
+        return frames[min(len(frames) - 1, int(p / 100 * len(frames)))] * 1000
+
+    total = sum(frames)
+    return {
+        'fps': len(frames) / total if total else 0.0,
+        'p50_ms': percentile(50),
+        'p95_ms': percentile(95),
+        'p99_ms': percentile(99),
+        'max_ms': frames[-1] * 1000,
+    }
+
+
+def operation_stats():
+    """
+    Summarizes every recorded operation.
+
+    Returns:
+        dict: name -> last_ms, avg_ms, max_ms, count and age_s (seconds since the last run).
+    """
+    now = time.time()
+    with _lock:
+        items = [(name, list(history)) for name, history in _operations.items()]
+
+    stats = {}
+    for name, history in items:
+        durations = [seconds for seconds, _ in history]
+        last_seconds, last_at = history[-1]
+        stats[name] = {
+            'last_ms': last_seconds * 1000,
+            'avg_ms': sum(durations) / len(durations) * 1000,
+            'max_ms': max(durations) * 1000,
+            'count': len(durations),
+            'age_s': now - last_at,
+        }
+    return stats
+
+
+def histograms():
+    """
+    Returns the cumulative duration histograms without taking the recording lock.
+
+    Each entry is read with a single copy, so a reader on another thread never
+    blocks the UI; a reading may be one sample behind.
+
+    Returns:
+        dict: name -> {'buckets': [(upper bound, cumulative count)...], 'sum': seconds, 'count': runs}.
+    """
+    result = {}
+    for name, histogram in list(_histograms.items()):
+        values = list(histogram)
+        buckets, cumulative = [], 0
+        for bound, count in zip(HISTOGRAM_BOUNDS + (float('inf'),), values[:-1]):
+            cumulative += count
+            buckets.append((bound, cumulative))
+        result[name] = {'buckets': buckets, 'sum': values[-1], 'count': cumulative}
+    return result
+
+
+def gauges():
+    """Returns a copy of the published gauges."""
+    return dict(_gauges)
+
+
+def snapshot():
+    """Returns frame and operation statistics in one dict."""
+    return {'frames': frame_stats(), 'operations': operation_stats()}
@@ -0,0 +1,162 @@
+"""
+location_provider.py
+
+Resolves the board's location for weather lookups.
+
+The kiosk does not move, so looking the location up by IP on every weather
+refresh is wasted time and burns the geolocation service's rate limit. This
+provider answers from, in order:
+- a manual latitude/longitude/city override from the settings
+- a disk cache, valid for a long TTL and only while the network is unchanged
+- a fresh IP lookup, falling back to the stale cache if it fails
+
+Author: Attila Bordan
+"""
+import json
+import os
+import socket
+import time
+
+from app.log import get_logger
+
+logger = get_logger(__name__)
+
+
+def network_fingerprint():
+    """
+    Identifies the network the board is on, without sending any traffic.
+
+    Combines the default gateway (from /proc/net/route on Linux) with the
+    local address the OS would use to reach the internet.
+
+    Returns:
+        str: A fingerprint string, or None if it cannot be determined.
+    """
+    parts = []
+
+    try:
+        with open('/proc/net/route') as f:
+            for line in f.readlines()[1:]:
+                fields = line.split()
+                # Destination 00000000 is the default route
+                if len(fields) > 2 and fields[1] == '00000000':
+                    parts.append(f'{fields[0]}:{fields[2]}')
+                    break
+    except OSError:
+        pass
+
+    try:
+        # connect() on a UDP socket only picks a route; nothing is sent
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.connect(('192.0.2.1', 80))
+            parts.append(sock.getsockname()[0])
+    except OSError:
+        pass
+
+    return '|'.join(parts) or None
+
+
+class LocationProvider:
+    """
+    Cached, overridable location lookup.
+
+    Args:
+        cache_file (str): Where the last IP lookup is stored.
+        ttl (float): Seconds a cached lookup stays valid on the same network.
+        timeout (float, optional): Timeout for the IP lookup request, defaults to the HTTP client's.
+    """
+    CACHE_FILE = 'location_cache.json'
+
+    def __init__(self, cache_file=CACHE_FILE, ttl=30 * 24 * 3600, timeout=None):
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.timeout = timeout
+        self.override = None
+        self.lookups = 0
+
+    def set_override(self, lat=None, lon=None, city=None):
+        """
+        Sets a manual location. Passing no latitude/longitude clears it.
+
+        Args:
+            lat (float, optional): Latitude.
+            lon (float, optional): Longitude.
+            city (str, optional): City name shown to the user.
+        """
+        if lat is None or lon is None:
+            self.override = None
+        else:
+            self.override = (float(lat), float(lon), city or '')
+
+    def get_location(self):
+        """
+        Returns the current location, hitting the network only when needed.
+
+        Returns:
+            tuple: (latitude: float, longitude: float, city: str)
+
+        Raises:
+            Exception: If there is no override, no usable cache and the lookup fails.
+        """
+        if self.override:
+            return self.override
+
+        cached = self.load_cached()
+        fingerprint = network_fingerprint()
+        if cached and self._is_valid(cached, fingerprint):
+            return cached['lat'], cached['lon'], cached['city']
+
+        from app import api_utils
+
+        try:
+            self.lookups += 1
+            lat, lon, city = api_utils.fetch_location(timeout=self.timeout)
+        except Exception:
+            # Rate limited or offline: a stale location is still the right one for a kiosk
+            if cached:
+                return cached['lat'], cached['lon'], cached['city']
+            raise
+
+        self.save_cache({
+            'lat': lat,
+            'lon': lon,
+            'city': city,
+            'network': fingerprint,
+            'fetched_at': time.time(),
+        })
+        return lat, lon, city
+
+    def invalidate(self):
+        """Forgets the cached lookup so the next call queries the network."""
+        try:
+            os.remove(self.cache_file)
+        except OSError:
+            pass
+
+    def _is_valid(self, cached, fingerprint):
+        if time.time() - cached.get('fetched_at', 0) > self.ttl:
+            return False
+        # An unknown fingerprint on either side is not treated as a network change
+        return not (fingerprint and cached.get('network') and fingerprint != cached['network'])
+
+    def load_cached(self):
+        """Returns the cached lookup dict, or None."""
+        if not os.path.exists(self.cache_file):
+            return None
+        try:
+            with open(self.cache_file, 'r') as f:
+                cached = json.load(f)
+            return cached if 'lat' in cached and 'lon' in cached else None
+        except Exception as e:
+            logger.error('Error loading location cache: %s', e)
+            return None
+
+    def save_cache(self, cached):
+        """Writes the lookup to disk atomically (temp file + rename)."""
+        tmp_file = f'{self.cache_file}.tmp'
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump(cached, f)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            logger.error('Error saving location cache: %s', e)
@@ -0,0 +1,143 @@
+"""
+log.py
+
+Leveled logging for the Family Calendar app.
+
+Built on the standard `logging` module:
+- `get_logger(__name__)` in every module; messages use lazy %-formatting,
+  so a disabled debug call costs one level check
+- Per-module levels, e.g. CALENDAR_LOG_LEVELS="storage=DEBUG,app.weather_service=INFO"
+- A bounded in-memory ring buffer of recent records, readable from the UI
+- A rotating log file, so the SD card never fills up
+- Console output to stderr (journald on the Pi) at the configured level
+
+SQL statement logging is off by default; enable it with
+CALENDAR_LOG_LEVELS="sqlalchemy.engine=INFO".
+
+Author: Attila Bordan
+"""
+import logging
+import logging.handlers
+import os
+import threading
+from collections import deque
+
+# Top-level packages whose loggers get our handlers
+APP_LOGGERS = ('app', 'UI', 'storage', 'main', 'benchmarks', 'sqlalchemy.engine')
+
+LOG_FORMAT = '%(asctime)s %(levelname)-7s %(name)s: %(message)s'
+DEFAULT_LEVEL = os.getenv('CALENDAR_LOG_LEVEL', 'INFO')
+DEFAULT_MODULE_LEVELS = os.getenv('CALENDAR_LOG_LEVELS', '')
+DEFAULT_LOG_FILE = os.getenv('CALENDAR_LOG_FILE', 'calendar.log')
+MAX_LOG_BYTES = 512 * 1024
+LOG_BACKUPS = 3
+RING_CAPACITY = 500
+
+_ring_handler = None
+_configure_lock = threading.Lock()
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    Keeps the most recent formatted records in memory.
+
+    Args:
+        capacity (int): Number of records kept; older ones are dropped.
+    """
+    def __init__(self, capacity=RING_CAPACITY):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+
+    def emit(self, record):
+        try:
+            self.records.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+    def recent(self, count=None):
+        """Returns up to `count` of the newest formatted records, oldest first."""
+        records = list(self.records)
+        return records[-count:] if count else records
+
+
+def parse_module_levels(spec):
+    """
+    Parses "module=LEVEL,other=LEVEL" into a dict.
+
+    Args:
+        spec (str): Comma-separated assignments; invalid entries are ignored.
+
+    Returns:
+        dict: Logger name -> numeric level.
+    """
+    levels = {}
+    for item in spec.split(','):
+        name, _, level = item.partition('=')
+        level = logging.getLevelName(level.strip().upper())
+        if name.strip() and isinstance(level, int):
+            levels[name.strip()] = level
+    return levels
+
+
+def configure_logging(level=DEFAULT_LEVEL, module_levels=DEFAULT_MODULE_LEVELS, log_file=DEFAULT_LOG_FILE,
+                      console=True, ring_capacity=RING_CAPACITY):
+    """
+    Installs the app's handlers. Safe to call more than once (later calls replace the setup).
+
+    Args:
+        level (str | int): Level for the app's loggers.
+        module_levels (str | dict): Per-module overrides, as a spec string or a dict.
+        log_file (str, optional): Rotating log file path; None disables file output.
+        console (bool): Also log to stderr.
+        ring_capacity (int): Records kept in memory for `recent_logs()`.
+    """
+    global _ring_handler
+
+    if isinstance(module_levels, str):
+        module_levels = parse_module_levels(module_levels)
+    formatter = logging.Formatter(LOG_FORMAT)
+
+    with _configure_lock:
+        handlers = [RingBufferHandler(ring_capacity)]
+        if console:
+            handlers.append(logging.StreamHandler())
+        if log_file:
+            try:
+                handlers.append(logging.handlers.RotatingFileHandler(
+                    log_file, maxBytes=MAX_LOG_BYTES, backupCount=LOG_BACKUPS, encoding='utf-8'))
+            except OSError as e:
+                logging.getLogger(__name__).warning('Cannot open log file %s: %s', log_file, e)
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        for name in APP_LOGGERS:
+            logger = logging.getLogger(name)
+            for old in list(logger.handlers):
+                logger.removeHandler(old)
+                old.close()
+            for handler in handlers:
+                logger.addHandler(handler)
+            # Don't hand our records to Kivy's root handlers as well
+            logger.propagate = False
+            logger.setLevel(level if name != 'sqlalchemy.engine' else logging.WARNING)
+
+        for name, module_level in module_levels.items():
+            logging.getLogger(name).setLevel(module_level)
+
+        _ring_handler = handlers[0]
+
+
+def get_logger(name):
+    """
+    Returns the logger for a module (pass `__name__`).
+
+    Usage:
+        logger = get_logger(__name__)
+        logger.debug('Loaded %d events', count)
+    """
+    return logging.getLogger(name)
+
+
+def recent_logs(count=None):
+    """Returns the newest formatted log records from the ring buffer (empty before configure_logging)."""
+    return _ring_handler.recent(count) if _ring_handler else []
@@ -0,0 +1,206 @@
+"""
+metrics_server.py
+
+Optional metrics endpoint in Prometheus text format, for monitoring a fleet
+of calendar boards centrally.
+
+Serves http://127.0.0.1:<port>/metrics from a daemon thread using only the
+standard library. Disabled unless CALENDAR_METRICS_PORT is set.
+
+Exposes:
+- Render and DB latency histograms (from app.instrumentation)
+- Cache hit/miss counters and hit ratios
+- Weather fetch successes and failures, HTTP requests per host
+- Clock event and widget counts, as published by the UI
+- Process resident memory and uptime
+
+The server never touches Kivy objects or takes a lock the UI thread holds:
+everything it reports is a counter or gauge the app updates anyway, read
+with a single copy.
+
+Author: Attila Bordan
+"""
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from app import instrumentation
+from app.diagnostics import resident_memory_bytes
+from app.http_client import get_client
+from app.log import get_logger
+from app.theme_manager import hex_to_rgba, parse_hhmm
+from app.weather_service import get_weather_service
+
+logger = get_logger(__name__)
+
+METRICS_HOST = '127.0.0.1'
+METRICS_PORT = os.getenv('CALENDAR_METRICS_PORT')
+PREFIX = 'calendar'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_started_at = time.time()
+
+
+# ---------- Collection ----------
+def _labels(**labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels.items()) + '}'
+
+
+class _Writer:
+    """Accumulates metric families in the exposition format."""
+    def __init__(self):
+        self.lines = []
+        self._declared = set()
+
+    def declare(self, name, kind, help_text):
+        if name not in self._declared:
+            self._declared.add(name)
+            self.lines.append(f'# HELP {PREFIX}_{name} {help_text}')
+            self.lines.append(f'# TYPE {PREFIX}_{name} {kind}')
+
+    def sample(self, name, value, **labels):
+        self.lines.append(f'{PREFIX}_{name}{_labels(**labels)} {value}')
+
+    def text(self):
+        return '\n'.join(self.lines) + '\n'
+
+
+def render_metrics():
+    """
+    Builds the /metrics response body.
+
+    Returns:
+        str: All metrics in Prometheus text format.
+    """
+    out = _Writer()
+
+    out.declare('uptime_seconds', 'gauge', 'Seconds since the app started.')
+    out.sample('uptime_seconds', round(time.time() - _started_at, 3))
+    out.declare('resident_memory_bytes', 'gauge', 'Resident set size of the process.')
+    out.sample('resident_memory_bytes', resident_memory_bytes())
+
+    # Render, weekly update, DB query and weather fetch durations
+    out.declare('operation_duration_seconds', 'histogram', 'Duration of instrumented operations.')
+    for operation, histogram in sorted(instrumentation.histograms().items()):
+        for bound, count in histogram['buckets']:
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            out.sample('operation_duration_seconds_bucket', count, operation=operation, le=le)
+        out.sample('operation_duration_seconds_sum', round(histogram['sum'], 6), operation=operation)
+        out.sample('operation_duration_seconds_count', histogram['count'], operation=operation)
+
+    # Caches: the texture cache is published by the UI, the color/time caches are lru_caches
+    caches = {'hex_to_rgba': hex_to_rgba.cache_info(), 'parse_hhmm': parse_hhmm.cache_info()}
+    cache_counts = {name: (info.hits, info.misses) for name, info in caches.items()}
+    gauges = instrumentation.gauges()
+    if 'texture_cache_hits' in gauges:
+        cache_counts['texture'] = (gauges['texture_cache_hits'], gauges['texture_cache_misses'])
+
+    out.declare('cache_hits_total', 'counter', 'Cache lookups answered from the cache.')
+    out.declare('cache_misses_total', 'counter', 'Cache lookups that had to compute the value.')
+    out.declare('cache_hit_ratio', 'gauge', 'Share of cache lookups that were hits.')
+    for name, (hits, misses) in sorted(cache_counts.items()):
+        out.sample('cache_hits_total', hits, cache=name)
+        out.sample('cache_misses_total', misses, cache=name)
+        out.sample('cache_hit_ratio', round(hits / (hits + misses), 4) if hits + misses else 0, cache=name)
+
+    service = get_weather_service()
+    out.declare('weather_fetch_total', 'counter', 'Weather refreshes by result.')
+    out.sample('weather_fetch_total', service.successes, result='success')
+    out.sample('weather_fetch_total', service.failures, result='failure')
+
+    out.declare('http_requests_total', 'counter', 'Outgoing HTTP requests per host.')
+    out.declare('http_errors_total', 'counter', 'Outgoing HTTP requests that failed.')
+    out.declare('http_not_modified_total', 'counter', 'Requests answered with 304 from the ETag cache.')
+    for host, stats in sorted(get_client().stats().items()):
+        out.sample('http_requests_total', stats['requests'], host=host)
+        out.sample('http_errors_total', stats['errors'], host=host)
+        out.sample('http_not_modified_total', stats['not_modified'], host=host)
+
+    # Published by the UI thread; reading Kivy structures from here would not be safe
+    for name, help_text in (('clock_events', 'Scheduled Kivy Clock events.'),
+                            ('widgets', 'Widgets alive in the window.')):
+        if name in gauges:
+            out.declare(name, 'gauge', help_text)
+            out.sample(name, gauges[name])
+
+    return out.text()
+
+
+# ---------- Server ----------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        try:
+            body = render_metrics().encode('utf-8')
+        except Exception as e:
+            logger.exception('Failed to render metrics: %s', e)
+            self.send_error(500)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug('%s ' + format, self.address_string(), *args)
+
+
+class MetricsServer:
+    """
+    Serves /metrics on a daemon thread.
+
+    Args:
+        port (int): TCP port; 0 picks a free one.
+        host (str): Interface to bind, localhost by default.
+    """
+    def __init__(self, port, host=METRICS_HOST):
+        self.host = host
+        self.port = port
+        self._httpd = None
+        self._thread = None
+
+    def start(self):
+        """Binds the socket and starts serving in the background."""
+        if self._thread is not None:
+            return
+        self._httpd = HTTPServer((self.host, self.port), _MetricsHandler)
+        self.port = self._httpd.server_port
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='metrics-server', daemon=True)
+        self._thread.start()
+        logger.info('Metrics available at http://%s:%d/metrics', self.host, self.port)
+
+    def stop(self):
+        """Stops serving and closes the socket."""
+        if self._thread is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join(timeout=2)
+        self._httpd = self._thread = None
+
+
+def start_metrics_server(port=METRICS_PORT):
+    """
+    Starts the metrics endpoint if a port is configured.
+
+    Args:
+        port (int | str, optional): Port to listen on; defaults to CALENDAR_METRICS_PORT.
+
+    Returns:
+        MetricsServer or None: The running server, or None if disabled or the port is unavailable.
+    """
+    if port is None or port == '':
+        return None
+    server = MetricsServer(int(port))
+    try:
+        server.start()
+    except OSError as e:
+        logger.error('Cannot start metrics server on port %s: %s', port, e)
+        return None
+    return server
@@ -0,0 +1,59 @@
+"""
+recurrence.py
+
+Recurrence matching for calendar events.
+
+Kept free of third-party imports: the month grid needs it before the first
+frame, so it must not pull in the network stack with it.
+
+Author: Attila Bordan
+"""
+import datetime
+
+from app.log import get_logger
+
+logger = get_logger(__name__)
+
+
+def is_event_on_date(event, target_date):
+    """
+    Determines if an event should appear on a given date,
+    including logic for handling recurrence rules.
+
+    Args:
+        event: An object with `.date`, `.recurrence`, and optionally `.recurrence_end`
+        target_date (datetime.date): The day to evaluate
+
+    Returns:
+        bool: True if the event occurs on the target date.
+    """
+    try:
+        event_date = datetime.datetime.strptime(event.date, '%Y-%m-%d').date()
+        recurrence = event.recurrence.lower()
+        recurrence_end = (
+            datetime.datetime.strptime(event.recurrence_end, '%Y-%m-%d').date()
+            if event.recurrence_end else None
+        )
+
+        if recurrence_end and target_date > recurrence_end:
+            return False
+
+        if recurrence == 'none':
+            return event_date == target_date
+        elif recurrence == 'daily':
+            return target_date >= event_date
+        elif recurrence == 'weekly':
+            return target_date >= event_date and target_date.weekday() == event_date.weekday()
+        elif recurrence == 'monthly':
+            return target_date.day == event_date.day and target_date >= event_date
+        elif recurrence == 'yearly':
+            return (
+                target_date.month == event_date.month and
+                target_date.day == event_date.day and
+                target_date >= event_date
+            )
+
+        return False  # fallback
+    except Exception as e:
+        logger.error('Error checking recurrence: %s', e)
+        return False
@@ -0,0 +1,215 @@
+"""
+settings_store.py
+
+Crash-safe persistence for the Family Calendar's JSON settings.
+
+Writing the settings file synchronously on the UI thread for every toggle
+is slow on an SD card, and a power cut mid-write can leave it truncated.
+This store instead:
+- Validates values on load, falling back to defaults for anything invalid
+- Coalesces saves: changes are written once, shortly after the last one
+- Writes on a background thread via temp file + fsync + rename
+- Watches the file so an external edit is picked up without a restart
+- Never writes at startup; the file is only touched when something changes
+
+This module does not import Kivy; listeners are plain callables and the UI is
+responsible for hopping back onto the main thread.
+
+Author: Attila Bordan
+"""
+import json
+import os
+import threading
+import time
+from app.log import get_logger
+
+logger = get_logger(__name__)
+
+
+class SettingsStore:
+    """
+    A dict of settings backed by a JSON file.
+
+    `data` is a plain dict that callers may read and modify in place;
+    call `save()` after modifying it.
+
+    Args:
+        path (str): Settings file path.
+        defaults (dict): Default values, also defining the known keys.
+        validators (dict, optional): Key -> callable(value) returning True if the value is valid.
+        debounce (float): Seconds to wait after the last change before writing.
+    """
+    def __init__(self, path, defaults, validators=None, debounce=1.0):
+        self.path = path
+        self.defaults = dict(defaults)
+        self.validators = validators or {}
+        self.debounce = debounce
+
+        self.data = dict(self.defaults)
+        self.writes = 0
+
+        self._listeners = []
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._dirty = False
+        self._deadline = 0
+        self._writer = None
+        self._watcher = None
+        self._stop_watching = threading.Event()
+        self._file_signature = None
+
+        self.load()
+
+    # ---------- Loading ----------
+    def validate(self, key, value):
+        """Returns True if the value is acceptable for the key."""
+        validator = self.validators.get(key)
+        try:
+            return validator is None or bool(validator(value))
+        except Exception:
+            return False
+
+    def load(self):
+        """
+        (Re)loads the file into `data` in place, key by key (safe to call from the
+        watcher thread while other threads read `data`). Invalid or missing values
+        fall back to their defaults; an unreadable file leaves the defaults.
+        """
+        loaded = {}
+        signature = self._signature()
+        if signature is not None:
+            try:
+                with open(self.path, 'r') as f:
+                    loaded = json.load(f)
+                if not isinstance(loaded, dict):
+                    raise ValueError('settings file is not a JSON object')
+            except Exception as e:
+                logger.error('Error loading settings from %s: %s', self.path, e)
+                loaded = {}
+
+        settings = dict(self.defaults)
+        for key, value in loaded.items():
+            if self.validate(key, value):
+                settings[key] = value
+            else:
+                logger.warning('Ignoring invalid setting %s=%r', key, value)
+
+        # The watcher thread reloads while the UI thread reads `data`: update the keys in
+        # place (each assignment is atomic) rather than clearing, so a read never misses
+        # a key or sees the defaults in between
+        self.data.update(settings)
+        for key in [key for key in self.data if key not in settings]:
+            self.data.pop(key, None)
+        self._file_signature = signature
+
+    def _signature(self):
+        """Returns (mtime_ns, size) of the settings file, or None if it does not exist."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    # ---------- Saving ----------
+    def save(self):
+        """Schedules the current `data` to be written shortly, coalescing repeated calls."""
+        with self._cond:
+            self._dirty = True
+            self._deadline = time.monotonic() + self.debounce
+            self._cond.notify()
+
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name='settings-writer', daemon=True)
+                self._writer.start()
+
+    def flush(self):
+        """Writes pending changes immediately (e.g. when the app stops)."""
+        with self._cond:
+            if not self._dirty:
+                return
+            self._dirty = False
+            snapshot = dict(self.data)
+        self._write(snapshot)
+
+    def _write_loop(self):
+        while True:
+            with self._cond:
+                if not self._dirty:
+                    # Idle writers exit; the next save() starts a new one
+                    if not self._cond.wait(self.debounce * 10 + 1) and not self._dirty:
+                        self._writer = None
+                        return
+                    continue
+
+                remaining = self._deadline - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+
+                self._dirty = False
+                snapshot = dict(self.data)
+            self._write(snapshot)
+
+    def _write(self, snapshot):
+        """Writes a snapshot atomically: temp file, fsync, then rename over the old file."""
+        tmp_path = f'{self.path}.tmp'
+        with self._write_lock:
+            try:
+                with open(tmp_path, 'w') as f:
+                    json.dump(snapshot, f, indent=4)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+                self._file_signature = self._signature()
+                self.writes += 1
+            except Exception as e:
+                logger.error('Error saving settings to %s: %s', self.path, e)
+
+    # ---------- Watching ----------
+    def subscribe(self, callback):
+        """Registers a callback(data) for external edits. Runs on the watcher thread."""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def start_watching(self, interval=2.0):
+        """Starts polling the file's mtime/size (no-op if already watching)."""
+        if self._watcher and self._watcher.is_alive():
+            return
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(target=self._watch_loop, args=(interval,),
+                                         name='settings-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop_watching.set()
+
+    def check_for_changes(self):
+        """
+        Reloads the file if it was changed by someone else.
+
+        Returns:
+            bool: True if new settings were loaded.
+        """
+        with self._write_lock:
+            signature = self._signature()
+            if signature is None or signature == self._file_signature:
+                return False
+            with self._cond:
+                if self._dirty:
+                    # Our pending changes are newer; they will overwrite the file
+                    return False
+            self.load()
+
+        for callback in list(self._listeners):
+            try:
+                callback(self.data)
+            except Exception as e:
+                logger.exception('Settings listener failed: %s', e)
+        return True
+
+    def _watch_loop(self, interval):
+        while not self._stop_watching.wait(interval):
+            self.check_for_changes()
@@ -0,0 +1,85 @@
+"""
+startup.py
+
+Boot timing for the Family Calendar app.
+
+`mark(name)` records how long after process launch a startup step finished
+(imports done, window ready, first frame, calendar on screen). The times are
+measured from the process start time in /proc, so interpreter startup and
+the first imports are included; elsewhere they fall back to the time this
+module was imported.
+
+With CALENDAR_BOOT_REPORT=1 the app prints the marks as one JSON line and
+exits as soon as the calendar is on screen; benchmarks/boot_budget.py uses
+this to check the launch-to-first-frame time against a budget.
+
+Import this module first, before Kivy, so its fallback origin is early.
+
+Author: Attila Bordan
+"""
+import json
+import os
+import time
+
+from app.log import get_logger
+
+logger = get_logger(__name__)
+
+BOOT_REPORT = os.getenv('CALENDAR_BOOT_REPORT') == '1'
+
+_imported_at = time.monotonic()
+
+
+def process_age():
+    """
+    Seconds since the process was launched.
+
+    Returns:
+        float or None: Age from /proc (10 ms resolution), or None where /proc is unavailable.
+    """
+    try:
+        with open('/proc/self/stat') as f:
+            # The command name may contain spaces; the fields after it are fixed
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return uptime - int(fields[19]) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+_age = process_age()
+# Monotonic time of the process launch
+_origin = _imported_at - _age if _age is not None else _imported_at
+_marks = {}
+
+
+def mark(name):
+    """
+    Records that a startup step finished now (only the first mark of a name counts).
+
+    Args:
+        name (str): Step name, e.g. 'first_frame'.
+
+    Returns:
+        float: Milliseconds since process launch.
+    """
+    if name not in _marks:
+        _marks[name] = (time.monotonic() - _origin) * 1000
+        logger.info('Boot: %s at %.0f ms', name, _marks[name])
+    return _marks[name]
+
+
+def marks():
+    """
+    Returns the recorded steps in the order they happened.
+
+    Returns:
+        dict: Step name -> milliseconds since process launch.
+    """
+    return dict(_marks)
+
+
+def report_line():
+    """Returns the marks as a single JSON line, as printed in CALENDAR_BOOT_REPORT mode."""
+    return json.dumps({'boot_ms': {name: round(ms, 1) for name, ms in _marks.items()}})
@@ -0,0 +1,168 @@
+"""
+text_cache.py
+
+Shared cache of rasterized text textures for the Family Calendar app.
+
+Markup labels such as "[b]08:00[/b] School run" are parsed and drawn into a
+texture every time a Kivy Label is created. The calendar rebuilds its grid on
+every navigation, so the same strings get rasterized over and over. This module
+keeps the rendered textures around so identical text is drawn only once.
+
+Includes:
+- LRU eviction bounded by an estimated GPU memory budget
+- Layout-only text measurement for virtualized lists
+- Hit / miss / eviction counters for diagnostics
+
+Author: Attila Bordan
+"""
+from collections import OrderedDict
+
+from kivy.core.text.markup import MarkupLabel as CoreMarkupLabel
+
+
+class TextureCache:
+    """
+    An LRU cache of text textures keyed by everything that affects rendering:
+    text (including markup), font, size, color, wrap width and alignment.
+
+    Args:
+        max_bytes (int): Approximate memory budget for cached textures (RGBA).
+    """
+    def __init__(self, max_bytes=8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+
+    def get(self, text, font_name='Roboto', font_size=15, color=(1, 1, 1, 1), width=None,
+            halign='left', bold=False):
+        """
+        Returns a texture for the given text, rendering it only on a cache miss.
+
+        Args:
+            text (str): Text to render. Markup tags are honored.
+            font_name (str): Font name or path.
+            font_size (float): Font size in pixels.
+            color (tuple): Base RGBA color (markup [color] tags override it).
+            width (float, optional): Wrap width in pixels, or None for a single line.
+            halign (str): Horizontal alignment used when wrapping.
+            bold (bool): Render the whole text in bold.
+
+        Returns:
+            Texture: The rasterized text, or None for empty text.
+        """
+        if not text:
+            return None
+
+        key = self._make_key(text, font_name, font_size, color, width, halign, bold)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        label = CoreMarkupLabel(
+            text=text,
+            font_name=font_name,
+            font_size=font_size,
+            color=color,
+            bold=bold,
+            halign=halign,
+            text_size=(key[4], None),
+        )
+        label.refresh()
+        texture = label.texture
+        if texture is None:
+            return None
+
+        nbytes = texture.width * texture.height * 4
+        self._entries[key] = (texture, nbytes)
+        self.current_bytes += nbytes
+        self._evict()
+        return texture
+
+    def measure(self, text, font_name='Roboto', font_size=15, width=None, halign='left', bold=False):
+        """
+        Returns the size the text would occupy, without rasterizing it.
+
+        Sizes are remembered, so each distinct row of a list is measured once.
+
+        Args:
+            text (str): Text to measure. Markup tags are honored.
+            font_name (str): Font name or path.
+            font_size (float): Font size in pixels.
+            width (float, optional): Wrap width in pixels, or None for a single line.
+            halign (str): Horizontal alignment used when wrapping.
+            bold (bool): Measure the whole text in bold.
+
+        Returns:
+            tuple: (width, height) in pixels.
+        """
+        if not text:
+            return 0, 0
+
+        key = self._make_key(text, font_name, font_size, None, width, halign, bold)
+        size = self._sizes.get(key)
+        if size is None:
+            label = CoreMarkupLabel(
+                text=text,
+                font_name=font_name,
+                font_size=font_size,
+                bold=bold,
+                halign=halign,
+                text_size=(key[4], None),
+            )
+            label.resolve_font_name()
+            size = tuple(label.render())
+
+            # Measurements are tiny, but don't let them grow without bound
+            if len(self._sizes) >= 4096:
+                self._sizes.clear()
+            self._sizes[key] = size
+        return size
+
+    @staticmethod
+    def _make_key(text, font_name, font_size, color, width, halign, bold):
+        width = int(width) if width else None
+        color = tuple(color) if color is not None else None
+        return text, font_name, round(font_size, 1), color, width, halign, bold
+
+    def _evict(self):
+        """Drops least recently used textures until the cache fits its budget."""
+        while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.current_bytes -= nbytes
+            self.evictions += 1
+
+    def clear(self):
+        """Releases every cached texture (e.g. after a theme change)."""
+        self._entries.clear()
+        self._sizes.clear()
+        self.current_bytes = 0
+
+    def stats(self):
+        """
+        Returns cache counters for diagnostics.
+
+        Returns:
+            dict: entries, bytes, max_bytes, hits, misses, evictions and hit_ratio.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Shared instance used by all calendar views
+texture_cache = TextureCache()
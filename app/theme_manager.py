@@ -5,15 +5,214 @@ Handles theme selection and management for the Family Calendar application.
 
 Features:
 - Predefined color themes with light/dark modes and seasonal variants.
-- Automatic switching between themes based on time.
-- Persistent user settings stored in JSON.
+- Themes compiled once into immutable objects with pre-parsed RGBA tuples.
+- Automatic switching between themes based on time, with the next
+  transition computed up front so the UI can schedule it exactly.
+- Persistent user settings stored in JSON (debounced, atomic, hot-reloaded).
 - Manual override and custom time ranges for light/dark themes.
 
 Author: Attila Bordan
 """
 import datetime
-import json
-import os
+from collections import namedtuple
+from collections.abc import Mapping
+from functools import lru_cache
+from types import MappingProxyType
+
+from app.settings_store import SettingsStore
+from app.log import get_logger
+
+logger = get_logger(__name__)
+
+# Predefined theme styles with color settings for UI elements
+THEMES = {
+    'Light': {
+        'bg_color': '#FFEFD5',
+        'text_color': '#000000',
+        'border_color': '#000000',
+        'button_color': '#DADADA',
+        'cell_color': '#E5E5E5',
+        'button_border_color': '#B3B3B3',
+        'popup_border_color': '#333333',
+        'nav_button_color': '#DADADA',
+        'input_bg_color': '#FFEFD5',
+        'time_color': '#D2691E',
+        'title_color': '#222222',
+        'location_color': '#555555',
+        'notes_color': '#777777',
+        "scrollbar_color": "#66d9ed",
+        "scrollbar_inactive_color": "#cccccc",
+    },
+    'Dark': {
+        'bg_color': '#1A1A1A',
+        'text_color': '#FFFFFF',
+        'border_color': '#FFFFFF',
+        'button_color': '#444444',
+        'cell_color': '#333333',
+        'button_border_color': '#666666',
+        'popup_border_color': '#333333',
+        'nav_button_color': '#444444',
+        'input_bg_color': '#444444',
+        'time_color': '#FFC107',
+        'title_color': '#FFFFFF',
+        'location_color': '#AAAAAA',
+        'notes_color': '#888888',
+        "scrollbar_color": "#A6F6FF",
+        "scrollbar_inactive_color": "#444444",
+    },
+    'Blueberry': {
+        'bg_color': '#334080',
+        'text_color': '#EEEEEE',
+        'border_color': '#CCDDFF',
+        'button_color': '#4B5FA3',
+        'cell_color': '#4B5FA3',
+        'button_border_color': '#8FA3E0',
+        'popup_border_color': '#222222',
+        'nav_button_color': '#3C4F94',
+        'input_bg_color': '#4B5FA3',
+        'time_color': '#FFC107',
+        'title_color': '#EEEEEE',
+        'location_color': '#AAAAAA',
+        'notes_color': '#888888',
+        "scrollbar_color": "#9EDDFF",
+        "scrollbar_inactive_color": "#333344",
+    },
+    'Sunset': {
+        'bg_color': '#FFDAB3',
+        'text_color': '#222222',
+        'border_color': '#CC5522',
+        'button_color': '#FFB7A2',
+        'cell_color': '#FFB380',
+        'button_border_color': '#CC704D',
+        'popup_border_color': '#333333',
+        'nav_button_color': '#FFA07A',
+        'input_bg_color': '#FFDAB3',
+        'time_color': '#C1440E',
+        'title_color': '#222222',
+        'location_color': '#5C3B1E',
+        'notes_color': '#7A5C4F',
+        "scrollbar_color": "#FFB347",
+        "scrollbar_inactive_color": "#704214",
+    }
+}
+
+
+@lru_cache(maxsize=256)
+def hex_to_rgba(hex_color):
+    """
+    Converts a '#RRGGBB' or '#RRGGBBAA' string to an RGBA tuple of floats (0-1).
+
+    Results are cached, so repeated conversions of the same color are free.
+
+    :param hex_color: Hex color string, with or without the leading '#'.
+    :return: (r, g, b, a) tuple.
+    """
+    value = hex_color.lstrip('#')
+    channels = [int(value[i:i + 2], 16) / 255.0 for i in range(0, len(value), 2)]
+    if len(channels) == 3:
+        channels.append(1.0)
+    return tuple(channels)
+
+
+@lru_cache(maxsize=32)
+def parse_hhmm(value):
+    """
+    Parses an 'HH:MM' string into a time, caching the result.
+
+    :param value: Time string, e.g. '07:00'.
+    :return: datetime.time
+    :raises ValueError: If the string is not a valid HH:MM time.
+    """
+    return datetime.datetime.strptime(value, '%H:%M').time()
+
+
+ThemeColors = namedtuple('ThemeColors', THEMES['Light'].keys())
+
+
+class CompiledTheme(Mapping):
+    """
+    An immutable, pre-parsed theme.
+
+    Dict-style access (theme['text_color'], theme.get(...)) still returns the
+    hex strings, so existing code keeps working. Render paths should use the
+    pre-computed attributes instead:
+    - theme.rgba.<key>: RGBA tuple for Color instructions and widget colors
+    - theme.hex.<key>: hex string
+    - theme.tag.<key>: opening markup tag, e.g. '[color=#000000]'
+
+    :param name: Theme name.
+    :param colors: Dict of color key -> hex string.
+    """
+    __slots__ = ('name', 'hex', 'rgba', 'tag', '_colors')
+
+    def __init__(self, name, colors):
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, '_colors', MappingProxyType(dict(colors)))
+        object.__setattr__(self, 'hex', ThemeColors(**colors))
+        object.__setattr__(self, 'rgba', ThemeColors(**{k: hex_to_rgba(v) for k, v in colors.items()}))
+        object.__setattr__(self, 'tag', ThemeColors(**{k: f'[color={v}]' for k, v in colors.items()}))
+
+    def __setattr__(self, key, value):
+        raise AttributeError('CompiledTheme is immutable')
+
+    def __getitem__(self, key):
+        return self._colors[key]
+
+    def __iter__(self):
+        return iter(self._colors)
+
+    def __len__(self):
+        return len(self._colors)
+
+    def __repr__(self):
+        return f'CompiledTheme({self.name!r})'
+
+
+# Compiled once for the lifetime of the app
+COMPILED_THEMES = MappingProxyType({name: CompiledTheme(name, colors) for name, colors in THEMES.items()})
+
+
+def _is_hhmm(value):
+    parse_hhmm(value)
+    return True
+
+
+def _is_coordinate(limit):
+    return lambda value: value is None or (isinstance(value, (int, float)) and -limit <= value <= limit)
+
+
+# Default settings used if no config file exists
+DEFAULT_SETTINGS = {
+    'auto_mode': True,
+    'dark_start': '20:00',
+    'light_start': '07:00',
+    'preferred_theme': 'Light',  # used if auto_mode is false
+    'active_theme': 'Light',  # gets dynamically updated
+    'manual_lat': None,  # manual weather location, overrides IP lookup
+    'manual_lon': None,
+    'manual_city': '',
+}
+
+SETTINGS_VALIDATORS = {
+    'auto_mode': lambda value: isinstance(value, bool),
+    'dark_start': _is_hhmm,
+    'light_start': _is_hhmm,
+    'preferred_theme': lambda value: value in THEMES,
+    'active_theme': lambda value: value in THEMES,
+    'manual_lat': _is_coordinate(90),
+    'manual_lon': _is_coordinate(180),
+    'manual_city': lambda value: isinstance(value, str),
+}
+
+_settings_store = None
+
+
+def get_settings_store():
+    """Returns the shared settings store, loading it on first use (never writes)."""
+    global _settings_store
+    if _settings_store is None:
+        _settings_store = SettingsStore(ThemeManager.SETTINGS_FILE, DEFAULT_SETTINGS, SETTINGS_VALIDATORS)
+    return _settings_store
 
 
 class ThemeManager:
@@ -25,115 +224,29 @@ class ThemeManager:
 
     def __init__(self):
 
-        # Predefined theme styles with color settings for UI elements
-        self.themes = {
-            'Light': {
-                'bg_color': '#FFEFD5',
-                'text_color': '#000000',
-                'border_color': '#000000',
-                'button_color': '#DADADA',
-                'cell_color': '#E5E5E5',
-                'button_border_color': '#B3B3B3',
-                'popup_border_color': '#333333',
-                'nav_button_color': '#DADADA',
-                'input_bg_color': '#FFEFD5',
-                'time_color': '#D2691E',
-                'title_color': '#222222',
-                'location_color': '#555555',
-                'notes_color': '#777777',
-                "scrollbar_color": "#66d9ed",
-                "scrollbar_inactive_color": "#cccccc",
-            },
-            'Dark': {
-                'bg_color': '#1A1A1A',
-                'text_color': '#FFFFFF',
-                'border_color': '#FFFFFF',
-                'button_color': '#444444',
-                'cell_color': '#333333',
-                'button_border_color': '#666666',
-                'popup_border_color': '#333333',
-                'nav_button_color': '#444444',
-                'input_bg_color': '#444444',
-                'time_color': '#FFC107',
-                'title_color': '#FFFFFF',
-                'location_color': '#AAAAAA',
-                'notes_color': '#888888',
-                "scrollbar_color": "#A6F6FF",
-                "scrollbar_inactive_color": "#444444",
-            },
-            'Blueberry': {
-                'bg_color': '#334080',
-                'text_color': '#EEEEEE',
-                'border_color': '#CCDDFF',
-                'button_color': '#4B5FA3',
-                'cell_color': '#4B5FA3',
-                'button_border_color': '#8FA3E0',
-                'popup_border_color': '#222222',
-                'nav_button_color': '#3C4F94',
-                'input_bg_color': '#4B5FA3',
-                'time_color': '#FFC107',
-                'title_color': '#EEEEEE',
-                'location_color': '#AAAAAA',
-                'notes_color': '#888888',
-                "scrollbar_color": "#9EDDFF",
-                "scrollbar_inactive_color": "#333344",
-            },
-            'Sunset': {
-                'bg_color': '#FFDAB3',
-                'text_color': '#222222',
-                'border_color': '#CC5522',
-                'button_color': '#FFB7A2',
-                'cell_color': '#FFB380',
-                'button_border_color': '#CC704D',
-                'popup_border_color': '#333333',
-                'nav_button_color': '#FFA07A',
-                'input_bg_color': '#FFDAB3',
-                'time_color': '#C1440E',
-                'title_color': '#222222',
-                'location_color': '#5C3B1E',
-                'notes_color': '#7A5C4F',
-                "scrollbar_color": "#FFB347",
-                "scrollbar_inactive_color": "#704214",
-            }
-        }
-
-        # Default settings used if no config file exists
-        self.settings = {
-            'auto_mode': True,
-            'dark_start': '20:00',
-            'light_start': '07:00',
-            'preferred_theme': 'Light',  # used if auto_mode is false
-            'active_theme': 'Light'  # gets dynamically updated
-        }
-
-        # Load saved settings if present
-        self.load_settings()
+        # Themes are compiled once at import; every manager shares them
+        self.themes = COMPILED_THEMES
+
+        # Settings are shared with the store and updated in place on hot reload
+        self.store = get_settings_store()
+        self.settings = self.store.data
 
         # Apply current theme based on settings
         self.update_theme()
 
     def load_settings(self):
-        """Loads user theme preferences from a JSON file if available."""
-        if os.path.exists(self.SETTINGS_FILE):
-            try:
-                with open(self.SETTINGS_FILE, 'r') as f:
-                    self.settings.update(json.load(f))
-            except Exception as e:
-                print(f'Error loading theme settings: {e}')
+        """Re-reads user theme preferences from disk, validating every value."""
+        self.store.load()
 
     def save_settings(self):
-        """Saves user theme preferences to a JSON file."""
-        try:
-            with open(self.SETTINGS_FILE, 'w') as f:
-                json.dump(self.settings, f, indent=4)
-        except Exception as e:
-            print(f'Error saving theme settings: {e}')
+        """Queues user theme preferences to be written in the background."""
+        self.store.save()
 
     def get_theme(self):
         """
-        Returns the currently active theme's color dictionary.
+        Returns the currently active theme.
 
-        :return: dict of color values for UI elements.
+        :return: CompiledTheme with hex values (dict access) and pre-parsed rgba/tag attributes.
         """
         return self.themes[self.settings['active_theme']]
 
@@ -144,18 +257,57 @@ class ThemeManager:
         In auto mode, the app switches between light and dark themes
         based on the current system time and user-defined thresholds.
         """
-        if self.settings['auto_mode']:
-            now = datetime.datetime.now().time()
-            dark_start = datetime.datetime.strptime(self.settings['dark_start'], '%H:%M').time()
-            light_start = datetime.datetime.strptime(self.settings['light_start'], '%H:%M').time()
-
-            if light_start <= now < dark_start:
-                self.settings['active_theme'] = self.settings['preferred_theme']
-            else:
-                self.settings['active_theme'] = 'Dark'
+        if self.settings['auto_mode'] and self.is_dark_period():
+            self.settings['active_theme'] = 'Dark'
         else:
             self.settings['active_theme'] = self.settings['preferred_theme']
 
+    def is_dark_period(self, now=None):
+        """
+        Checks whether the given time falls in the configured dark window.
+
+        :param now: datetime to check, defaults to the current time.
+        :return: True between dark_start and the next light_start.
+        """
+        now = (now or datetime.datetime.now()).time()
+        light_start = parse_hhmm(self.settings['light_start'])
+        dark_start = parse_hhmm(self.settings['dark_start'])
+
+        if light_start <= dark_start:
+            return not (light_start <= now < dark_start)
+        # Light window wraps past midnight
+        return dark_start <= now < light_start
+
+    def next_transition(self, now=None):
+        """
+        Computes when the auto mode will next switch between light and dark.
+
+        :param now: datetime to compute from, defaults to the current time.
+        :return: datetime of the next switch, or None if auto mode is off.
+        """
+        if not self.settings['auto_mode']:
+            return None
+
+        now = now or datetime.datetime.now()
+        candidates = []
+        for key in ('light_start', 'dark_start'):
+            boundary = datetime.datetime.combine(now.date(), parse_hhmm(self.settings[key]))
+            if boundary <= now:
+                boundary += datetime.timedelta(days=1)
+            candidates.append(boundary)
+        return min(candidates)
+
+    def seconds_until_next_transition(self, now=None):
+        """
+        Returns the delay until the next light/dark switch.
+
+        :param now: datetime to compute from, defaults to the current time.
+        :return: Seconds as float, or None if auto mode is off.
+        """
+        now = now or datetime.datetime.now()
+        transition = self.next_transition(now)
+        return (transition - now).total_seconds() if transition else None
+
     def toggle_auto_mode(self, enabled: bool):
         """
         Enables or disables automatic light/dark mode switching.
@@ -177,6 +329,38 @@ class ThemeManager:
             self.update_theme()
             self.save_settings()
 
+    def get_location_override(self):
+        """
+        Returns the manual weather location, if one is configured.
+
+        :return: (lat, lon, city) tuple, or None to use IP geolocation.
+        """
+        lat, lon = self.settings.get('manual_lat'), self.settings.get('manual_lon')
+        if lat is None or lon is None:
+            return None
+        return lat, lon, self.settings.get('manual_city', '')
+
+    def set_location_override(self, lat, lon, city=''):
+        """
+        Sets or clears the manual weather location.
+
+        :param lat: Latitude as float, or None to clear the override.
+        :param lon: Longitude as float, or None to clear the override.
+        :param city: Optional city name to display.
+
+        Out-of-range or non-numeric coordinates, or only one of the two, are ignored
+        and the current location is kept.
+        """
+        valid = (self.store.validate('manual_lat', lat) and self.store.validate('manual_lon', lon)
+                 and self.store.validate('manual_city', city) and (lat is None) == (lon is None))
+        if not valid:
+            logger.warning('Ignoring invalid weather location: %r, %r', lat, lon)
+            return
+        self.settings['manual_lat'] = lat
+        self.settings['manual_lon'] = lon
+        self.settings['manual_city'] = city
+        self.save_settings()
+
     def set_dark_light_times(self, light_time: str, dark_time: str):
         """
         Configures custom switching times for light and dark modes.
@@ -184,6 +368,9 @@ class ThemeManager:
         :param light_time: Start time for light mode (HH:MM format).
         :param dark_time: Start time for dark mode (HH:MM format).
         """
+        if not (self.store.validate('light_start', light_time) and self.store.validate('dark_start', dark_time)):
+            logger.warning('Ignoring invalid light/dark times: %r, %r', light_time, dark_time)
+            return
         self.settings['light_start'] = light_time
         self.settings['dark_start'] = dark_time
         self.update_theme()
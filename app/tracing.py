@@ -0,0 +1,189 @@
+"""
+tracing.py
+
+Span tracing across the UI, database and network code, viewable as a flame
+chart in chrome://tracing or https://ui.perfetto.dev.
+
+Usage:
+    with span('load_month', cat='db', month=5):
+        ...
+
+    @traced(cat='ui')
+    def build_calendar(...): ...
+
+Finished spans go into a bounded ring buffer and are written as Chrome trace
+JSON by `dump()` (on demand, e.g. on SIGUSR1), so one slow navigation can be
+inspected after the fact. Tracing is off unless CALENDAR_TRACE=1 or
+`enable()` is called; while off, a span costs one attribute check.
+
+This module does not import Kivy and is safe to call from any thread.
+
+Author: Attila Bordan
+"""
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from app.log import get_logger
+
+logger = get_logger(__name__)
+
+TRACE_CAPACITY = 20000
+TRACE_DIR = os.getenv('CALENDAR_TRACE_DIR', '.')
+
+
+class Tracer:
+    """
+    Collects finished spans in a ring buffer.
+
+    Args:
+        capacity (int): Spans kept; the oldest are dropped first.
+        enabled (bool): Whether spans are recorded.
+    """
+    def __init__(self, capacity=TRACE_CAPACITY, enabled=False):
+        self.enabled = enabled
+        self.events = deque(maxlen=capacity)
+        self._threads = {}
+        self._pid = os.getpid()
+        self._origin = time.perf_counter()
+
+    def add(self, name, cat, start, end, args=None):
+        """
+        Records a finished span.
+
+        Args:
+            name (str): Span name.
+            cat (str): Category, e.g. 'ui', 'db' or 'net'.
+            start (float): time.perf_counter() at the start.
+            end (float): time.perf_counter() at the end.
+            args (dict, optional): Extra values shown in the trace viewer.
+        """
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        # Appending to a deque is atomic, so no lock is needed
+        self.events.append((name, cat, start, end, tid, args))
+
+    def clear(self):
+        self.events.clear()
+
+    def to_chrome_trace(self):
+        """
+        Converts the buffered spans to the Chrome trace event format.
+
+        Returns:
+            dict: {'traceEvents': [...], 'displayTimeUnit': 'ms'}
+        """
+        trace_events = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': tid, 'args': {'name': thread_name}}
+            for tid, thread_name in list(self._threads.items())
+        ]
+        for name, cat, start, end, tid, args in list(self.events):
+            trace_event = {
+                'name': name,
+                'cat': cat,
+                'ph': 'X',
+                'ts': round((start - self._origin) * 1e6, 3),
+                'dur': round((end - start) * 1e6, 3),
+                'pid': self._pid,
+                'tid': tid,
+            }
+            if args:
+                trace_event['args'] = args
+            trace_events.append(trace_event)
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+
+tracer = Tracer(enabled=os.getenv('CALENDAR_TRACE') == '1')
+
+
+class _Span:
+    __slots__ = ('name', 'cat', 'args', 'start')
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        args = self.args
+        if exc_type is not None:
+            args = dict(args or {}, error=exc_type.__name__)
+        tracer.add(self.name, self.cat, self.start, time.perf_counter(), args)
+        return False
+
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+def span(name, cat='app', **args):
+    """
+    Context manager recording the enclosed block as a span.
+
+    Args:
+        name (str): Span name.
+        cat (str): Category shown in the trace viewer.
+        **args: Extra values attached to the span.
+    """
+    if not tracer.enabled:
+        return _NULL_SPAN
+    return _Span(name, cat, args or None)
+
+
+def traced(name=None, cat='app'):
+    """
+    Decorator recording every call of a function as a span.
+
+    Args:
+        name (str, optional): Span name, defaults to the function's qualified name.
+        cat (str): Category shown in the trace viewer.
+    """
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                tracer.add(label, cat, start, time.perf_counter())
+        return wrapper
+    return decorator
+
+
+def enable(enabled=True):
+    """Turns span recording on or off."""
+    tracer.enabled = enabled
+
+
+def dump(path=None):
+    """
+    Writes the buffered spans as Chrome trace JSON.
+
+    Args:
+        path (str, optional): Output file, defaults to trace-<timestamp>.json in CALENDAR_TRACE_DIR.
+
+    Returns:
+        str or None: The file written, or None if it could not be written.
+    """
+    if path is None:
+        path = os.path.join(TRACE_DIR, time.strftime('trace-%Y%m%d-%H%M%S.json'))
+    try:
+        with open(path, 'w') as f:
+            json.dump(tracer.to_chrome_trace(), f)
+    except OSError as e:
+        logger.error('Error writing trace to %s: %s', path, e)
+        return None
+    logger.info('Wrote %d spans to %s', len(tracer.events), path)
+    return path
@@ -10,9 +10,9 @@ Author: Attila Bordan
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
 from kivy.graphics import Color, RoundedRectangle
-from kivy.utils import get_color_from_hex
 
-import time
+from app.theme_manager import hex_to_rgba
+
 import platform
 
 is_raspberry_pi = platform.machine().startswith('arm')
@@ -25,7 +25,7 @@ def create_themed_button(text, theme, on_press=None, bg_override=None, font_over
 
     Args:
         text (str): The text displayed on the button.
-        theme (dict): A dictionary of theme colors.
+        theme (CompiledTheme): The active theme.
         on_press (callable, optional): Function to call on press.
         on_release (callable, optional): Function to call on release.
         bg_override (str, optional): Optional background hex color.
@@ -34,6 +34,8 @@ def create_themed_button(text, theme, on_press=None, bg_override=None, font_over
     Returns:
         BoxLayout: The layout containing the styled button.
     """
+    bg_color = hex_to_rgba(bg_override) if bg_override else theme.rgba.button_color
+
     box = BoxLayout(
         size_hint=(1, None),
         height=35,
@@ -46,7 +48,7 @@ def create_themed_button(text, theme, on_press=None, bg_override=None, font_over
         Color(0, 0, 0, 0.25)
         shadow = RoundedRectangle(pos=(box.x + 2, box.y - 2), size=box.size, radius=[10])
 
-        Color(*get_color_from_hex(bg_override or theme['button_color']))
+        Color(*bg_color)
         button_bg = RoundedRectangle(pos=box.pos, size=box.size, radius=[10])
 
     def update_graphics(*_):
@@ -60,8 +62,8 @@ def create_themed_button(text, theme, on_press=None, bg_override=None, font_over
     button = Button(
         text=text,
         background_normal='',
-        background_color=get_color_from_hex(bg_override or theme['button_color']),
-        color=get_color_from_hex(theme['text_color']),
+        background_color=bg_color,
+        color=theme.rgba.text_color,
         size_hint=(1, 1),
         halign='center',
         valign='middle',
@@ -69,12 +71,6 @@ def create_themed_button(text, theme, on_press=None, bg_override=None, font_over
     )
     button.text_size = (None, None)
 
-    def debug_touch(instance, touch):
-        print(f"DEBUG: on_touch_down @ {time.time()} on {instance.text}")
-        return False  # let event continue
-
-    button.bind(on_touch_down=debug_touch)
-
     if on_press:
         button.bind(on_press=on_press)
     if on_release:
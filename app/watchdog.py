@@ -0,0 +1,153 @@
+"""
+watchdog.py
+
+Main-thread stall watchdog for the Family Calendar app.
+
+The Kivy clock pets the watchdog every frame. A background thread checks how
+long ago the last pet was; when a frame takes longer than the threshold
+(a blocking network call, a slow SD-card fsync, a huge rebuild), it grabs
+the main thread's current stack with `sys._current_frames()` and logs it.
+
+Identical stacks are deduplicated: the first occurrence is logged in full,
+repeats only by id and count, so a recurring stall does not flood the log.
+When the main thread recovers, the total stall time is logged and recorded
+under 'main_thread_stall' in app.instrumentation.
+
+This module does not import Kivy.
+
+Author: Attila Bordan
+"""
+import hashlib
+import os
+import sys
+import threading
+import time
+import traceback
+
+from app import instrumentation
+from app.log import get_logger
+
+logger = get_logger(__name__)
+
+# Frames longer than this (ms) are reported; 0 disables the watchdog
+STALL_THRESHOLD_MS = float(os.getenv('CALENDAR_STALL_MS', '250'))
+
+
+class StallWatchdog:
+    """
+    Detects main-thread stalls and captures where they happen.
+
+    Args:
+        threshold (float): Seconds without a pet before a stall is reported.
+        poll_interval (float): How often the watchdog thread checks, in seconds.
+        thread_id (int, optional): Thread to watch, defaults to the main thread.
+        clock (callable): Monotonic time source (overridable for testing).
+    """
+    def __init__(self, threshold=STALL_THRESHOLD_MS / 1000, poll_interval=0.05, thread_id=None,
+                 clock=time.monotonic):
+        self.threshold = threshold
+        self.poll_interval = poll_interval
+        self.thread_id = thread_id or threading.main_thread().ident
+        self.clock = clock
+        self.stacks = {}
+        self._last_pet = clock()
+        self._stall = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def pet(self, *_):
+        """Marks the watched thread as alive (call once per frame, e.g. from Clock)."""
+        self._last_pet = self.clock()
+
+    def start(self):
+        """Starts the watchdog thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self.pet()
+        self._thread = threading.Thread(target=self._run, name='stall-watchdog', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the watchdog thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            self.check()
+
+    def check(self):
+        """Runs one watchdog check (called periodically by the watchdog thread)."""
+        last_pet = self._last_pet
+        stalled_for = self.clock() - last_pet
+
+        if self._stall is not None and self._stall['pet'] != last_pet:
+            self._finish_stall(last_pet)
+
+        if self._stall is None and stalled_for >= self.threshold:
+            stack_id = self._capture()
+            self._stall = {'pet': last_pet, 'stack_id': stack_id}
+            self._report(stack_id, stalled_for)
+
+    def _capture(self):
+        """Records the watched thread's current stack and returns its id."""
+        frame = sys._current_frames().get(self.thread_id)
+        lines = traceback.format_stack(frame) if frame is not None else ['<thread not found>\n']
+        del frame
+        # Line numbers are part of the key, so different stalls in one function stay apart
+        stack_id = hashlib.sha1(''.join(lines).encode()).hexdigest()[:8]
+        entry = self.stacks.get(stack_id)
+        if entry is None:
+            entry = self.stacks[stack_id] = {'stack': ''.join(lines), 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+        entry['count'] += 1
+        return stack_id
+
+    def _report(self, stack_id, stalled_for):
+        entry = self.stacks[stack_id]
+        if entry['count'] == 1:
+            logger.warning('Main thread stalled for %.0f ms so far (stack %s):\n%s',
+                           stalled_for * 1000, stack_id, entry['stack'])
+        else:
+            logger.warning('Main thread stalled for %.0f ms so far (stack %s, seen %d times)',
+                           stalled_for * 1000, stack_id, entry['count'])
+
+    def _finish_stall(self, resumed_pet):
+        duration = resumed_pet - self._stall['pet']
+        entry = self.stacks[self._stall['stack_id']]
+        entry['total_ms'] += duration * 1000
+        entry['max_ms'] = max(entry['max_ms'], duration * 1000)
+        instrumentation.record('main_thread_stall', duration)
+        logger.warning('Main thread stall ended after %.0f ms (stack %s)', duration * 1000, self._stall['stack_id'])
+        self._stall = None
+
+    def stats(self):
+        """
+        Returns the deduplicated stalls, most frequent first.
+
+        Returns:
+            list: Dicts with stack_id, count, total_ms, max_ms and stack.
+        """
+        return sorted(
+            (dict(entry, stack_id=stack_id) for stack_id, entry in list(self.stacks.items())),
+            key=lambda entry: entry['count'], reverse=True,
+        )
+
+
+def start_watchdog(threshold_ms=STALL_THRESHOLD_MS):
+    """
+    Starts a watchdog for the calling (main) thread.
+
+    Args:
+        threshold_ms (float): Stall threshold in milliseconds; 0 disables the watchdog.
+
+    Returns:
+        StallWatchdog or None: The running watchdog (remember to pet it every frame), or None if disabled.
+    """
+    if not threshold_ms:
+        return None
+    watchdog = StallWatchdog(threshold=threshold_ms / 1000, thread_id=threading.get_ident())
+    watchdog.start()
+    return watchdog
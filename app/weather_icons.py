@@ -0,0 +1,116 @@
+"""
+weather_icons.py
+
+Local storage and lookup of OpenWeatherMap condition icons.
+
+Icons are resolved without touching the network on the UI thread:
+- A bundled Kivy atlas (assets/weather_icons.atlas) if one has been built
+- Otherwise PNGs cached on disk under assets/weather_icons/, which the weather
+  service downloads once per icon code on its background thread
+
+Decoded textures are kept in memory, so refreshing the weather or rebuilding
+the UI only swaps a texture reference.
+
+To build the atlas from the cached PNGs:
+    python -m kivy.atlas assets/weather_icons 256x256 assets/weather_icons/*.png
+
+Author: Attila Bordan
+"""
+import json
+import os
+
+from app.log import get_logger
+
+logger = get_logger(__name__)
+
+ICON_DIR = os.path.join('assets', 'weather_icons')
+ATLAS_FILE = os.path.join('assets', 'weather_icons.atlas')
+DEFAULT_ICON = os.path.join('assets', 'default_weather.png')
+ICON_URL = 'https://openweathermap.org/img/wn/{code}.png'
+
+_atlas_codes = None
+_textures = {}
+
+
+def _load_atlas_codes():
+    """Returns the icon codes contained in the bundled atlas (read once)."""
+    global _atlas_codes
+    if _atlas_codes is None:
+        _atlas_codes = set()
+        if os.path.exists(ATLAS_FILE):
+            try:
+                with open(ATLAS_FILE, 'r') as f:
+                    for regions in json.load(f).values():
+                        _atlas_codes.update(regions)
+            except Exception as e:
+                logger.error('Error reading weather icon atlas: %s', e)
+    return _atlas_codes
+
+
+def icon_source(code):
+    """
+    Returns a local Kivy image source for an icon code.
+
+    Args:
+        code (str): OpenWeatherMap icon code, e.g. '01d'.
+
+    Returns:
+        str: An atlas:// URI or file path, or None if the icon is not available locally.
+    """
+    if code in _load_atlas_codes():
+        return f'atlas://{ATLAS_FILE[:-len(".atlas")]}/{code}'
+
+    path = os.path.join(ICON_DIR, f'{code}.png')
+    return path if os.path.exists(path) else None
+
+
+def ensure_icon(code, timeout=5):
+    """
+    Makes sure an icon is available locally, downloading it once if needed.
+    Blocking: call from a background thread only.
+
+    Args:
+        code (str): OpenWeatherMap icon code.
+        timeout (float): Download timeout in seconds.
+
+    Returns:
+        bool: True if the icon is available locally.
+    """
+    if not code or icon_source(code):
+        return bool(code)
+
+    from app.http_client import get_client
+
+    path = os.path.join(ICON_DIR, f'{code}.png')
+    tmp_path = f'{path}.tmp'
+    try:
+        response = get_client().get(ICON_URL.format(code=code), timeout=timeout)
+        response.raise_for_status()
+        os.makedirs(ICON_DIR, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            f.write(response.content)
+        os.replace(tmp_path, path)
+        return True
+    except Exception as e:
+        logger.warning('Failed to download weather icon %s: %s', code, e)
+        return False
+
+
+def get_icon_texture(code):
+    """
+    Returns the decoded texture for an icon code, falling back to the default icon.
+    Textures are decoded once and kept in memory. Must be called on the UI thread.
+
+    Args:
+        code (str): OpenWeatherMap icon code, or None.
+
+    Returns:
+        Texture: The icon texture.
+    """
+    source = (icon_source(code) if code else None) or DEFAULT_ICON
+    texture = _textures.get(source)
+    if texture is None:
+        from kivy.core.image import Image as CoreImage
+        texture = CoreImage(source).texture
+        _textures[source] = texture
+    return texture
@@ -0,0 +1,313 @@
+"""
+weather_service.py
+
+Background weather fetching for the Family Calendar app.
+
+Network calls never run on the Kivy main thread. A single worker thread
+refreshes the weather on an interval, with strict timeouts, retries with
+exponential backoff and a circuit breaker that stops hammering a dead link.
+The last good reading is persisted to disk so the top bar can show it
+instantly at startup and while offline.
+
+The multi-day forecast is fetched in one call, cached on disk with a TTL
+keyed by location, and exposed as an in-memory dict so rendering code can
+look days up without ever touching the network.
+
+This module does not import Kivy, and the HTTP stack is only imported by the
+worker thread's first fetch, so showing the cached reading costs nothing at
+startup. Listeners are plain callables and the UI is responsible for hopping
+back onto the main thread.
+
+Author: Attila Bordan
+"""
+import json
+import os
+import threading
+import time
+
+from app.instrumentation import timed_function
+from app.location_provider import LocationProvider
+from app.weather_icons import ensure_icon
+from app.log import get_logger
+
+logger = get_logger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing service for a while after repeated failures.
+
+    States:
+    - closed: calls are allowed
+    - open: calls are refused until `reset_timeout` has passed
+    - half-open: one trial call is allowed; success closes, failure re-opens
+
+    Args:
+        failure_threshold (int): Consecutive failures before the breaker opens.
+        reset_timeout (float): Seconds to stay open before allowing a trial call.
+        clock (callable): Time source, injectable for testing.
+    """
+    def __init__(self, failure_threshold=3, reset_timeout=300, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        """Returns True if a call may be attempted now."""
+        return self.state != 'open'
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold or self.opened_at is not None:
+            self.opened_at = self.clock()
+
+
+class WeatherService:
+    """
+    Periodically fetches location and weather on a background thread.
+
+    Readings are dicts with: celsius, fahrenheit, icon, city, fetched_at (epoch seconds).
+    The forecast is a dict of ISO date string -> {'high', 'low', 'icon'}; `forecast_version`
+    increases whenever it changes so views know when to redraw.
+
+    Args:
+        cache_file (str): Where the last good reading is stored.
+        refresh_interval (float): Seconds between refreshes.
+        timeout (float, optional): Per-request timeout in seconds, defaults to the HTTP client's.
+        retries (int): Attempts per refresh before counting it as failed.
+        backoff (float): Base delay in seconds, doubled after each failed attempt.
+        breaker (CircuitBreaker, optional): Breaker guarding the remote APIs.
+        location (LocationProvider, optional): Source of the coordinates to query.
+        forecast_cache_file (str): Where the last forecast is stored.
+        forecast_ttl (float): Seconds before the forecast is fetched again.
+    """
+    CACHE_FILE = 'weather_cache.json'
+    FORECAST_CACHE_FILE = 'forecast_cache.json'
+
+    def __init__(self, cache_file=CACHE_FILE, refresh_interval=1800, timeout=None,
+                 retries=3, backoff=2.0, breaker=None, location=None,
+                 forecast_cache_file=FORECAST_CACHE_FILE, forecast_ttl=3 * 3600):
+        self.cache_file = cache_file
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.location = location or LocationProvider(timeout=timeout)
+
+        self.forecast_cache_file = forecast_cache_file
+        self.forecast_ttl = forecast_ttl
+
+        self.latest = self.load_cached()
+        self._forecast_entry = self._load_json(self.forecast_cache_file) or {}
+        self.forecast = self._forecast_entry.get('days', {})
+        self.forecast_version = 0
+        self.successes = 0
+        self.failures = 0
+
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---------- Listeners ----------
+    def subscribe(self, callback):
+        """
+        Registers a callback for new readings. If a reading (possibly from the
+        disk cache) is already known, the callback receives it immediately.
+
+        Callbacks run on the worker thread for fresh readings.
+        """
+        with self._lock:
+            self._listeners.append(callback)
+        if self.latest:
+            callback(self.latest)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _notify(self, reading):
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(reading)
+            except Exception as e:
+                logger.exception('Weather listener failed: %s', e)
+
+    # ---------- Lifecycle ----------
+    def start(self):
+        """Starts the worker thread (no-op if it is already running)."""
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='weather-service', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Asks the worker thread to exit."""
+        self._stop.set()
+        self._wake.set()
+
+    def is_running(self):
+        return bool(self._thread and self._thread.is_alive())
+
+    def refresh_now(self):
+        """Wakes the worker for an immediate refresh."""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._wake.wait(self.refresh_interval)
+            self._wake.clear()
+
+    # ---------- Fetching ----------
+    def refresh(self):
+        """
+        Fetches a fresh reading, retrying with backoff. Safe to call from any
+        non-UI thread.
+
+        Returns:
+            dict: The new reading, or None if the refresh failed or was skipped.
+        """
+        if not self.breaker.allow():
+            return None
+
+        delay = self.backoff
+        for attempt in range(self.retries):
+            try:
+                reading = self._fetch()
+            except Exception as e:
+                logger.warning('Weather refresh attempt %d failed: %s', attempt + 1, e)
+                if attempt + 1 < self.retries and self._stop.wait(delay):
+                    return None
+                delay *= 2
+                continue
+
+            self.breaker.record_success()
+            self.successes += 1
+            self.latest = reading
+            self.save_cache(reading)
+            self._notify(reading)
+            return reading
+
+        self.breaker.record_failure()
+        self.failures += 1
+        return None
+
+    @timed_function('weather_fetch')
+    def _fetch(self):
+        from app import api_utils
+
+        # Usually answered from the override or disk cache, leaving a single request
+        lat, lon, city = self.location.get_location()
+        celsius, fahrenheit, icon = api_utils.fetch_weather(lat, lon, timeout=self.timeout)
+
+        # Download the condition icon once, here on the worker, so the UI only reads local files
+        ensure_icon(icon, timeout=self.timeout)
+        self._refresh_forecast(lat, lon)
+        return {
+            'celsius': celsius,
+            'fahrenheit': fahrenheit,
+            'icon': icon,
+            'city': city,
+            'fetched_at': time.time(),
+        }
+
+    def _refresh_forecast(self, lat, lon):
+        """Fetches the forecast if the cached one is expired or for another location."""
+        location_key = f'{lat:.2f},{lon:.2f}'
+        entry = self._forecast_entry
+        if entry.get('location') == location_key and time.time() - entry.get('fetched_at', 0) < self.forecast_ttl:
+            return
+
+        from app import api_utils
+
+        # A failed forecast never fails the current-weather refresh
+        try:
+            days = api_utils.fetch_forecast(lat, lon, timeout=self.timeout)
+        except Exception as e:
+            logger.warning('Failed to get forecast: %s', e)
+            return
+
+        for day in days.values():
+            ensure_icon(day['icon'], timeout=self.timeout)
+
+        self._forecast_entry = {'location': location_key, 'fetched_at': time.time(), 'days': days}
+        self._save_json(self.forecast_cache_file, self._forecast_entry)
+        # Swap the whole dict so readers on the UI thread never see a partial update
+        self.forecast = days
+        self.forecast_version += 1
+
+    def get_forecast(self, date_str):
+        """
+        Returns the forecast summary for a day from memory (never hits the network).
+
+        Args:
+            date_str (str): ISO date, e.g. '2025-04-20'.
+
+        Returns:
+            dict: {'high', 'low', 'icon'} or None if the day is not covered.
+        """
+        return self.forecast.get(date_str)
+
+    # ---------- Disk cache ----------
+    def load_cached(self):
+        """Returns the last reading saved to disk, or None."""
+        reading = self._load_json(self.cache_file)
+        return reading if reading and reading.get('icon') else None
+
+    def save_cache(self, reading):
+        """Writes the reading to disk atomically."""
+        self._save_json(self.cache_file, reading)
+
+    @staticmethod
+    def _load_json(path):
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error('Error loading %s: %s', path, e)
+            return None
+
+    @staticmethod
+    def _save_json(path, data):
+        """Writes JSON to disk atomically (temp file + rename)."""
+        tmp_file = f'{path}.tmp'
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_file, path)
+        except Exception as e:
+            logger.error('Error saving %s: %s', path, e)
+
+
+_service = None
+
+
+def get_weather_service():
+    """Returns the shared WeatherService, creating it on first use."""
+    global _service
+    if _service is None:
+        _service = WeatherService()
+    return _service
@@ -0,0 +1,134 @@
+"""
+boot_budget.py
+
+Boot-time budget check: fails (exit status 1) when startup got slower.
+
+Checks, each in fresh interpreters:
+- Import budget: the median `-X importtime` cumulative time of `main` and
+  `UI.calendar_view` over several runs must stay within its budget.
+- Deferred modules: importing UI.calendar_view must not pull in the modules
+  that are only needed after the first frame (.env parsing, the HTTP stack,
+  popups, weekly view, settings, on-screen keyboard).
+- With --launch, launch-to-first-frame: main.py is started with
+  CALENDAR_BOOT_REPORT=1 and the time until the calendar is on screen must
+  stay within the frame budget. This needs a display; on a headless machine:
+      xvfb-run -a -s "-screen 0 1280x800x24" python -m benchmarks.boot_budget --launch
+
+The default budgets are for the Raspberry Pi the calendar runs on; pass
+lower ones on faster machines, or calibrate with benchmarks/import_profile.py.
+
+Author: Attila Bordan
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.import_profile import REPO_ROOT, import_env, import_times, total_ms
+
+# Milliseconds, measured on the Raspberry Pi
+DEFAULT_IMPORT_BUDGETS = {'main': 1500, 'UI.calendar_view': 2500}
+DEFAULT_FRAME_BUDGET = 5000
+
+# Only needed once the user interacts or the app is idle
+DEFERRED_MODULES = (
+    'dotenv',
+    'requests',
+    'app.api_utils',
+    'app.http_client',
+    'UI.event_popup',
+    'UI.settings_popup',
+    'UI.weekly_view',
+    'UI.components.keyboard',
+    'app.metrics_server',
+)
+
+
+def median_import_ms(module, runs):
+    """Returns the median cumulative import time of a module over `runs` fresh interpreters."""
+    return statistics.median(total_ms(import_times(module), module) for _ in range(runs))
+
+
+def eagerly_imported(module, deferred=DEFERRED_MODULES):
+    """
+    Imports a module in a fresh interpreter and lists which deferred modules it loaded.
+
+    Returns:
+        list: Names from `deferred` found in sys.modules after the import.
+    """
+    code = f'import json, sys, {module}; print(json.dumps([m for m in {list(deferred)!r} if m in sys.modules]))'
+    result = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, env=import_env(),
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def launch_marks(timeout):
+    """
+    Launches main.py in boot-report mode and returns its boot marks.
+
+    Returns:
+        dict: Step name -> milliseconds since launch (see app.startup).
+
+    Raises:
+        RuntimeError: If the app did not report within `timeout` seconds.
+    """
+    env = import_env()
+    env['CALENDAR_BOOT_REPORT'] = '1'
+    env['CALENDAR_DB_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='calendar_boot_'), 'boot.db')}"
+    try:
+        result = subprocess.run([sys.executable, 'main.py'], cwd=REPO_ROOT, env=env,
+                                capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f'main.py did not reach its first frame within {timeout} s')
+    for line in result.stdout.splitlines():
+        if line.startswith('{"boot_ms"'):
+            return json.loads(line)['boot_ms']
+    raise RuntimeError(f'main.py exited without a boot report:\n{result.stderr[-2000:]}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Boot-time budget check')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per import measurement')
+    parser.add_argument('--main-budget', type=float, default=DEFAULT_IMPORT_BUDGETS['main'],
+                        help='Import budget for main (ms)')
+    parser.add_argument('--calendar-budget', type=float, default=DEFAULT_IMPORT_BUDGETS['UI.calendar_view'],
+                        help='Import budget for UI.calendar_view (ms)')
+    parser.add_argument('--launch', action='store_true', help='Also measure launch to first frame (needs a display)')
+    parser.add_argument('--frame-budget', type=float, default=DEFAULT_FRAME_BUDGET,
+                        help='Budget from launch until the calendar is on screen (ms)')
+    parser.add_argument('--timeout', type=float, default=60, help='Seconds to wait for the launched app')
+    args = parser.parse_args()
+
+    failures = []
+    report = {'imports': {}}
+    for module, budget in (('main', args.main_budget), ('UI.calendar_view', args.calendar_budget)):
+        elapsed = median_import_ms(module, args.runs)
+        report['imports'][module] = {'median_ms': round(elapsed, 1), 'budget_ms': budget}
+        if elapsed > budget:
+            failures.append(f'import {module} took {elapsed:.0f} ms (budget {budget:.0f} ms)')
+
+    report['eager'] = eagerly_imported('UI.calendar_view')
+    if report['eager']:
+        failures.append(f"importing UI.calendar_view loads deferred modules: {', '.join(report['eager'])}")
+
+    if args.launch:
+        try:
+            report['boot_ms'] = launch_marks(args.timeout)
+        except RuntimeError as e:
+            failures.append(str(e))
+        else:
+            calendar_frame = report['boot_ms'].get('calendar_frame')
+            if calendar_frame is None or calendar_frame > args.frame_budget:
+                failures.append(f'calendar on screen after {calendar_frame} ms (budget {args.frame_budget:.0f} ms)')
+
+    print(json.dumps(report, indent=4))
+    for failure in failures:
+        print(f'OVER BUDGET: {failure}', file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
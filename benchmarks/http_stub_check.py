@@ -0,0 +1,215 @@
+"""
+http_stub_check.py
+
+Checks the HTTP client and the weather circuit breaker against a local stub
+server, so they can be verified without the real APIs or a network.
+
+A `http.server` stub on 127.0.0.1 serves OpenWeatherMap-shaped /weather and
+/forecast responses with an ETag, answers 304 to a matching If-None-Match,
+and can be switched to failing with 503. Checked:
+- Conditional cache: a repeated conditional GET is answered 304 and the
+  cached body is returned and counted as not_modified
+- Rate limit: requests to a host with a minimum interval, sent from several
+  threads, arrive at the server at least that interval apart
+- Circuit breaker: WeatherService stops calling the stub after repeated
+  failures, lets one trial call through after the reset timeout (a failed
+  trial re-opens it) and closes again once the stub recovers
+
+Prints the results and exits with status 1 if a check fails. Needs no
+display:
+    python -m benchmarks.http_stub_check
+
+Author: Attila Bordan
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+WEATHER_BODY = {'main': {'temp': 21.4}, 'weather': [{'icon': ''}]}
+FORECAST_BODY = {'list': []}
+ETAG = '"stub-1"'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves the stub API; state lives on the server (see start_stub)."""
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.arrivals.append(time.monotonic())
+            failing = server.failing
+
+        if failing:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        if self.headers.get('If-None-Match') == ETAG:
+            with server.lock:
+                server.not_modified += 1
+            self.send_response(304)
+            self.send_header('ETag', ETAG)
+            self.end_headers()
+            return
+
+        path = urlsplit(self.path).path
+        body = json.dumps(FORECAST_BODY if path.endswith('/forecast') else WEATHER_BODY).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', ETAG)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub():
+    """
+    Starts the stub server on a free port in a daemon thread.
+
+    Returns:
+        ThreadingHTTPServer: The server; `arrivals`, `not_modified` and `failing` are its state.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.lock = threading.Lock()
+    server.arrivals = []
+    server.not_modified = 0
+    server.failing = False
+    threading.Thread(target=server.serve_forever, name='http-stub', daemon=True).start()
+    return server
+
+
+def request_count(server):
+    with server.lock:
+        return len(server.arrivals)
+
+
+def check_conditional(base_url):
+    """A repeated conditional GET is revalidated with a 304 and served from the cache."""
+    from app.http_client import HttpClient
+
+    failures = []
+    client = HttpClient(min_intervals={})
+    url = f'{base_url}/weather'
+    first = client.get(url, params={'q': 'a'}, conditional=True)
+    second = client.get(url, params={'q': 'a'}, conditional=True)
+    stats = client.stats().get('127.0.0.1', {})
+    client.close()
+
+    if second is not first or second.json() != WEATHER_BODY:
+        failures.append('conditional: 304 did not return the cached response')
+    if stats.get('not_modified') != 1:
+        failures.append(f"conditional: not_modified={stats.get('not_modified')}, expected 1")
+    return failures, {'not_modified': stats.get('not_modified'), 'requests': stats.get('requests')}
+
+
+def check_rate_limit(server, base_url, interval, requests_per_thread=2, threads=3):
+    """Requests from several threads reach the host at least `interval` seconds apart."""
+    from app.http_client import HttpClient
+
+    client = HttpClient(min_intervals={'127.0.0.1': interval})
+    start = request_count(server)
+
+    def worker():
+        for _ in range(requests_per_thread):
+            client.get(f'{base_url}/weather')
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    client.close()
+
+    with server.lock:
+        arrivals = sorted(server.arrivals[start:])
+    gaps = [later - earlier for earlier, later in zip(arrivals, arrivals[1:])]
+    # Small allowance for the time between the client's send and the server's accept
+    min_gap = min(gaps) if gaps else 0
+    failures = []
+    if len(arrivals) != requests_per_thread * threads:
+        failures.append(f'rate limit: {len(arrivals)} requests arrived, expected {requests_per_thread * threads}')
+    if min_gap < interval * 0.9:
+        failures.append(f'rate limit: requests arrived {min_gap:.3f} s apart (interval {interval} s)')
+    return failures, {'interval_s': interval, 'min_gap_s': round(min_gap, 3)}
+
+
+def check_breaker(server, work_dir):
+    """The breaker opens after repeated failures, probes once when half-open and recovers."""
+    from app.location_provider import LocationProvider
+    from app.weather_service import CircuitBreaker, WeatherService
+
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60, clock=lambda: now[0])
+    location = LocationProvider(cache_file=os.path.join(work_dir, 'location_cache.json'))
+    location.set_override(47.5, 19.04, 'Stub')
+    service = WeatherService(cache_file=os.path.join(work_dir, 'weather_cache.json'),
+                             forecast_cache_file=os.path.join(work_dir, 'forecast_cache.json'),
+                             retries=1, backoff=0, breaker=breaker, location=location)
+
+    failures = []
+    steps = []
+
+    def step(name, expect_state, expect_requests, refreshed):
+        before = request_count(server)
+        reading = service.refresh()
+        sent = request_count(server) - before
+        steps.append({'step': name, 'state': breaker.state, 'requests': sent})
+        if breaker.state != expect_state:
+            failures.append(f'breaker: after {name} state is {breaker.state}, expected {expect_state}')
+        if sent != expect_requests:
+            failures.append(f'breaker: {name} sent {sent} requests, expected {expect_requests}')
+        if (reading is not None) != refreshed:
+            failures.append(f'breaker: {name} returned {reading!r}')
+
+    server.failing = True
+    step('first failure', 'closed', 1, False)
+    step('second failure', 'open', 1, False)
+    step('while open', 'open', 0, False)
+    now[0] += 60
+    step('failed trial', 'open', 1, False)
+    now[0] += 60
+    server.failing = False
+    # Weather and forecast
+    step('successful trial', 'closed', 2, True)
+    return failures, {'steps': steps}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTTP client and circuit breaker check against a local stub')
+    parser.add_argument('--interval', type=float, default=0.2, help='Per-host minimum interval to check (s)')
+    args = parser.parse_args()
+
+    server = start_stub()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    # Read by app.api_utils on the first request; keeps WeatherService off the real APIs
+    os.environ['WEATHER_API_URL'] = base_url
+    os.environ['LOCATION_API_URL'] = base_url
+
+    failures = []
+    report = {}
+    with tempfile.TemporaryDirectory(prefix='calendar_http_stub_') as work_dir:
+        for name, check in (('conditional', lambda: check_conditional(base_url)),
+                            ('rate_limit', lambda: check_rate_limit(server, base_url, args.interval)),
+                            ('breaker', lambda: check_breaker(server, work_dir))):
+            check_failures, report[name] = check()
+            failures.extend(check_failures)
+    server.shutdown()
+
+    print(json.dumps(report, indent=4))
+    for failure in failures:
+        print(f'FAILED: {failure}', file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
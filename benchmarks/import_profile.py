@@ -0,0 +1,138 @@
+"""
+import_profile.py
+
+Import-time profile of the app's modules.
+
+Each module is imported in a fresh interpreter with `python -X importtime`,
+so nothing is already cached in sys.modules, and the per-module self and
+cumulative times are reported, slowest first. Use it to find which imports
+delay the first frame and whether they can be deferred.
+
+Usage:
+    python -m benchmarks.import_profile main UI.calendar_view --top 20
+    python -m benchmarks.import_profile main --prefix app. UI. storage.
+    python -m benchmarks.import_profile main --out imports.json
+
+Author: Attila Bordan
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# import time:       123 |        456 |     package.module
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$')
+
+
+def import_env():
+    """
+    Environment for a profiled interpreter: offline, and never touching the real database.
+
+    Returns:
+        dict: A copy of os.environ with the overrides applied.
+    """
+    env = dict(os.environ)
+    env['KIVY_NO_ARGS'] = '1'
+    env['KIVY_NO_CONSOLELOG'] = '1'
+    env.setdefault('LOCATION_API_URL', 'http://127.0.0.1:9')
+    env.setdefault('WEATHER_API_URL', 'http://127.0.0.1:9')
+    env['CALENDAR_DB_URL'] = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'calendar_import_profile.db')}"
+    return env
+
+
+def parse_importtime(stderr):
+    """
+    Parses `-X importtime` output.
+
+    Args:
+        stderr (str): The interpreter's stderr.
+
+    Returns:
+        list: Dicts with module, self_ms, cumulative_ms and depth (1 for top-level imports),
+              in the order the imports finished.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append({
+                'module': module,
+                'self_ms': int(self_us) / 1000,
+                'cumulative_ms': int(cumulative_us) / 1000,
+                'depth': len(indent) // 2 + 1,
+            })
+    return rows
+
+
+def import_times(module, python=sys.executable):
+    """
+    Imports a module in a fresh interpreter and returns its import-time profile.
+
+    Args:
+        module (str): Dotted module name, importable from the repository root.
+        python (str): Interpreter to run.
+
+    Returns:
+        list: Rows as returned by parse_importtime().
+
+    Raises:
+        RuntimeError: If the import fails.
+    """
+    result = subprocess.run(
+        [python, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=REPO_ROOT, env=import_env(), capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f'import {module} failed:\n{result.stderr[-2000:]}')
+    return parse_importtime(result.stderr)
+
+
+def total_ms(rows, module):
+    """Returns the cumulative import time of `module` itself (0 if it was not imported)."""
+    for row in rows:
+        if row['module'] == module and row['depth'] == 1:
+            return row['cumulative_ms']
+    return 0.0
+
+
+def print_profile(module, rows, top, sort_key, prefixes):
+    selected = [row for row in rows if not prefixes or row['module'].startswith(tuple(prefixes))]
+    selected.sort(key=lambda row: row[sort_key], reverse=True)
+    print(f'\nimport {module}: {total_ms(rows, module):.1f} ms, {len(rows)} modules')
+    print(f"{'self ms':>9} {'cumul ms':>9}  module")
+    for row in selected[:top]:
+        print(f"{row['self_ms']:9.1f} {row['cumulative_ms']:9.1f}  {'  ' * (row['depth'] - 1)}{row['module']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import-time profile of app modules')
+    parser.add_argument('modules', nargs='*', default=['main'], help='Modules to import (default: main)')
+    parser.add_argument('--top', type=int, default=25, help='Rows shown per module')
+    parser.add_argument('--sort', choices=('cumulative', 'self'), default='cumulative')
+    parser.add_argument('--prefix', nargs='+', default=[], help='Only show modules starting with these prefixes')
+    parser.add_argument('--out', help='Write the full profiles as JSON to this file')
+    args = parser.parse_args()
+
+    profiles = {}
+    for module in args.modules:
+        try:
+            profiles[module] = import_times(module)
+        except RuntimeError as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+        print_profile(module, profiles[module], args.top, f'{args.sort}_ms', args.prefix)
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(profiles, f, indent=2)
+        print(f'\nWrote {args.out}')
+
+
+if __name__ == '__main__':
+    main()
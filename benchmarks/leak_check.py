@@ -0,0 +1,196 @@
+"""
+leak_check.py
+
+Cycles the calendar through navigation and rebuilds and checks that memory,
+widgets and Clock events stay bounded.
+
+Each cycle moves to the next and previous month; every 10th cycle also
+switches to the weekly view and back, every 25th opens and closes the event
+popup, and every 50th rebuilds the whole UI. The Calendar's idle-time builds
+(popup pool, weekly view, settings watcher) are run right after every build
+instead of on their timers, so they land in the warm-up rather than at a
+random cycle. After a warm-up of two full rebuild periods, a baseline is
+taken; after the remaining cycles the live widget count, Clock event count
+and traced Python memory must not have grown past the limits. On failure
+the widget classes that grew and the top allocation sites are printed and
+the exit status is 1.
+
+Like ui_bench it needs a GL context; on a headless machine:
+    xvfb-run -a -s "-screen 0 1280x800x24" python -m benchmarks.leak_check --cycles 1000
+
+Author: Attila Bordan
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+import tempfile
+
+# main() parses its own options; keep Kivy from parsing them as its own
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+# Keep the weather service offline and the real database untouched; set before any app import
+_WORK_DIR = tempfile.mkdtemp(prefix='calendar_leak_check_')
+os.environ.setdefault('LOCATION_API_URL', 'http://127.0.0.1:9')
+os.environ.setdefault('WEATHER_API_URL', 'http://127.0.0.1:9')
+os.environ['CALENDAR_DB_URL'] = f"sqlite:///{os.path.join(_WORK_DIR, 'leak.db')}"
+
+from kivy.app import App  # noqa: E402
+from kivy.clock import Clock  # noqa: E402
+from kivy.uix.floatlayout import FloatLayout  # noqa: E402
+
+from app.diagnostics import MemoryTracker, clock_event_count, widget_counts  # noqa: E402
+from benchmarks.storage_bench import generate_events, load_events  # noqa: E402
+from storage import db_manager  # noqa: E402
+
+
+class LeakCheckApp(App):
+    """Runs one navigation cycle per frame and compares counts before and after."""
+    def __init__(self, cycles, warmup, events, **kwargs):
+        super().__init__(**kwargs)
+        self.cycles = cycles
+        self.warmup = warmup
+        self.events = events
+        self.cycle = 0
+        self.calendar = None
+        self.root_layout = None
+        self.memory = MemoryTracker(frames=5)
+        self.baseline = None
+        self.baseline_traced = 0
+        self.result = None
+
+    def build(self):
+        from UI.calendar_view import Calendar
+
+        # Traced from the start, so memory freed during the run (e.g. the widgets a rebuild
+        # replaces) is subtracted as well; starting at the baseline would only count allocations
+        self.memory.start()
+
+        load_events(db_manager, generate_events(self.events, span_days=365, base_date=datetime.date.today()))
+        self.root_layout = FloatLayout()
+        self.calendar = Calendar()
+        self.root_layout.add_widget(self.calendar)
+        self.calendar.set_float_root(self.root_layout)
+        self.run_deferred()
+        Clock.schedule_once(self.run_cycle, 1)
+        return self.root_layout
+
+    def run_deferred(self):
+        """Runs the Calendar's deferred builds now instead of whenever their timers fire."""
+        calendar_view = self.calendar
+        for event in calendar_view.deferred_events:
+            event.cancel()
+        calendar_view.prewarm_popups()
+        calendar_view.prepare_weekly_view()
+        calendar_view.theme_manager.store.start_watching()
+
+    def measure(self):
+        classes = widget_counts()
+        return {'widgets': sum(classes.values()), 'clock_events': clock_event_count(), 'widget_classes': classes}
+
+    def run_cycle(self, *_):
+        if self.cycle == self.warmup:
+            self.baseline = self.measure()
+            # Already tracing: only takes the baseline snapshot for the allocation diff
+            self.memory.start()
+            self.baseline_traced = self.traced_memory()
+        if self.cycle == self.warmup + self.cycles:
+            self.finish()
+            return
+
+        calendar_view = self.calendar
+        # Slides are not what is being tested; skip the animation so pages settle every frame
+        calendar_view.month_carousel.anim_move_duration = 0
+        calendar_view.on_next(None)
+        calendar_view.on_prev(None)
+        if self.cycle % 10 == 0:
+            calendar_view.toggle_weekly_view(None)
+            calendar_view.on_next(None)
+            calendar_view.toggle_weekly_view(None)
+        if self.cycle % 25 == 0:
+            calendar_view.on_add_event(None)
+            Clock.schedule_once(lambda dt: self.close_popups(), 0)
+        if self.cycle % 50 == 0:
+            # Re-initializes the same Calendar instance in place
+            calendar_view.rebuild_ui(self.root_layout)
+            self.run_deferred()
+
+        self.cycle += 1
+        Clock.schedule_once(self.run_cycle, 0)
+
+    @staticmethod
+    def close_popups():
+        from UI.event_popup import AddEventPopup
+        from kivy.core.window import Window
+
+        for child in list(Window.children):
+            if isinstance(child, AddEventPopup):
+                child.dismiss(animation=False)
+
+    def finish(self):
+        after = self.measure()
+        self.result = {
+            'cycles': self.cycles,
+            'widgets': (self.baseline['widgets'], after['widgets']),
+            'clock_events': (self.baseline['clock_events'], after['clock_events']),
+            'widget_growth': dict((after['widget_classes'] - self.baseline['widget_classes']).most_common(10)),
+            'traced_bytes': self.traced_memory() - self.baseline_traced,
+            'allocations': self.memory.diff(top=10),
+        }
+        self.memory.stop()
+        self.stop()
+
+    @staticmethod
+    def traced_memory():
+        import tracemalloc
+
+        current, _ = tracemalloc.get_traced_memory()
+        return current
+
+
+def check(result, max_widget_growth, max_clock_growth, max_traced_mb):
+    """
+    Applies the limits to a result.
+
+    Returns:
+        list: Failure messages (empty if everything stayed bounded).
+    """
+    failures = []
+    widgets_before, widgets_after = result['widgets']
+    if widgets_after - widgets_before > max_widget_growth:
+        failures.append(f'widgets grew {widgets_before} -> {widgets_after}')
+    clock_before, clock_after = result['clock_events']
+    if clock_after - clock_before > max_clock_growth:
+        failures.append(f'clock events grew {clock_before} -> {clock_after}')
+    if result['traced_bytes'] > max_traced_mb * 2 ** 20:
+        failures.append(f"traced memory grew {result['traced_bytes'] / 2 ** 20:.2f} MiB")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Navigation/rebuild leak check (needs a GL context)')
+    parser.add_argument('--cycles', type=int, default=1000, help='Measured navigation cycles')
+    parser.add_argument('--warmup', type=int, default=100,
+                        help='Cycles before the baseline is taken (default: two rebuild periods)')
+    parser.add_argument('--events', type=int, default=200, help='Events in the synthetic calendar')
+    parser.add_argument('--max-widget-growth', type=int, default=20)
+    parser.add_argument('--max-clock-growth', type=int, default=5)
+    parser.add_argument('--max-traced-mb', type=float, default=4.0, help='Allowed growth of traced Python memory')
+    args = parser.parse_args()
+
+    app = LeakCheckApp(args.cycles, args.warmup, args.events)
+    app.run()
+    if app.result is None:
+        print('Leak check did not finish', file=sys.stderr)
+        sys.exit(2)
+
+    print(json.dumps(app.result, indent=4))
+    failures = check(app.result, args.max_widget_growth, args.max_clock_growth, args.max_traced_mb)
+    for failure in failures:
+        print(f'LEAK: {failure}', file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+popup_latency.py
+
+Measures open-to-first-frame latency of the event popup.
+
+For each run, the time is taken from the tap handler starting (acquire or
+construct the popup, then open it) until the window has flipped the first
+frame that contains it. Two modes are compared:
+- cold: a new AddEventPopup per open (the old behaviour)
+- pooled: event_popup_pool.acquire(), prewarmed before the first run
+
+Needs a display; on a headless machine run it under Xvfb:
+    xvfb-run -a python -m benchmarks.popup_latency --runs 20
+
+Author: Attila Bordan
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+# The options below are this script's; keep Kivy from parsing them as its own
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+from kivy.app import App  # noqa: E402
+from kivy.clock import Clock  # noqa: E402
+from kivy.core.window import Window  # noqa: E402
+from kivy.uix.widget import Widget  # noqa: E402
+
+from app.theme_manager import COMPILED_THEMES  # noqa: E402
+from UI.event_popup import AddEventPopup, event_popup_pool  # noqa: E402
+
+
+class PopupLatencyApp(App):
+    """Opens and closes the popup repeatedly, recording open-to-flip latency."""
+    def __init__(self, runs, theme_name, **kwargs):
+        super().__init__(**kwargs)
+        self.runs = runs
+        self.theme = COMPILED_THEMES[theme_name]
+        self.results = {'cold': [], 'pooled': []}
+        self.plan = ['cold'] * runs + ['pooled'] * runs
+        self.started_at = None
+        self.popup = None
+
+    def build(self):
+        Clock.schedule_once(self.prewarm, 0.5)
+        return Widget()
+
+    def prewarm(self, dt):
+        event_popup_pool.prewarm(self.theme)
+        Clock.schedule_once(self.open_next, 0.5)
+
+    def open_next(self, dt):
+        if not self.plan:
+            self.stop()
+            return
+
+        mode = self.plan[0]
+        self.started_at = time.perf_counter()
+        if mode == 'cold':
+            self.popup = AddEventPopup(theme=self.theme, app_ref=self)
+        else:
+            self.popup = event_popup_pool.acquire(self.theme, app_ref=self)
+        self.popup.open(animation=False)
+        Window.bind(on_flip=self.on_first_flip)
+
+    def on_first_flip(self, window):
+        Window.unbind(on_flip=self.on_first_flip)
+        mode = self.plan.pop(0)
+        self.results[mode].append((time.perf_counter() - self.started_at) * 1000)
+
+        self.popup.dismiss(animation=False)
+        Clock.schedule_once(self.open_next, 0.2)
+
+
+def summarize(samples):
+    """Returns min/median/p90/max in milliseconds for a list of samples."""
+    ordered = sorted(samples)
+    return {
+        'runs': len(ordered),
+        'min_ms': round(ordered[0], 2),
+        'median_ms': round(statistics.median(ordered), 2),
+        'p90_ms': round(ordered[int(0.9 * (len(ordered) - 1))], 2),
+        'max_ms': round(ordered[-1], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Event popup open-to-first-frame latency')
+    parser.add_argument('--runs', type=int, default=10, help='Opens per mode')
+    parser.add_argument('--theme', default='Light', choices=sorted(COMPILED_THEMES))
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    app = PopupLatencyApp(args.runs, args.theme)
+    app.run()
+
+    report = {mode: summarize(samples) for mode, samples in app.results.items() if samples}
+    print(json.dumps(report, indent=4))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+"""
+storage_bench.py
+
+Headless benchmark suite for event storage and recurrence matching.
+
+Generates reproducible synthetic calendars (seeded), loads them into a
+throwaway SQLite file and times:
+- get_events_for_month / get_events_for_week
+- is_event_on_date
+- save_event_to_db / update_event_in_db / delete_event
+- the resulting database size
+
+With --profile, the query profiler's per-operation query counts and the
+query plan of every SELECT are added to the report, showing whether the
+`date` and `recurrence` indexes are used.
+
+Results are written as JSON so runs from different commits can be compared.
+No Kivy window (or Kivy import) is needed.
+
+Usage:
+    python -m benchmarks.storage_bench --sizes 1000 10000 --out bench.json
+    python -m benchmarks.storage_bench --sizes 1000000 --recurring 0.05
+    python -m benchmarks.storage_bench --sizes 10000 --recurring 0.5 --recurrence-weights 8 1 1 0
+    python -m benchmarks.storage_bench --compare base.json bench.json --threshold 0.15
+    python -m benchmarks.storage_bench --sizes 10000 --profile
+
+Author: Attila Bordan
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DATE = datetime.date(2025, 1, 1)
+RECURRENCE_TYPES = ('Daily', 'Weekly', 'Monthly', 'Yearly')
+# Relative weights of RECURRENCE_TYPES among the recurring events
+DEFAULT_RECURRENCE_WEIGHTS = (2, 5, 2, 1)
+DEFAULT_SIZES = (1000, 10000)
+PRESET_SIZES = (1000, 10000, 100000, 1000000)
+WORDS = ('Dentist', 'School', 'Soccer', 'Piano', 'Groceries', 'Meeting', 'Birthday', 'Swim',
+         'Vet', 'Dinner', 'Book club', 'Yoga', 'Pickup', 'Haircut', 'Recital', 'Trip')
+
+
+# ---------- Synthetic data ----------
+def generate_events(count, seed=42, recurring_ratio=0.15, recurrence_weights=DEFAULT_RECURRENCE_WEIGHTS,
+                    end_ratio=0.3, span_days=730, base_date=BASE_DATE):
+    """
+    Generates a reproducible list of event rows.
+
+    Args:
+        count (int): Number of events.
+        seed (int): Random seed; the same arguments always produce the same rows.
+        recurring_ratio (float): Share of events that recur.
+        recurrence_weights (tuple): Relative weights of Daily, Weekly, Monthly, Yearly.
+        end_ratio (float): Share of recurring events that have a recurrence_end date.
+        span_days (int): Events are spread over this many days around base_date.
+        base_date (datetime.date): Center of the generated date range.
+
+    Returns:
+        list: Dicts with the Event columns.
+    """
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        date = base_date + datetime.timedelta(days=rng.randrange(-span_days // 2, span_days // 2))
+        recurrence = 'None'
+        recurrence_end = None
+        if rng.random() < recurring_ratio:
+            recurrence = rng.choices(RECURRENCE_TYPES, weights=recurrence_weights)[0]
+            if rng.random() < end_ratio:
+                recurrence_end = str(date + datetime.timedelta(days=rng.randrange(7, 365)))
+        rows.append({
+            'title': f'{rng.choice(WORDS)} {rng.randrange(100)}',
+            'date': str(date),
+            'time': f'{rng.randrange(24):02d}:{rng.choice((0, 15, 30, 45)):02d}',
+            'location': rng.choice(('', 'Home', 'School', 'Downtown', 'Gym')),
+            'notes': rng.choice(('', '', 'Bring snacks', 'Call ahead')),
+            'recurrence': recurrence,
+            'recurrence_end': recurrence_end,
+        })
+    return rows
+
+
+def load_events(db_manager, rows, batch_size=10000):
+    """Bulk-inserts generated rows (much faster than the app's one-by-one save path)."""
+    from sqlalchemy import insert
+
+    with db_manager.get_engine().begin() as connection:
+        for start in range(0, len(rows), batch_size):
+            connection.execute(insert(db_manager.Event), rows[start:start + batch_size])
+
+
+# ---------- Timing ----------
+def measure(func, repeat, *args):
+    """
+    Calls func(*args) `repeat` times with its console output suppressed.
+
+    Returns:
+        dict: min/median/max in milliseconds.
+    """
+    samples = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func(*args)
+            samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'min_ms': round(min(samples), 3),
+        'median_ms': round(statistics.median(samples), 3),
+        'max_ms': round(max(samples), 3),
+        'repeat': repeat,
+    }
+
+
+def bench_size(db_manager, is_event_on_date, size, args):
+    """Runs every benchmark against a fresh database with `size` events."""
+    rows = generate_events(size, seed=args.seed, recurring_ratio=args.recurring,
+                           recurrence_weights=args.recurrence_weights, end_ratio=args.ended)
+
+    db_path = os.path.join(args.work_dir, f'bench_{size}.db')
+    db_manager.configure_database(f'sqlite:///{db_path}')
+    db_manager.profiler.reset()
+
+    start = time.perf_counter()
+    load_events(db_manager, rows)
+    results = {'load_s': round(time.perf_counter() - start, 3)}
+
+    months = [(2025, m) for m in (1, 4, 7, 10)]
+    results['get_events_for_month'] = measure(
+        lambda: [db_manager.get_events_for_month(year, month) for year, month in months], args.repeat)
+    results['get_events_for_month']['calls'] = len(months)
+
+    weeks = [(2025, w) for w in (2, 14, 27, 40)]
+    results['get_events_for_week'] = measure(
+        lambda: [db_manager.get_events_for_week(year, week) for year, week in weeks], args.repeat)
+    results['get_events_for_week']['calls'] = len(weeks)
+
+    # Recurrence matching on plain objects, independent of the database
+    sample = [_Row(row) for row in rows[:min(len(rows), 2000)]]
+    dates = [BASE_DATE + datetime.timedelta(days=d) for d in range(0, 365, 7)]
+    results['is_event_on_date'] = measure(
+        lambda: [is_event_on_date(event, date) for event in sample for date in dates], args.repeat)
+    results['is_event_on_date']['calls'] = len(sample) * len(dates)
+
+    # Write paths go through the app's public functions, one event at a time
+    writes = generate_events(args.writes, seed=args.seed + 1, recurring_ratio=0)
+    for row in writes:
+        row.pop('recurrence_end')
+    results['save_event_to_db'] = measure(lambda: [db_manager.save_event_to_db(row) for row in writes], 1)
+
+    with db_manager.SessionLocal() as session:
+        new_ids = [event_id for (event_id,) in session.query(db_manager.Event.id)
+                   .order_by(db_manager.Event.id.desc()).limit(len(writes))]
+    results['update_event_in_db'] = measure(
+        lambda: [db_manager.update_event_in_db(event_id, row) for event_id, row in zip(new_ids, writes)], 1)
+    results['delete_event'] = measure(lambda: [db_manager.delete_event(event_id) for event_id in new_ids], 1)
+    for key in ('save_event_to_db', 'update_event_in_db', 'delete_event'):
+        results[key]['calls'] = len(writes)
+
+    db_manager.engine.dispose()
+    results['db_size_bytes'] = os.path.getsize(db_path)
+    return results
+
+
+def profile_report(profiler):
+    """Query counts per operation and the plan of every SELECT seen."""
+    return {
+        'operations': profiler.operations(),
+        'plans': {statement: stats['plan'] for statement, stats in profiler.stats().items() if stats['plan']},
+    }
+
+
+class _Row:
+    """Attribute access over a generated row, as is_event_on_date expects."""
+    def __init__(self, row):
+        self.__dict__.update(row)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ---------- Comparison ----------
+def compare(baseline_path, current_path, threshold):
+    """
+    Prints per-benchmark changes between two result files.
+
+    Returns:
+        int: Exit status, 1 if any median got slower by more than `threshold`.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(current_path) as f:
+        current = json.load(f)
+
+    print(f"baseline {baseline['meta'].get('commit')}  ->  current {current['meta'].get('commit')}")
+    regressions = 0
+    for size, benches in current['results'].items():
+        for name, result in benches.items():
+            old = baseline['results'].get(size, {}).get(name)
+            if not isinstance(result, dict) or not isinstance(old, dict):
+                continue
+            change = (result['median_ms'] - old['median_ms']) / old['median_ms'] if old['median_ms'] else 0
+            flag = 'REGRESSION' if change > threshold else ''
+            regressions += bool(flag)
+            print(f"{size:>8} {name:<22} {old['median_ms']:>10.3f} -> {result['median_ms']:>10.3f} ms "
+                  f"{change:+7.1%} {flag}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Storage and recurrence benchmarks')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help=f'Event counts to generate (presets: {", ".join(map(str, PRESET_SIZES))})')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--recurring', type=float, default=0.15, help='Share of recurring events')
+    parser.add_argument('--recurrence-weights', type=float, nargs=4, default=list(DEFAULT_RECURRENCE_WEIGHTS),
+                        metavar=('D', 'W', 'M', 'Y'),
+                        help='Relative weights of Daily, Weekly, Monthly and Yearly recurring events')
+    parser.add_argument('--ended', type=float, default=0.3, help='Share of recurring events with an end date')
+    parser.add_argument('--repeat', type=int, default=5, help='Repetitions for read benchmarks')
+    parser.add_argument('--writes', type=int, default=100, help='Events saved/updated/deleted per size')
+    parser.add_argument('--out', help='Write JSON results to this file')
+    parser.add_argument('--keep', action='store_true', help='Keep the generated databases')
+    parser.add_argument('--profile', action='store_true', help='Add query counts and query plans to the report')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help='Compare two result files instead of running')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Allowed slowdown for --compare')
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare(*args.compare, args.threshold))
+
+    args.work_dir = tempfile.mkdtemp(prefix='calendar_bench_')
+    # Must be set before the storage module is imported, so calendar.db is never touched
+    os.environ['CALENDAR_DB_URL'] = f"sqlite:///{os.path.join(args.work_dir, 'init.db')}"
+    from storage import db_manager
+    from app.recurrence import is_event_on_date
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'seed': args.seed,
+            'recurring': args.recurring,
+            'recurrence_weights': args.recurrence_weights,
+            'ended': args.ended,
+        },
+        'results': {},
+    }
+    if args.profile:
+        db_manager.profiler.capture_all_plans = True
+        report['profile'] = {}
+    try:
+        for size in args.sizes:
+            print(f'Benchmarking {size} events...', file=sys.stderr)
+            report['results'][str(size)] = bench_size(db_manager, is_event_on_date, size, args)
+            if args.profile:
+                report['profile'][str(size)] = profile_report(db_manager.profiler)
+    finally:
+        if not args.keep:
+            shutil.rmtree(args.work_dir, ignore_errors=True)
+
+    output = json.dumps(report, indent=4)
+    print(output)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+theme_check.py
+
+Checks that the compiled themes match the theme dicts they were built from.
+
+For every theme in THEMES:
+- dict(COMPILED_THEMES[name]) == THEMES[name] (dict-style access unchanged)
+- every theme.rgba entry equals Kivy's get_color_from_hex() of the hex value,
+  i.e. what the render code computed before themes were compiled
+- theme.hex and theme.tag match the hex strings
+- the compiled theme cannot be modified
+
+Prints every mismatch and exits with status 1 if there is any. Needs no
+display:
+    python -m benchmarks.theme_check
+
+Author: Attila Bordan
+"""
+import os
+import sys
+
+# Only kivy.utils is needed; keep Kivy from parsing this script's arguments
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+from kivy.utils import get_color_from_hex  # noqa: E402
+
+from app.theme_manager import COMPILED_THEMES, THEMES  # noqa: E402
+
+
+def check_theme(name):
+    """
+    Compares one compiled theme with its source dict.
+
+    Returns:
+        list: Mismatch messages (empty if the theme is consistent).
+    """
+    failures = []
+    colors = THEMES[name]
+    theme = COMPILED_THEMES.get(name)
+    if theme is None:
+        return [f'{name}: not compiled']
+
+    if dict(theme) != colors:
+        failures.append(f'{name}: dict(theme) differs from THEMES[{name!r}]')
+
+    for key, hex_value in colors.items():
+        expected = tuple(get_color_from_hex(hex_value))
+        actual = tuple(getattr(theme.rgba, key))
+        if actual != expected:
+            failures.append(f'{name}.rgba.{key}: {actual} != {expected} ({hex_value})')
+        if getattr(theme.hex, key) != hex_value:
+            failures.append(f'{name}.hex.{key}: {getattr(theme.hex, key)!r} != {hex_value!r}')
+        if getattr(theme.tag, key) != f'[color={hex_value}]':
+            failures.append(f'{name}.tag.{key}: {getattr(theme.tag, key)!r}')
+
+    try:
+        theme.name = 'changed'
+    except AttributeError:
+        pass
+    else:
+        failures.append(f'{name}: compiled theme is mutable')
+    return failures
+
+
+def main():
+    failures = []
+    if set(COMPILED_THEMES) != set(THEMES):
+        failures.append(f'compiled themes {sorted(COMPILED_THEMES)} != themes {sorted(THEMES)}')
+    for name in THEMES:
+        failures.extend(check_theme(name))
+
+    for failure in failures:
+        print(f'MISMATCH: {failure}', file=sys.stderr)
+    print(f'{len(THEMES)} themes checked, {len(failures)} mismatches')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
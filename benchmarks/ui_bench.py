@@ -0,0 +1,339 @@
+"""
+ui_bench.py
+
+Render benchmark harness for the calendar views.
+
+Drives the real Calendar widget through a scripted sequence (build the
+month, build day cells, switch to the weekly view, page through weeks,
+switch back, open and close the day popup, rebuild the whole UI) against
+synthetic datasets and reports, per operation:
+- Python time spent in the call
+- Frame time until the next buffer flip
+- Widgets alive in the window afterwards
+- Event list rows on screen: data rows and the row widgets created for them
+- Memory allocated during the call (tracemalloc, measured in a separate pass)
+
+The weekly view and the "+N more" day popup are virtualized lists; if one
+holds data but no row widgets were created (nothing would be shown), the
+run fails with exit status 1.
+
+It needs a GL context but no physical display. On a headless machine use a
+virtual framebuffer:
+    xvfb-run -a -s "-screen 0 1280x800x24" python -m benchmarks.ui_bench --sizes 0 100 1000
+or, without Xvfb installed, SDL's offscreen driver (800x600 window):
+    SDL_VIDEODRIVER=offscreen python -m benchmarks.ui_bench
+
+Regression workflow:
+    python -m benchmarks.ui_bench --write-baseline benchmarks/ui_baseline.json   # on the reference Pi
+    python -m benchmarks.ui_bench --baseline benchmarks/ui_baseline.json         # before deploying
+
+The committed benchmarks/ui_baseline.json was recorded with the defaults
+under SDL_VIDEODRIVER=offscreen on Mesa's llvmpipe software renderer (see
+its meta). Widget and row counts compare anywhere with the same window size;
+timings only compare on the same renderer, so re-record the baseline on the
+Pi before gating deployments on them.
+
+Author: Attila Bordan
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# main() parses its own options; keep Kivy from parsing them as its own
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+# Keep the weather service offline and the real database untouched; set before any app import
+_WORK_DIR = tempfile.mkdtemp(prefix='calendar_ui_bench_')
+os.environ.setdefault('LOCATION_API_URL', 'http://127.0.0.1:9')
+os.environ.setdefault('WEATHER_API_URL', 'http://127.0.0.1:9')
+os.environ['CALENDAR_DB_URL'] = f"sqlite:///{os.path.join(_WORK_DIR, 'init.db')}"
+
+from kivy.app import App  # noqa: E402
+from kivy.clock import Clock  # noqa: E402
+from kivy.core.window import Window  # noqa: E402
+from kivy.uix.floatlayout import FloatLayout  # noqa: E402
+
+from benchmarks.storage_bench import generate_events, load_events, git_commit  # noqa: E402
+from storage import db_manager  # noqa: E402
+
+DEFAULT_SIZES = (0, 100, 1000)
+
+
+class Step:
+    """One scripted action: `setup` steps are not measured."""
+    def __init__(self, size, name, func, kind='measure', settle=0.1):
+        self.size = size
+        self.name = name
+        self.func = func
+        self.kind = kind
+        self.settle = settle
+
+
+class UIBenchApp(App):
+    """Runs the scripted steps one per frame and collects measurements."""
+    def __init__(self, sizes, repeat, **kwargs):
+        super().__init__(**kwargs)
+        self.sizes = sizes
+        self.repeat = repeat
+        self.calendar = None
+        self.root_layout = None
+        self.queue = []
+        self.samples = {}
+        self.pending = None
+
+    def build(self):
+        self.root_layout = FloatLayout()
+        for size in self.sizes:
+            self.queue.extend(self.script(size))
+        Clock.schedule_once(self.run_step, 1)
+        return self.root_layout
+
+    # ---------- Script ----------
+    def script(self, size):
+        steps = [Step(size, 'load_dataset', lambda: self.load_dataset(size), kind='setup', settle=1)]
+
+        operations = [
+            ('build_calendar', lambda: self.calendar.build_calendar(self.calendar.current_year,
+                                                                    self.calendar.current_month), 0.1),
+            ('create_day_cell', self.create_day_cells, 0.1),
+            ('toggle_weekly_view', lambda: self.calendar.toggle_weekly_view(None), 0.3),
+            ('update_week', self.next_week, 0.1),
+            ('toggle_weekly_view', lambda: self.calendar.toggle_weekly_view(None), 0.3),
+            ('show_day_popup', self.open_day_popup, 0.3),
+            ('close_day_popup', self.close_popups, 0.3),
+            ('rebuild_ui', lambda: self.calendar.rebuild_ui(self.root_layout), 0.5),
+        ]
+        for _ in range(self.repeat):
+            steps.extend(Step(size, name, func, settle=settle) for name, func, settle in operations)
+        # One extra pass with allocation tracing, kept apart so it doesn't skew the timings
+        steps.extend(Step(size, name, func, kind='alloc', settle=settle) for name, func, settle in operations)
+        return steps
+
+    def load_dataset(self, size):
+        from UI.calendar_view import Calendar
+
+        db_manager.configure_database(f"sqlite:///{os.path.join(_WORK_DIR, f'ui_{size}.db')}")
+        # Dates spread over a year around today so the visible views are populated
+        load_events(db_manager, generate_events(size, span_days=365, base_date=datetime.date.today()))
+
+        if self.calendar is not None:
+            self.calendar.stop()
+            self.root_layout.remove_widget(self.calendar)
+        self.calendar = Calendar()
+        self.root_layout.add_widget(self.calendar)
+        self.calendar.set_float_root(self.root_layout)
+
+    def create_day_cells(self):
+        calendar_view = self.calendar
+        events = db_manager.get_events_for_month(calendar_view.current_year, calendar_view.current_month)
+        hit_index = calendar_view.calendar_display.hit_index
+        for date_str, day_events in list(events.items())[:7]:
+            day_date = datetime.date.fromisoformat(date_str)
+            calendar_view.create_day_cell(day_date, day_events, hit_index)
+
+    def next_week(self):
+        calendar_view = self.calendar
+        calendar_view.current_week_date += datetime.timedelta(days=7)
+        calendar_view.weekly_view.update_week(calendar_view.current_week_date)
+
+    def open_day_popup(self):
+        from UI.components.show_day_popup import show_day_popup
+
+        calendar_view = self.calendar
+        events = db_manager.get_events_for_month(calendar_view.current_year, calendar_view.current_month)
+        # The busiest day, as after tapping its "+N more"
+        date_str, day_events = max(events.items(), key=lambda item: len(item[1]), default=(None, []))
+        day_date = datetime.date.fromisoformat(date_str) if date_str else datetime.date.today()
+        show_day_popup(day_date, day_events, calendar_view.theme)
+
+    @staticmethod
+    def close_popups():
+        from kivy.uix.modalview import ModalView
+
+        for child in list(Window.children):
+            if isinstance(child, ModalView):
+                child.dismiss(animation=False)
+
+    # ---------- Runner ----------
+    def run_step(self, *_):
+        if not self.queue:
+            self.stop()
+            return
+
+        step = self.queue.pop(0)
+        if step.kind == 'setup':
+            step.func()
+            Clock.schedule_once(self.run_step, step.settle)
+            return
+
+        tracing = step.kind == 'alloc'
+        if tracing:
+            tracemalloc.start()
+        start = time.perf_counter()
+        step.func()
+        end = time.perf_counter()
+        allocated = None
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            allocated = {'net_bytes': current, 'peak_bytes': peak}
+
+        self.pending = (step, (end - start) * 1000, end, allocated)
+        Window.bind(on_flip=self.on_flip)
+
+    def on_flip(self, window):
+        Window.unbind(on_flip=self.on_flip)
+        step, python_ms, ended_at, allocated = self.pending
+        frame_ms = (time.perf_counter() - ended_at) * 1000
+
+        record = self.samples.setdefault(str(step.size), {}).setdefault(step.name, {
+            'python_ms': [], 'frame_ms': [], 'widgets': None, 'rows': None, 'alloc': None,
+        })
+        if allocated is None:
+            record['python_ms'].append(python_ms)
+            record['frame_ms'].append(frame_ms)
+            record['widgets'] = sum(1 for child in Window.children for _ in child.walk())
+            record['rows'] = event_rows()
+        else:
+            record['alloc'] = allocated
+
+        Clock.schedule_once(self.run_step, step.settle)
+
+    def report(self):
+        results = {}
+        for size, operations in self.samples.items():
+            results[size] = {}
+            for name, record in operations.items():
+                results[size][name] = {
+                    'python_ms': round(statistics.median(record['python_ms']), 3),
+                    'frame_ms': round(statistics.median(record['frame_ms']), 3),
+                    'widgets': record['widgets'],
+                    'rows': record['rows'],
+                    'alloc_net_bytes': (record['alloc'] or {}).get('net_bytes'),
+                    'alloc_peak_bytes': (record['alloc'] or {}).get('peak_bytes'),
+                    'runs': len(record['python_ms']),
+                }
+        return {
+            'meta': {
+                'commit': git_commit(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'window': list(Window.size),
+                'repeat': self.repeat,
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'gl_renderer': gl_renderer(),
+            },
+            'results': results,
+        }
+
+
+def gl_renderer():
+    """Returns the OpenGL renderer string, e.g. the Pi's V3D or Mesa's llvmpipe."""
+    from kivy.graphics.opengl import GL_RENDERER, glGetString
+
+    return glGetString(GL_RENDERER).decode(errors='replace')
+
+
+def event_rows():
+    """
+    Counts the event list rows in the window.
+
+    Returns:
+        dict: data (rows in the EventListViews' data) and widgets (EventRows created for them).
+    """
+    from UI.components.event_list import EventListView, EventRow
+
+    rows = {'data': 0, 'widgets': 0}
+    for child in Window.children:
+        for widget in child.walk():
+            if isinstance(widget, EventListView):
+                rows['data'] += len(widget.data)
+            elif isinstance(widget, EventRow):
+                rows['widgets'] += 1
+    return rows
+
+
+def unrendered_lists(report):
+    """
+    Finds operations after which event lists had data but no row widgets.
+
+    Returns:
+        list: '<size> <operation>' strings.
+    """
+    return [
+        f'{size} {name}'
+        for size, operations in report['results'].items()
+        for name, result in operations.items()
+        if result['rows'] and result['rows']['data'] and not result['rows']['widgets']
+    ]
+
+
+def compare(baseline, current, threshold):
+    """
+    Prints changes against a baseline report.
+
+    Returns:
+        int: 1 if any timing regressed past `threshold` or any widget count grew.
+    """
+    renderers = (baseline['meta'].get('gl_renderer'), current['meta'].get('gl_renderer'))
+    if renderers[0] != renderers[1]:
+        print(f'WARNING: baseline recorded on {renderers[0]!r}, running on {renderers[1]!r}; '
+              'timings are not comparable, widget counts are')
+    regressions = 0
+    for size, operations in current['results'].items():
+        for name, result in operations.items():
+            old = baseline['results'].get(size, {}).get(name)
+            if not old:
+                continue
+            problems = []
+            for metric in ('python_ms', 'frame_ms'):
+                if old[metric] and (result[metric] - old[metric]) / old[metric] > threshold:
+                    problems.append(f'{metric} {old[metric]:.1f} -> {result[metric]:.1f}')
+            if old['widgets'] is not None and result['widgets'] > old['widgets']:
+                problems.append(f"widgets {old['widgets']} -> {result['widgets']}")
+            regressions += bool(problems)
+            print(f"{size:>6} {name:<20} {'REGRESSION: ' + ', '.join(problems) if problems else 'ok'}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Calendar UI render benchmarks (needs a GL context)')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help='Events per dataset')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per operation')
+    parser.add_argument('--out', help='Write JSON results to this file')
+    parser.add_argument('--write-baseline', metavar='PATH', help='Save the results as the new baseline')
+    parser.add_argument('--baseline', metavar='PATH', help='Compare the results with a baseline')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed slowdown against the baseline')
+    args = parser.parse_args()
+
+    app = UIBenchApp(args.sizes, args.repeat)
+    app.run()
+    report = app.report()
+
+    output = json.dumps(report, indent=4)
+    print(output)
+    for path in (args.out, args.write_baseline):
+        if path:
+            with open(path, 'w') as f:
+                f.write(output)
+
+    status = 0
+    for operation in unrendered_lists(report):
+        print(f'NO ROWS RENDERED: event lists hold data but created no rows after {operation}', file=sys.stderr)
+        status = 1
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            status = compare(json.load(f), report, args.threshold) or status
+    sys.exit(status)
+
+
+if __name__ == '__main__':
+    main()
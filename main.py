@@ -12,18 +12,47 @@ Modules:
 Author: Attila Bordan
 """
 
+# Imported first, so boot times also cover the Kivy imports below
+from app import startup
+
 from kivy.app import App
-from UI.calendar_view import Calendar
 from kivy.uix.floatlayout import FloatLayout
+from kivy.uix.image import Image
 from kivy.config import Config
 from kivy.base import EventLoop
 from kivy.clock import Clock
 from kivy.core.window import Window
+import datetime
+import json
+import os
+import signal
 import time
 
-#  Set the application to run in fullscreen mode on compatible displays
+from app.theme_manager import ThemeManager, get_settings_store
+from app.log import configure_logging, get_logger
+from app import instrumentation
+from app.text_cache import texture_cache
+from app import tracing
+from app.watchdog import start_watchdog
+from app.diagnostics import SelfCheck, SELF_CHECK_INTERVAL, log_report
+
+logger = get_logger('main')
+
+#  Set the application to run in fullscreen mode on compatible displays.
+#  Runtime only: nothing is written to disk at startup.
 Config.set('input', 'mouse', 'mouse,multitouch_on_demand')
-Config.write()
+
+# Screenshot of the calendar shown while the real one is being built, one per theme;
+# CALENDAR_FIRST_FRAME_CACHE=0 disables it. The signature file next to it records the
+# theme, date and window size it was taken with: it is only rewritten when one of those
+# changed, so a normal boot writes nothing to the SD card.
+FIRST_FRAME_CACHE = os.getenv('CALENDAR_FIRST_FRAME_CACHE', '1') != '0'
+FIRST_FRAME_FILE = 'first_frame_{theme}.png'
+FIRST_FRAME_SIGNATURE_FILE = 'first_frame_{theme}.json'
+# Seconds after startup before the screenshot is taken (weather and clock filled in by then)
+FIRST_FRAME_SAVE_DELAY = 10
+
+startup.mark('imports')
 
 
 class CalendarApp(App):
@@ -35,22 +64,31 @@ class CalendarApp(App):
     """
 
     def build(self):
+        startup.mark('build')
         root = FloatLayout()
-        calendar = Calendar()
-
-        # Attach calendar widget to the root layout
-        root.add_widget(calendar)
-
-        # Pass the root layout to the Calendar instance
-        # to allow it to open popups or dialogs at the root level
-        calendar.set_float_root(root)
+        self.root_layout = root
+        self.calendar = None
+
+        # Show last run's screenshot at once; the calendar (and its database
+        # and weather imports) is built on the frame after it is on screen
+        theme = ThemeManager().get_theme()
+        Window.clearcolor = theme.rgba.bg_color
+        self.theme_name = theme.name
+        self.first_frame_file = FIRST_FRAME_FILE.format(theme=theme.name)
+        self.first_frame_signature_file = FIRST_FRAME_SIGNATURE_FILE.format(theme=theme.name)
+        if FIRST_FRAME_CACHE and os.path.exists(self.first_frame_file):
+            root.add_widget(Image(source=self.first_frame_file, allow_stretch=True, keep_ratio=False,
+                                  nocache=True))
+        else:
+            self.build_calendar()
+        Window.bind(on_flip=self.on_window_flip)
 
         last_touch_time = [0]
 
         def filter_ghost_touches(window, touch):
             now = time.time()
             if now - last_touch_time[0] < 0.3:  # 300ms debounce
-                print("👻 Ghost touch ignored")
+                logger.debug('Ghost touch ignored')
                 return True  # Ignore this touch
             last_touch_time[0] = now
             return False
@@ -59,6 +97,115 @@ class CalendarApp(App):
 
         return root
 
+    def build_calendar(self, dt=None):
+        """Builds the Calendar widget in place of the cached first frame."""
+        from UI.calendar_view import Calendar
+
+        startup.mark('calendar_imported')
+        calendar = Calendar()
+
+        # Attach calendar widget to the root layout
+        self.root_layout.clear_widgets()
+        self.root_layout.add_widget(calendar)
+
+        # Pass the root layout to the Calendar instance
+        # to allow it to open popups or dialogs at the root level
+        calendar.set_float_root(self.root_layout)
+        self.calendar = calendar
+
+    def on_window_flip(self, window):
+        """Records the first frames and builds the calendar once the cached frame is shown."""
+        startup.mark('first_frame')
+        if self.calendar is None:
+            Clock.schedule_once(self.build_calendar, 0)
+            return
+        startup.mark('calendar_frame')
+        Window.unbind(on_flip=self.on_window_flip)
+
+        if startup.BOOT_REPORT:
+            print(startup.report_line(), flush=True)
+            self.stop()
+        elif FIRST_FRAME_CACHE and self.first_frame_signature() != self.load_first_frame_signature():
+            Clock.schedule_once(self.save_first_frame, FIRST_FRAME_SAVE_DELAY)
+
+    def first_frame_signature(self):
+        """What the cached first frame depends on: theme, date and window size."""
+        return {
+            'theme': self.theme_name,
+            'date': datetime.date.today().isoformat(),
+            'size': [int(value) for value in Window.size],
+        }
+
+    def load_first_frame_signature(self):
+        """Returns the signature stored with the cached first frame, or None if there is none."""
+        if not os.path.exists(self.first_frame_file):
+            return None
+        try:
+            with open(self.first_frame_signature_file) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save_first_frame(self, dt=None):
+        """Saves a screenshot of the calendar and its signature for the next start."""
+        # Written next to the final files and renamed, so a power cut never leaves half a file
+        temp_file = self.first_frame_file + '.tmp.png'
+        temp_signature = self.first_frame_signature_file + '.tmp'
+        try:
+            self.root_layout.export_to_png(temp_file)
+            with open(temp_signature, 'w') as f:
+                json.dump(self.first_frame_signature(), f)
+            os.replace(temp_file, self.first_frame_file)
+            os.replace(temp_signature, self.first_frame_signature_file)
+        except Exception as e:
+            logger.warning('Could not save the first frame: %s', e)
+
+    def on_start(self):
+        # Petted every frame; logs the main thread's stack when a frame takes too long
+        self.watchdog = start_watchdog()
+        if self.watchdog:
+            Clock.schedule_interval(self.watchdog.pet, 0)
+
+        # Logs memory / widget / Clock growth trends; `kill -USR2 <pid>` logs a full report
+        self.self_check = SelfCheck()
+        if SELF_CHECK_INTERVAL:
+            Clock.schedule_interval(self.self_check.check, SELF_CHECK_INTERVAL)
+        if hasattr(signal, 'SIGUSR2'):
+            signal.signal(signal.SIGUSR2,
+                          lambda signum, frame: Clock.schedule_once(lambda dt: log_report(self.self_check)))
+
+        # Opt-in: only runs (and is only imported) when CALENDAR_METRICS_PORT is set
+        self.metrics_server = None
+        if os.getenv('CALENDAR_METRICS_PORT'):
+            from app.metrics_server import start_metrics_server
+
+            self.metrics_server = start_metrics_server()
+        if self.metrics_server:
+            self.publish_ui_gauges()
+            Clock.schedule_interval(self.publish_ui_gauges, 5)
+
+    def publish_ui_gauges(self, dt=None):
+        """Copies UI-thread-only numbers into gauges the metrics thread can read safely."""
+        instrumentation.set_gauge('clock_events', len(Clock.get_events()))
+        instrumentation.set_gauge('widgets', sum(1 for child in Window.children for _ in child.walk()))
+        cache_stats = texture_cache.stats()
+        instrumentation.set_gauge('texture_cache_hits', cache_stats['hits'])
+        instrumentation.set_gauge('texture_cache_misses', cache_stats['misses'])
+
+    def on_stop(self):
+        # Write any settings change still waiting for its debounce
+        get_settings_store().flush()
+        if getattr(self, 'metrics_server', None):
+            self.metrics_server.stop()
+        if getattr(self, 'watchdog', None):
+            self.watchdog.stop()
+
 
 if __name__ == '__main__':
+    # Levels, per-module overrides and the log file come from CALENDAR_LOG_* env vars
+    configure_logging()
+    # With CALENDAR_TRACE=1, `kill -USR1 <pid>` writes the recent spans as Chrome trace JSON
+    if hasattr(signal, 'SIGUSR1'):
+        # Written from the main loop between frames, not in the middle of one or of a span write
+        signal.signal(signal.SIGUSR1, lambda signum, frame: Clock.schedule_once(lambda dt: tracing.dump()))
     CalendarApp().run()
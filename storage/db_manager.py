@@ -7,15 +7,24 @@ Features:
 - SQLAlchemy ORM model for `Event`
 - Save, update, and stop recurrence on events
 - Fetch events for a given week or month, including recurring ones
+- Query profiling of every statement (see query_profiler.py)
 
 Author: Attila Bordan
 """
 import calendar
 import datetime
+import logging
+import os
 
 from sqlalchemy import String, create_engine, delete
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker
-from app.api_utils import is_event_on_date
+from app.recurrence import is_event_on_date
+from app.instrumentation import timed_function
+from storage.query_profiler import get_profiler
+from app.tracing import traced
+from app.log import get_logger
+
+logger = get_logger(__name__)
 
 
 # ---------- Database Models ----------
@@ -38,17 +47,54 @@ class Event(Base):
 
 # ---------- Database Initialization ----------
 
-# Local SQLite database engine
-engine = create_engine('sqlite:///calendar.db', echo=True)
+# Local SQLite database, overridable e.g. to benchmark against a throwaway file
+DATABASE_URL = os.getenv('CALENDAR_DB_URL', 'sqlite:///calendar.db')
+
+# Created on first use (see get_engine), so importing this module does no I/O
+engine = None
+
+# Statement timings, rows and queries per operation
+profiler = get_profiler()
+profiler.track_rows(Base)
+
+# Session factory, bound once the engine exists
+SessionLocal = sessionmaker()
+
+
+def configure_database(url: str, echo: bool = False) -> None:
+    """
+    Points the module at a different database, creating its tables if needed.
+
+    Args:
+        url (str): SQLAlchemy database URL, e.g. 'sqlite:///bench.db'.
+        echo (bool): Log every SQL statement.
+    """
+    global engine
+    if engine is not None:
+        profiler.detach(engine)
+        engine.dispose()
+    engine = create_engine(url, echo=echo)
+    profiler.attach(engine)
+    Base.metadata.create_all(engine)
+    SessionLocal.configure(bind=engine)
+
+
+def get_engine():
+    """Returns the engine, connecting to DATABASE_URL and creating the tables on first use."""
+    if engine is None:
+        configure_database(DATABASE_URL)
+    return engine
 
-# Create all tables based on Base metadata
-Base.metadata.create_all(engine)
 
-# Session factory
-SessionLocal = sessionmaker(bind=engine)
+def get_session():
+    """Opens a session on the (lazily created) engine."""
+    get_engine()
+    return SessionLocal()
 
 
 # ---------- Database Operations ----------
+@traced(cat='db')
+@profiler.operation('save_event_to_db')
 def save_event_to_db(event_data: dict[str, str]) -> None:
     """
     Saves a new event to the database.
@@ -56,7 +102,7 @@ def save_event_to_db(event_data: dict[str, str]) -> None:
     Args:
         event_data (dict): Dictionary containing title, date, time, location, notes, and recurrence.
     """
-    with SessionLocal() as session:
+    with get_session() as session:
         new_event = Event(
             title=event_data['title'],
             date=event_data['date'],
@@ -69,6 +115,9 @@ def save_event_to_db(event_data: dict[str, str]) -> None:
         session.commit()
 
 
+@timed_function('db_query')
+@traced(cat='db')
+@profiler.operation('get_events_for_week')
 def get_events_for_week(year: int, week_number: int) -> dict[str, list[Event]]:
     """
     Returns all events for a specific ISO week of a given year, grouped by date.
@@ -86,7 +135,7 @@ def get_events_for_week(year: int, week_number: int) -> dict[str, list[Event]]:
     start_date = sunday
     end_date = start_date + datetime.timedelta(days=7)
 
-    with SessionLocal() as session:
+    with get_session() as session:
         # Separate regular (non-recurring) and recurring events
         regular = session.query(Event).filter(
             Event.recurrence == 'None',
@@ -105,10 +154,14 @@ def get_events_for_week(year: int, week_number: int) -> dict[str, list[Event]]:
             e for e in all_events if is_event_on_date(e, single_date)
         ]
 
-    print("Weekly event dict:", {k: [e.title for e in v] for k, v in event_dict.items()})
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('Weekly event dict: %s', {k: [e.title for e in v] for k, v in event_dict.items()})
     return event_dict
 
 
+@timed_function('db_query')
+@traced(cat='db')
+@profiler.operation('get_events_for_month')
 def get_events_for_month(year: int, month: int) -> dict[str, list[Event]]:
     """
     Returns all events for a given month, grouped by date.
@@ -128,7 +181,7 @@ def get_events_for_month(year: int, month: int) -> dict[str, list[Event]]:
     else:
         end_date = datetime.date(year, month + 1, 1)
 
-    with SessionLocal() as session:
+    with get_session() as session:
         regular = session.query(Event).filter(
             Event.recurrence == 'None',
             Event.date >= str(start_date),
@@ -146,10 +199,12 @@ def get_events_for_month(year: int, month: int) -> dict[str, list[Event]]:
         key = str(current_date)
         event_dict[key] = [e for e in all_events if is_event_on_date(e, current_date)]
 
-    print("Loaded events for", year, month, "→", sum(len(v) for v in event_dict.values()), "total")
+    logger.debug('Loaded events for %d-%02d: %d total', year, month, sum(len(v) for v in event_dict.values()))
     return event_dict
 
 
+@traced(cat='db')
+@profiler.operation('stop_recurring_event')
 def stop_recurring_event(event_id: int) -> bool:
     """
     Disables future recurrences of an event by setting its recurrence_end to today.
@@ -160,7 +215,7 @@ def stop_recurring_event(event_id: int) -> bool:
     Returns:
         bool: True if the update succeeded, False otherwise.
     """
-    with SessionLocal() as session:
+    with get_session() as session:
         db_event = session.query(Event).get(event_id)
         if db_event and db_event.recurrence.lower() != "none":
             db_event.recurrence_end = datetime.date.today().strftime('%Y-%m-%d')
@@ -169,6 +224,8 @@ def stop_recurring_event(event_id: int) -> bool:
     return False
 
 
+@traced(cat='db')
+@profiler.operation('update_event_in_db')
 def update_event_in_db(event_id: int, updated_data: dict[str, str]) -> None:
     """
     Updates an existing event in the database.
@@ -177,7 +234,7 @@ def update_event_in_db(event_id: int, updated_data: dict[str, str]) -> None:
         event_id (int): ID of the event to update.
         updated_data (dict): Dictionary containing new title, date, time, location, notes, recurrence.
     """
-    with SessionLocal() as session:
+    with get_session() as session:
         event = session.query(Event).get(event_id)
         if event:
             event.title = updated_data['title']
@@ -189,6 +246,8 @@ def update_event_in_db(event_id: int, updated_data: dict[str, str]) -> None:
             session.commit()
 
 
+@traced(cat='db')
+@profiler.operation('delete_event')
 def delete_event(event_id: int) -> bool:
     """
     Removes selected event from the database.
@@ -199,7 +258,7 @@ def delete_event(event_id: int) -> bool:
     Returns:
         bool: True if the deletion succeeded, False otherwise.
     """
-    with SessionLocal() as session:
+    with get_session() as session:
         db_event = session.query(Event).get(event_id)
         if db_event:
             session.delete(db_event)
@@ -0,0 +1,280 @@
+"""
+query_profiler.py
+
+SQL query profiler for the calendar database.
+
+Hooks SQLAlchemy's engine events (before/after cursor execute) and records:
+- Per-statement latency histograms, call counts and row counts
+- Queries issued per storage operation (e.g. get_events_for_month), to catch N+1 regressions
+- Slow statements together with their `EXPLAIN QUERY PLAN`, to prove the
+  `date` and `recurrence` indexes are actually used
+
+Everything is available programmatically through `stats()`, `operations()`
+and `slow_queries()`. The overhead is two timer reads and a dict update per
+statement; EXPLAIN only runs once per slow statement.
+
+Author: Attila Bordan
+"""
+import functools
+import os
+import re
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event
+
+from app.log import get_logger
+from app.tracing import tracer
+
+logger = get_logger(__name__)
+
+# Statements slower than this (ms) are logged with their query plan
+SLOW_QUERY_MS = float(os.getenv('CALENDAR_SLOW_QUERY_MS', '50'))
+# An operation issuing more queries than this is reported as a likely N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv('CALENDAR_N_PLUS_ONE', '10'))
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+HISTOGRAM_BOUNDS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_statement(statement):
+    """Collapses whitespace so the same query always maps to the same key."""
+    return _WHITESPACE.sub(' ', statement).strip()
+
+
+class QueryProfiler:
+    """
+    Collects statement timings from every engine it is attached to.
+
+    Args:
+        slow_query_ms (float): Threshold for the slow-query log and plan capture.
+        n_plus_one_threshold (int): Queries per operation that trigger a warning.
+        slow_log_size (int): Slow queries kept in memory.
+        capture_all_plans (bool): Record the plan of every SELECT, not only slow ones (benchmarks).
+    """
+    def __init__(self, slow_query_ms=SLOW_QUERY_MS, n_plus_one_threshold=N_PLUS_ONE_THRESHOLD, slow_log_size=50,
+                 capture_all_plans=False):
+        self.slow_query_ms = slow_query_ms
+        self.capture_all_plans = capture_all_plans
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._statements = {}
+        self._operations = {}
+        self._plans = {}
+        self._slow = deque(maxlen=slow_log_size)
+        self._engines = []
+
+    # ---------- Wiring ----------
+    def attach(self, engine):
+        """Starts profiling an engine (attaching the same engine twice is a no-op)."""
+        if engine in self._engines:
+            return
+        event.listen(engine, 'before_cursor_execute', self._before_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_execute)
+        self._engines.append(engine)
+
+    def detach(self, engine):
+        """Stops profiling an engine."""
+        if engine not in self._engines:
+            return
+        event.remove(engine, 'before_cursor_execute', self._before_execute)
+        event.remove(engine, 'after_cursor_execute', self._after_execute)
+        self._engines.remove(engine)
+
+    def track_rows(self, base):
+        """Counts ORM objects loaded for every model of a declarative base (SELECT row counts)."""
+        event.listen(base, 'load', self._on_load, propagate=True)
+
+    # ---------- Engine events ----------
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        end = time.perf_counter()
+        start = conn.info['query_start'].pop()
+        elapsed_ms = (end - start) * 1000
+        key = normalize_statement(statement)
+        if tracer.enabled:
+            tracer.add('sql', 'db', start, end, {'statement': key[:200]})
+        # DBAPI row counts are only meaningful for writes; SELECT rows come from ORM load events
+        rows = cursor.rowcount if cursor.rowcount and cursor.rowcount > 0 else 0
+
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                stats = self._statements[key] = {
+                    'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'rows': 0,
+                    'histogram': [0] * (len(HISTOGRAM_BOUNDS_MS) + 1),
+                }
+            stats['count'] += 1
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            stats['rows'] += rows
+            stats['histogram'][self._bucket(elapsed_ms)] += 1
+
+        self._local.last_statement = key
+        operation = getattr(self._local, 'operation', None)
+        if operation is not None:
+            operation['queries'] += 1
+
+        if elapsed_ms >= self.slow_query_ms:
+            plan = self._plan_for(cursor, key, statement, parameters, executemany)
+            self._record_slow(key, plan, elapsed_ms)
+        elif self.capture_all_plans:
+            self._plan_for(cursor, key, statement, parameters, executemany)
+
+    def _on_load(self, target, context):
+        key = getattr(self._local, 'last_statement', None)
+        if key is None:
+            return
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is not None:
+                stats['rows'] += 1
+        operation = getattr(self._local, 'operation', None)
+        if operation is not None:
+            operation['rows'] += 1
+
+    @staticmethod
+    def _bucket(elapsed_ms):
+        for index, bound in enumerate(HISTOGRAM_BOUNDS_MS):
+            if elapsed_ms <= bound:
+                return index
+        return len(HISTOGRAM_BOUNDS_MS)
+
+    # ---------- Slow queries ----------
+    def _plan_for(self, cursor, key, statement, parameters, executemany):
+        """Returns the cached plan of a SELECT, explaining it the first time it is seen."""
+        plan = self._plans.get(key)
+        if plan is None and not executemany and key.upper().startswith('SELECT'):
+            plan = self._plans[key] = self.explain(cursor.connection, statement, parameters)
+        return plan
+
+    def _record_slow(self, key, plan, elapsed_ms):
+        self._slow.append({
+            'statement': key,
+            'ms': round(elapsed_ms, 3),
+            'plan': plan,
+            'operation': getattr(self._local, 'operation_name', None),
+            'at': time.time(),
+        })
+        logger.warning('Slow query (%.1f ms): %s\n  plan: %s', elapsed_ms, key, plan)
+
+    @staticmethod
+    def explain(dbapi_connection, statement, parameters=()):
+        """
+        Returns SQLite's `EXPLAIN QUERY PLAN` for a statement.
+
+        Runs on a separate DBAPI cursor so it is not profiled itself.
+
+        Returns:
+            list: Plan detail lines, e.g. 'SEARCH scheduled_event USING INDEX ix_scheduled_event_date (date>? AND date<?)'.
+        """
+        try:
+            plan_cursor = dbapi_connection.cursor()
+            try:
+                plan_cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters or ())
+                return [row[-1] for row in plan_cursor.fetchall()]
+            finally:
+                plan_cursor.close()
+        except Exception as e:
+            logger.debug('EXPLAIN QUERY PLAN failed: %s', e)
+            return []
+
+    # ---------- Operations ----------
+    def operation(self, name):
+        """
+        Decorator attributing every statement a function issues to operation `name`.
+
+        Usage:
+            @profiler.operation('get_events_for_month')
+            def get_events_for_month(...): ...
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                # Nested operations count towards the outermost one
+                if getattr(self._local, 'operation', None) is not None:
+                    return func(*args, **kwargs)
+
+                current = self._local.operation = {'queries': 0, 'rows': 0}
+                self._local.operation_name = name
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self._local.operation = None
+                    self._local.operation_name = None
+                    self._finish_operation(name, current)
+            return wrapper
+        return decorator
+
+    def _finish_operation(self, name, current):
+        with self._lock:
+            stats = self._operations.get(name)
+            if stats is None:
+                stats = self._operations[name] = {
+                    'runs': 0, 'total_queries': 0, 'max_queries': 0, 'last_queries': 0, 'rows': 0,
+                }
+            stats['runs'] += 1
+            stats['total_queries'] += current['queries']
+            stats['max_queries'] = max(stats['max_queries'], current['queries'])
+            stats['last_queries'] = current['queries']
+            stats['rows'] += current['rows']
+
+        if current['queries'] > self.n_plus_one_threshold:
+            logger.warning('%s issued %d queries (threshold %d): possible N+1',
+                           name, current['queries'], self.n_plus_one_threshold)
+
+    # ---------- Reporting ----------
+    def stats(self):
+        """
+        Returns per-statement statistics.
+
+        Returns:
+            dict: statement -> count, total_ms, avg_ms, max_ms, rows, histogram
+                  (bucket label -> count) and plan (if it was ever slow).
+        """
+        labels = [f'<={bound}ms' for bound in HISTOGRAM_BOUNDS_MS] + [f'>{HISTOGRAM_BOUNDS_MS[-1]}ms']
+        with self._lock:
+            return {
+                key: {
+                    'count': stats['count'],
+                    'total_ms': round(stats['total_ms'], 3),
+                    'avg_ms': round(stats['total_ms'] / stats['count'], 3),
+                    'max_ms': round(stats['max_ms'], 3),
+                    'rows': stats['rows'],
+                    'histogram': {label: n for label, n in zip(labels, stats['histogram']) if n},
+                    'plan': self._plans.get(key),
+                }
+                for key, stats in self._statements.items()
+            }
+
+    def operations(self):
+        """Returns queries and rows per operation (runs, total/max/last queries, rows)."""
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._operations.items()}
+
+    def slow_queries(self):
+        """Returns the recent slow queries, oldest first."""
+        return list(self._slow)
+
+    def reset(self):
+        """Clears all collected statistics (cached query plans are kept)."""
+        with self._lock:
+            self._statements.clear()
+            self._operations.clear()
+            self._slow.clear()
+
+
+_profiler = None
+
+
+def get_profiler():
+    """Returns the shared QueryProfiler used by the storage layer."""
+    global _profiler
+    if _profiler is None:
+        _profiler = QueryProfiler()
+    return _profiler